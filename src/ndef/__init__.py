@@ -99,13 +99,25 @@ else:
     from . import bluetooth
     from . import wifi
     from . import signature
+    from . import tag  # noqa: F401
+    if sys.version_info >= (3, 6):  # pragma: no cover
+        from . import aio  # noqa: F401
 
 message_decoder = message.message_decoder
+messages_decoder = message.messages_decoder
+decode_file = message.decode_file
+MessageParser = message.MessageParser
+MessageView = message.MessageView
+scan_records = message.scan_records
 message_encoder = message.message_encoder
+encode_message = message.encode_message
+encode_message_into = message.encode_message_into
+encode_message_segments = message.encode_message_segments
 
 DecodeError = record.DecodeError
 EncodeError = record.EncodeError
 Record = record.Record
+StreamRecord = record.StreamRecord
 UriRecord = uri.UriRecord
 TextRecord = text.TextRecord
 SmartposterRecord = smartposter.SmartposterRecord
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""Implementation of the asyncio message decoder and encoder functions.
+
+This module requires Python 3.6 or newer for asynchronous generators
+and is only imported by the ndef package on those versions.
+
+"""
+from .record import Record, DecodeError
+from .message import _check_chunk_size
+
+
+async def message_decoder(reader, errors='strict',
+                          known_types=Record._known_types, lazy=False):
+    """The message_decoder asynchronous generator function yields
+    ndef.Record class or subclass instances from an encoded NDEF
+    Message that is read from an asyncio.StreamReader or any other
+    object with an awaitable readexactly method. Each record is
+    yielded as soon as its octets were read, the octets of the
+    following records need not yet be received.
+
+    >>> import asyncio, ndef.aio
+    >>> async def main():
+    ...     reader = asyncio.StreamReader()
+    ...     reader.feed_data(bytes.fromhex('d1010e5402656e48656c6c6f'))
+    ...     reader.feed_data(bytes.fromhex('20576f726c64'))
+    ...     reader.feed_eof()
+    ...     decoder = ndef.aio.message_decoder(reader)
+    ...     return [record async for record in decoder]
+    ...
+    >>> loop = asyncio.new_event_loop()
+    >>> loop.run_until_complete(main())
+    [ndef.text.TextRecord('Hello World', 'en', 'UTF-8')]
+    >>> loop.close()
+
+    The errors, known_types and lazy arguments are interpreted as for
+    ndef.message.message_decoder. The end of the message data is
+    signaled by the reader with an EOFError exception, such as the
+    asyncio.IncompleteReadError raised when the stream is closed.
+
+    """
+    try:
+        fields = await _read_fields(reader)
+    except DecodeError:
+        if errors == 'ignore':
+            return  # just stop decoding
+        raise
+
+    if fields is not None and fields[0] is False and errors == 'strict':
+        raise DecodeError('MB flag not set in first record')
+
+    first_record = True
+    while fields is not None:
+        mb, me, cf, TNF, TYPE, ID, PAYLOAD = fields
+        try:
+            record = Record._decode_fields(TNF, TYPE, ID, PAYLOAD,
+                                           errors, known_types, lazy)
+        except DecodeError:
+            if errors == 'ignore':
+                return  # just stop decoding
+            raise
+
+        if first_record and known_types is Record._known_types:
+            known_types = type(record)._known_types
+        first_record = False
+
+        yield record
+        if me is True:
+            if cf is True and errors == 'strict':
+                raise DecodeError('CF flag set in last record')
+            fields = None
+        else:
+            try:
+                fields = await _read_fields(reader)
+            except DecodeError:
+                if errors == 'ignore':
+                    return  # just stop decoding
+                raise
+            else:
+                if fields is None and errors == 'strict':
+                    raise DecodeError('ME flag not set in last record')
+                if fields is not None and fields[0] is True and \
+                   errors == 'strict':
+                    raise DecodeError('MB flag set in middle record')
+
+
+async def _read_fields(reader):
+    # Read the next NDEF record from reader and return the MB, ME and
+    # CF flags with the TNF, TYPE, ID and PAYLOAD fields, or None if
+    # the reader has no more data.
+    try:
+        octet0 = (await reader.readexactly(1))[0]
+    except EOFError:
+        return None
+
+    MB, ME, CF, IL, TNF, struct = Record._decode_header(octet0)
+    fields = struct.unpack(await _read(reader, struct.size, "length fields"))
+
+    TYPE_LENGTH, PAYLOAD_LENGTH, ID_LENGTH = fields if IL else fields+(0,)
+    Record._decode_check_lengths(TNF, TYPE_LENGTH, PAYLOAD_LENGTH, ID_LENGTH)
+
+    TYPE = await _read(reader, TYPE_LENGTH, "TYPE field")
+    ID = await _read(reader, ID_LENGTH, "ID field")
+    PAYLOAD = await _read(reader, PAYLOAD_LENGTH, "PAYLOAD field")
+    return (MB, ME, CF, TNF, TYPE, ID, PAYLOAD)
+
+
+async def _read(reader, size, name):
+    # Read exactly size octets from reader for the named part of an
+    # NDEF record.
+    try:
+        return await reader.readexactly(size)
+    except EOFError:
+        raise Record._decode_error("buffer underflow at reading {}", name)
+
+
+async def message_encoder(message, writer, drain_size=0x10000,
+                          chunk_size=None, max_payload_size=None):
+    """The message_encoder coroutine function encodes the records of an
+    NDEF Message and writes the octets to an asyncio.StreamWriter, or
+    any other object with write and awaitable drain methods, and
+    returns the number of octets written. The message argument may be
+    an iterable or an asynchronous iterable of ndef.Record class or
+    subclass objects, records are encoded and written as they become
+    available.
+
+    >>> import asyncio, io, ndef.aio
+    >>> class Writer(io.BytesIO):
+    ...     async def drain(self):
+    ...         pass
+    ...
+    >>> writer = Writer()
+    >>> message = [ndef.Record(), ndef.Record(), ndef.Record()]
+    >>> loop = asyncio.new_event_loop()
+    >>> loop.run_until_complete(ndef.aio.message_encoder(message, writer))
+    9
+    >>> loop.close()
+    >>> writer.getvalue().hex()
+    '900000100000500000'
+
+    The writer's drain method is awaited whenever drain_size or more
+    octets were written since the last drain, and after the last
+    record, so that a large message is sent with the flow control of
+    the transport. The payload of an ndef.record.StreamRecord is read
+    and written in blocks with the same flow control. The chunk_size
+    and max_payload_size arguments are interpreted as for
+    ndef.message.message_encoder.
+
+    """
+    _check_chunk_size(chunk_size)
+    records = _records(message)
+    count = pending = 0
+    mb_flag = True
+    this_record = await _next_record(records)
+    while this_record is not _END:
+        if not isinstance(this_record, Record):
+            errstr = "an ndef.Record class instance is required, not {}"
+            raise TypeError(errstr.format(type(this_record).__name__))
+        next_record = await _next_record(records)
+        me_flag = next_record is _END
+        cf_flag = not me_flag and isinstance(next_record, Record) and \
+            next_record.type == 'unchanged'
+        for octets in this_record._encode_blocks(mb_flag, me_flag, cf_flag,
+                                                 chunk_size,
+                                                 max_payload_size):
+            writer.write(octets)
+            count += len(octets)
+            pending += len(octets)
+            if pending >= drain_size:
+                await writer.drain()
+                pending = 0
+        this_record = next_record
+        mb_flag = False
+    if pending:
+        await writer.drain()
+    return count
+
+
+_END = object()
+
+
+async def _records(message):
+    # Yield the records of an iterable or asynchronous iterable.
+    if hasattr(message, '__aiter__'):
+        async for record in message:
+            yield record
+    else:
+        for record in message:
+            yield record
+
+
+async def _next_record(records):
+    # Return the next record from the asynchronous iterator or _END.
+    try:
+        return await records.__anext__()
+    except StopAsyncIteration:
+        return _END
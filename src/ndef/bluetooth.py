@@ -3,7 +3,7 @@
 
 """
 from __future__ import absolute_import, division
-from .record import Record, GlobalRecord, convert, _PY2
+from .record import Record, GlobalRecord, convert, _PY2, _values_key
 from .record import decode_error, encode_error
 from uuid import UUID
 import struct
@@ -569,6 +569,7 @@ class BluetoothRecord(GlobalRecord):
     """Base class that implements dict-like Bluetooth EIR/AD data access.
 
     """
+    __slots__ = ('_attributes',)
     _attribute_name_mapping = {
         'Flags': 0x01,
         'Incomplete List of 16-bit Service Class UUIDs': 0x02,
@@ -648,6 +649,12 @@ class BluetoothRecord(GlobalRecord):
     def items(self):
         return self._attributes.items()
 
+    def _payload_key(self):
+        # The attribute values may be bytearrays that are not cached.
+        if _values_key(self._attributes.values()) is None:
+            return None
+        return tuple(self._attributes.items())
+
     def __format__(self, format_spec):
         if format_spec == 'args':
             afmt = "(0x{:02X}, {!r})"
@@ -686,6 +693,7 @@ class BluetoothEasyPairingRecord(BluetoothRecord):
     """Decoder/Encoder for Bluetooth Easy Pairing out-of-band data.
 
     """
+    __slots__ = ('bd_addr',)
     _type = 'application/vnd.bluetooth.ep.oob'
 
     def __init__(self, device_address, *eir):
@@ -721,6 +729,10 @@ class BluetoothEasyPairingRecord(BluetoothRecord):
             value = DeviceAddress(value)
         self.bd_addr = value.encode('EP')
 
+    def _payload_key(self):
+        key = super(BluetoothEasyPairingRecord, self)._payload_key()
+        return None if key is None else (self.bd_addr, key)
+
     @property
     def device_name(self):
         """Get or set the Bluetooth Local Device Name.
@@ -948,6 +960,7 @@ class BluetoothLowEnergyRecord(BluetoothRecord):
     """Decoder/Encoder for Bluetooth Low Energy out-of-band pairing data.
 
     """
+    __slots__ = ()
     _type = 'application/vnd.bluetooth.le.oob'
 
     @property
@@ -12,6 +12,9 @@ from .record import Record, GlobalRecord, convert
 from collections import namedtuple
 import uuid
 
+# An undefined data element, at module level to be found by pickle.
+DataElement = namedtuple('DataElement', 'data_type, data_bytes')
+
 
 class DeviceInformationRecord(GlobalRecord):
     """This class decodes or encodes an NDEF Device Information Record and
@@ -26,9 +29,11 @@ class DeviceInformationRecord(GlobalRecord):
     >>> record = ndef.DeviceInformationRecord('ABC Company', 'Device XYZ')
 
     """
+    __slots__ = ('_vendor_name', '_model_name', '_unique_name', '_uuid',
+                 '_version_string', '_unknown_tlvs')
     _type = 'urn:nfc:wkt:Di'
 
-    _DataElement = namedtuple('DataElement', 'data_type, data_bytes')
+    _DataElement = DataElement
 
     def __init__(self, vendor_name, model_name, unique_name=None,
                  uuid_string=None, version_string=None, *undefined_data):
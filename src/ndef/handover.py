@@ -23,7 +23,8 @@ NDEF Records.
 """
 from __future__ import absolute_import, division
 from .message import message_decoder, message_encoder
-from .record import Record, GlobalRecord, LocalRecord, hexlify
+from .record import Record, GlobalRecord, LocalRecord, hexlify, _LazyList
+from .record import _records_key
 from .deviceinfo import DeviceInformationRecord
 from .bluetooth import BluetoothEasyPairingRecord
 from .bluetooth import BluetoothLowEnergyRecord
@@ -54,8 +55,11 @@ class AlternativeCarrierRecord(LocalRecord):
     used in application code.
 
     """
+    __slots__ = ('_carrier_power_state', 'carrier_data_reference',
+                 '_auxiliary_data_reference')
     _type = 'urn:nfc:wkt:ac'
     _cps_values = ("inactive", "active", "activating", "unknown")
+    auxiliary_data_reference = _LazyList('_auxiliary_data_reference')
 
     def __init__(self, cps, cdr, *adr):
         """Initialize the record with the carrier power state (cps), carrier
@@ -63,9 +67,9 @@ class AlternativeCarrierRecord(LocalRecord):
         references (adr).
 
         """
+        self._auxiliary_data_reference = None
         self.set_carrier_power_state(cps)
         self.set_carrier_data_reference(cdr)
-        self.auxiliary_data_reference = []
         for reference in adr:
             self.add_auxiliary_data_reference(reference)
 
@@ -183,6 +187,7 @@ class CollisionResolutionRecord(LocalRecord):
     used in application code.
 
     """
+    __slots__ = ('_random_number',)
     _type = 'urn:nfc:wkt:cr'
 
     def __init__(self, random_number=0):
@@ -251,6 +256,7 @@ class ErrorRecord(LocalRecord):
     class. It is not intended to be directly used in application code.
 
     """
+    __slots__ = ('_error_reason', '_error_data')
     _type = 'urn:nfc:wkt:err'
     _error_reason_strings = (
         "temporarily out of memory, may retry after {} milliseconds",
@@ -352,8 +358,17 @@ class HandoverRecord(GlobalRecord):
     is not intended for direct instantiation.
 
     """
+    __slots__ = ('_version', '_alternative_carrier_records',
+                 '_unknown_records')
     Version = namedtuple('Version', 'major, minor')
 
+    # The lists of sub-records are created on first use, see the
+    # _records method for read access that does not create them. The
+    # slots are initialized with None so that reading an unused list
+    # does not fail over to Record.__getattr__.
+    alternative_carrier_records = _LazyList('_alternative_carrier_records')
+    unknown_records = _LazyList('_unknown_records')
+
     def __init__(self, version, *alternative_carrier):
         """Initialize the record with the handover version number and zero or
         more alternative carriers. The version number may be set as an
@@ -363,6 +378,7 @@ class HandoverRecord(GlobalRecord):
         reference and zero or more auxiliary data references.
 
         """
+        self._alternative_carrier_records = self._unknown_records = None
         if isinstance(version, int):
             self._version = version & 0xFF
         elif isinstance(version, str):
@@ -375,10 +391,8 @@ class HandoverRecord(GlobalRecord):
         else:
             errstr = "version argument expects int or str, but not {}"
             raise self._type_error(errstr, type(version).__name__)
-        self.alternative_carrier_records = []
         for ac in alternative_carrier:
             self.add_alternative_carrier(*ac)
-        self.unknown_records = []
 
     @property
     def hexversion(self):
@@ -429,28 +443,38 @@ class HandoverRecord(GlobalRecord):
     def __format__(self, format_spec):
         if format_spec == 'args':
             ver = "{!r}".format(self.version_string)
-            acr = self.alternative_carrier_records
+            acr = self._records('alternative_carrier_records')
             acs = ', '.join(["({:args})".format(ac) for ac in acr])
             return "{}{{}}{}{}".format(ver, ', ' if acr else '', acs)
 
         if format_spec == 'data':
             s = ["Version '{r.version_string}'".format(r=self)]
-            for acr in self.alternative_carrier_records:
+            for acr in self._records('alternative_carrier_records'):
                 s.append("{:data}".format(acr))
             return ' '.join(s)
 
         return super(HandoverRecord, self).__format__(format_spec)
 
+    def _records(self, name):
+        # Return the list of sub-records for the attribute name, or
+        # an empty tuple if the list was not yet created.
+        return getattr(self, '_' + name, None) or ()
+
     _encode_records = [
         "alternative_carrier_records",
         "unknown_records"]
 
+    def _payload_key(self):
+        key = tuple([_records_key(self._records(name))
+                     for name in self._encode_records])
+        return None if None in key else key
+
     def _encode_payload(self):
         stream = BytesIO()
         encoder = message_encoder(stream=stream)
         encoder.send(None)
         for name in self._encode_records:
-            for record in getattr(self, name):
+            for record in self._records(name):
                 encoder.send(record)
         encoder.send(None)
         return self._encode_struct('B*', self.hexversion, stream.getvalue())
@@ -489,7 +513,9 @@ class HandoverRequestRecord(HandoverRecord):
     >>> message[0].add_alternative_carrier('active', message[1].name)
 
     """
+    __slots__ = ('_collision_resolution_records',)
     _type = 'urn:nfc:wkt:Hr'
+    collision_resolution_records = _LazyList('_collision_resolution_records')
 
     def __init__(self, version=default_version, crn=None,
                  *alternative_carrier):
@@ -502,8 +528,8 @@ class HandoverRequestRecord(HandoverRecord):
         later, for any prior version number it must be None.
 
         """
+        self._collision_resolution_records = None
         super(type(self), self).__init__(version, *alternative_carrier)
-        self.collision_resolution_records = []
         if crn is not None:
             self.collision_resolution_number = crn
 
@@ -511,7 +537,8 @@ class HandoverRequestRecord(HandoverRecord):
     def collision_resolution_number(self):
         """Get or set the random number for collision resolution."""
         try:
-            return self.collision_resolution_records[0].random_number
+            return self._records('collision_resolution_records')[0] \
+                .random_number
         except IndexError:
             return None
 
@@ -569,7 +596,9 @@ class HandoverSelectRecord(HandoverRecord):
     >>> message[0].add_alternative_carrier('active', carrier.name)
 
     """
+    __slots__ = ('_error_records',)
     _type = 'urn:nfc:wkt:Hs'
+    error_records = _LazyList('_error_records')
 
     def __init__(self, version=default_version, error=None,
                  *alternative_carrier):
@@ -582,8 +611,8 @@ class HandoverSelectRecord(HandoverRecord):
         carriers.
 
         """
+        self._error_records = None
         super(type(self), self).__init__(version, *alternative_carrier)
-        self.error_records = []
         if error is not None:
             if not (isinstance(error, (tuple, list))):
                 errstr = "can't initialize error attribute from {!r}"
@@ -599,7 +628,7 @@ class HandoverSelectRecord(HandoverRecord):
 
         """
         try:
-            return self.error_records[0]
+            return self._records('error_records')[0]
         except IndexError:
             return None
 
@@ -629,7 +658,7 @@ class HandoverSelectRecord(HandoverRecord):
     _encode_records = HandoverRecord._encode_records + ["error_records"]
 
     def _encode_payload(self):
-        if self.hexversion < 0x12 and self.error_records:
+        if self.hexversion < 0x12 and self._records('error_records'):
             errstr = "can't encode error record for version {}"
             raise self._encode_error(errstr, self.version_string)
         return super(type(self), self)._encode_payload()
@@ -649,6 +678,7 @@ class HandoverMediationRecord(HandoverRecord):
     records subsequently encoded in the same message.
 
     """
+    __slots__ = ()
     _type = 'urn:nfc:wkt:Hm'
 
     def __init__(self, version=default_version, *alternative_carrier):
@@ -681,6 +711,7 @@ class HandoverInitiateRecord(HandoverRecord):
     subsequently encoded in the same message.
 
     """
+    __slots__ = ()
     _type = 'urn:nfc:wkt:Hi'
 
     def __init__(self, version=default_version, *alternative_carrier):
@@ -716,6 +747,7 @@ class HandoverCarrierRecord(GlobalRecord):
     match exactly).
 
     """
+    __slots__ = ('_carrier_type', '_carrier_data')
     _type = 'urn:nfc:wkt:Hc'
 
     def __init__(self, carrier_type=None, carrier_data=None, reference=None):
@@ -6,15 +6,29 @@
 from __future__ import absolute_import, division
 
 import io
-from .record import Record, DecodeError
+import os
+from mmap import mmap, ACCESS_READ
+from collections import namedtuple
+from .record import Record, StreamRecord, PayloadReader, DecodeError
+from .record import _PY2, _octets_view
 
 
 def message_decoder(stream_or_bytes, errors='strict',
-                    known_types=Record._known_types):
+                    known_types=Record._known_types, lazy=False,
+                    reassemble=False, max_payload_size=None,
+                    stream_payload_size=None, select=None):
     """The message_decoder generator function yields ndef.Record class or
     subclass instances from an encoded NDEF Message. The NDEF Message
     octets can be read either from a file-like, byte-oriented stream
-    or from bytes or a bytearray.
+    or from any object that supports the buffer protocol, such as
+    bytes, bytearray, memoryview or, on Python 3, mmap. Buffer input is
+    decoded in place, record fields are sliced from a memoryview
+    rather than copied out through a stream. The view of the buffer is
+    held until the generator is exhausted or closed (on Python 2 until
+    it is deleted), a bytearray can not be resized in the meantime and
+    raises a BufferError. An unbuffered io.RawIOBase stream,
+    where each read may be a system call, is read with mostly one call
+    per record and never beyond the end of the message.
 
     >>> import io
     >>> from ndef import message_decoder
@@ -41,50 +55,910 @@ def message_decoder(stream_or_bytes, errors='strict',
     type names to record classes. By default, if known_types is None,
     all registered record types are recognized.
 
-    """
-    if isinstance(stream_or_bytes, (io.RawIOBase, io.BufferedIOBase)):
-        stream = stream_or_bytes
-    elif isinstance(stream_or_bytes, (bytes, bytearray)):
-        stream = io.BytesIO(stream_or_bytes)
-    else:
-        errstr = "a stream or bytes type argument is required, not {}"
-        raise TypeError(errstr.format(type(stream_or_bytes).__name__))
+    If lazy is True, records of a known type are returned without
+    decoding the payload. The payload is decoded on first access to
+    an attribute that reflects the payload content, while the record
+    type and name are available immediately. Payload decoding errors
+    are then raised as ndef.DecodeError from that attribute access.
+
+    >>> octets = bytearray.fromhex('d1010e5402656e48656c6c6f20576f726c64')
+    >>> record = next(message_decoder(octets, lazy=True))
+    >>> record.type
+    'urn:nfc:wkt:T'
+    >>> record.text
+    'Hello World'
+
+    If reassemble is True, a chunked record is returned as one record
+    with the payload of all its chunks, instead of the initial chunk
+    followed by the 'unchanged' type record for each further chunk.
+    The chunk payloads are appended to a single bytearray that grows
+    up to max_payload_size octets (by default Record.MAX_PAYLOAD_SIZE)
+    and a longer payload is a decoding error.
 
+    >>> octets = bytearray.fromhex('b20a05746578742f706c61696e4865206d6f'
+    ...                            '36000572652074655600027874')
+    >>> print(next(message_decoder(octets, reassemble=True)).data)
+    bytearray(b'He more text')
+
+    If stream_payload_size is set, stream input is decoded with
+    constant memory for large payloads. A record that is not of a
+    known type and has more than stream_payload_size PAYLOAD octets is
+    returned as an ndef.record.StreamRecord, the PAYLOAD octets can
+    then be read from its stream attribute, a reader positioned on
+    the input stream. Any octets not read are skipped before the next
+    record is decoded, and the MAX_PAYLOAD_SIZE limit does not apply
+    to those records. This has no effect for buffer input or when
+    chunked records are reassembled.
+
+    If select is set, only the selected records are decoded and
+    returned. The select argument is either a collection of record
+    type strings or a function that is called with the raw TNF value
+    and the TYPE and ID field bytes of each record and returns True to
+    select it. A record that is not selected is skipped before its
+    record type or payload is decoded, the payload is not even read
+    from a seekable stream. The message structure is verified for all
+    records, and a first record that is not selected still determines
+    the known types for the records that follow. A reassembled chunked
+    record is selected by the fields of its first chunk.
+
+    >>> octets = bytearray.fromhex('9101045402656e61 510102550062')
+    >>> list(message_decoder(octets, select=['urn:nfc:wkt:U']))
+    [ndef.uri.UriRecord('b')]
+    >>> list(message_decoder(octets, select=lambda tnf, type, id: False))
+    []
+
+    """
+    decoder = _message_decoder(stream_or_bytes, reassemble, max_payload_size,
+                               stream_payload_size, select)
     try:
-        record, mb, me, cf = Record._decode(stream, errors, known_types)
+        for record in _decode_message(decoder, errors, known_types, lazy):
+            yield record
     except DecodeError:
         if errors == 'ignore':
             return  # just stop decoding
         raise
+    finally:
+        decoder.release()
+
+
+def messages_decoder(stream_or_bytes, errors='strict',
+                     known_types=Record._known_types, lazy=False,
+                     reassemble=False, max_payload_size=None):
+    """The messages_decoder generator function decodes a sequence of
+    NDEF Messages that follow each other in a stream or buffer, such
+    as a capture file. For each message it yields a tuple of the
+    offset of the first message octet (counted from the initial
+    stream position or the start of the buffer) and the list of
+    records. Decoding continues after each record with the ME flag
+    until the end of data.
+
+    >>> from ndef.message import messages_decoder
+    >>> octets = bytearray.fromhex('d00000 900000500000 d00000')
+    >>> for offset, records in messages_decoder(octets):
+    ...     print(offset, len(records))
+    ...
+    0 1
+    3 2
+    9 1
+
+    The arguments are interpreted as for message_decoder. With errors
+    set to 'ignore' the decoder stops after the last complete message
+    when an error is encountered.
+
+    """
+    decoder = _message_decoder(stream_or_bytes, reassemble, max_payload_size)
+    try:
+        for message in _decode_messages(decoder, errors, known_types, lazy):
+            yield message
+    finally:
+        decoder.release()
+
+
+def decode_file(path, errors='strict', known_types=Record._known_types,
+                lazy=False, reassemble=False, max_payload_size=None):
+    """The decode_file generator function decodes the sequence of NDEF
+    Messages in the file at path, such as a capture or replay file.
+    The file is memory-mapped read-only and decoded as a buffer, the
+    record fields are sliced from the mapping and only the payload of
+    each record is copied. Pages of the mapping are shared by all
+    processes that decode the same file. For each message it yields a
+    tuple of the file offset and the list of records, as described for
+    messages_decoder, whose arguments are interpreted the same way.
+
+    >>> import os, tempfile
+    >>> from ndef.message import decode_file
+    >>> with tempfile.NamedTemporaryFile(delete=False) as f:
+    ...     _ = f.write(bytearray.fromhex('d00000 900000500000'))
+    ...
+    >>> for offset, records in decode_file(f.name):
+    ...     print(offset, len(records))
+    ...
+    0 1
+    3 2
+    >>> os.unlink(f.name)
+
+    The memory map is closed when the generator is exhausted or closed.
+    An empty file yields no messages. On Python 2, where an mmap does
+    not support the buffer protocol, the file content is read into
+    memory instead.
+
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return  # an empty file can not be mapped
+        if _PY2:
+            # A Python 2 mmap can not be viewed as a memoryview, the
+            # file content is read into memory instead.
+            mapping = None
+            decoder = _BufferDecoder(bytearray(f.read()))
+        else:
+            mapping = mmap(f.fileno(), 0, access=ACCESS_READ)
+            decoder = _BufferDecoder(mapping)
+
+    try:
+        if reassemble:
+            chunked = _reassemble(decoder, max_payload_size)
+            messages = _decode_messages(chunked, errors, known_types, lazy)
+        else:
+            messages = _decode_messages(decoder, errors, known_types, lazy)
+        for message in messages:
+            yield message
+    finally:
+        if mapping is not None:
+            decoder.release()
+            try:
+                mapping.close()
+            except BufferError:
+                # The record fields in the traceback of a decode
+                # error are still sliced from the mapping. It is
+                # closed when they are released.
+                pass
+
+
+def _decode_messages(decoder, errors, known_types, lazy):
+    # Generate the offset and the list of records of each NDEF
+    # Message from the record decoder, until the end of data or, with
+    # errors set to 'ignore', the first decode error.
+    while True:
+        offset = decoder.offset
+        try:
+            records = list(_decode_message(decoder, errors, known_types,
+                                           lazy))
+        except DecodeError:
+            if errors == 'ignore':
+                return  # just stop decoding
+            raise
+        if not records:
+            return
+        yield (offset, records)
+
+
+def _message_decoder(stream_or_bytes, reassemble=False, max_payload_size=None,
+                     stream_payload_size=None, select=None):
+    # Return the record decoder object for the type of input, with
+    # the record filter function for the select argument.
+    if isinstance(stream_or_bytes, (bytes, bytearray, memoryview, mmap)):
+        decoder = _BufferDecoder(stream_or_bytes)
+    elif (isinstance(stream_or_bytes, io.RawIOBase) and
+          stream_payload_size is None):
+        decoder = _RawStreamDecoder(stream_or_bytes)
+    elif isinstance(stream_or_bytes, (io.RawIOBase, io.BufferedIOBase)):
+        decoder = _StreamDecoder(stream_or_bytes, stream_payload_size)
+    else:
+        errstr = "a stream or bytes type argument is required, not {}"
+        raise TypeError(errstr.format(type(stream_or_bytes).__name__))
+
+    if reassemble:
+        decoder = _reassemble(decoder, max_payload_size)
+    decoder.select = _record_filter(select)
+    return decoder
+
+
+def _record_filter(select):
+    # Return the select function, or a function that selects records
+    # by the (TNF, TYPE) values of the record type strings in select.
+    if select is None or callable(select):
+        return select
+    types = frozenset([Record._encode_type(value) for value in select])
+    return lambda TNF, TYPE, ID: (TNF, TYPE) in types
+
+
+# The record that the decoders return in place of a record that is
+# not selected, only the flags are then verified. The TNF and TYPE
+# fields of a skipped first record still determine the known types
+# for the records that follow.
+_SkippedRecord = namedtuple('_SkippedRecord', 'tnf, type')
+
+
+def _message_known_types(TNF, TYPE, known_types):
+    # Return the known types for the records that follow a first
+    # record with the TNF and TYPE fields, without decoding it. This
+    # is the _known_types of the record class that decodes the first
+    # record, i.e. the type(record)._known_types of a decoded record.
+    try:
+        record_type = Record._decode_type(TNF, TYPE)
+    except ValueError:
+        return known_types
+    return known_types.get(record_type, Record)._known_types
+
+
+def _reassemble(decoder, max_payload_size=None):
+    # Return a decoder that reassembles the chunked records from the
+    # record decoder, with max_payload_size or by default
+    # Record.MAX_PAYLOAD_SIZE as the limit for the reassembled payload.
+    if max_payload_size is None:
+        max_payload_size = Record.MAX_PAYLOAD_SIZE
+    return _ChunkedDecoder(decoder, max_payload_size)
+
+
+def _decode_message(decoder, errors, known_types, lazy):
+    # Generate the records of one NDEF Message from the record
+    # decoder, the MB, ME and CF flags are verified if errors is
+    # 'strict'. The decoder stops after the record with the ME flag,
+    # or at the end of data. Decoding errors are raised for the
+    # caller to handle errors set to 'ignore'.
+    record, mb, me, cf = decoder.decode(errors, known_types, lazy)
 
     if record is not None and mb is False and errors == 'strict':
         raise DecodeError('MB flag not set in first record')
 
-    if record is not None and known_types is Record._known_types:
-        known_types = type(record)._known_types
+    if known_types is Record._known_types:
+        if isinstance(record, _SkippedRecord):
+            known_types = _message_known_types(record.tnf, record.type,
+                                               known_types)
+        elif record is not None:
+            known_types = type(record)._known_types
 
     while record is not None:
-        yield record
+        if not isinstance(record, _SkippedRecord):
+            yield record
         if me is True:
             if cf is True and errors == 'strict':
                 raise DecodeError('CF flag set in last record')
             record = None
         else:
-            try:
-                record, mb, me, cf = Record._decode(stream, errors,
-                                                    known_types)
-            except DecodeError:
-                if errors == 'ignore':
-                    return  # just stop decoding
+            record, mb, me, cf = decoder.decode(errors, known_types, lazy)
+            if record is None and errors == 'strict':
+                raise DecodeError('ME flag not set in last record')
+            if mb is True and errors == 'strict':
+                raise DecodeError('MB flag set in middle record')
+
+
+class _StreamDecoder(object):
+    # Decodes records sequentially from a file-like, byte-oriented
+    # stream. With a stream_size, the PAYLOAD of a larger record that
+    # is not a known type is not read but returned as a StreamRecord
+    # with a reader that must be skipped before the next record. The
+    # offset is the number of octets decoded from the stream.
+    select = None
+
+    def __init__(self, stream, stream_size=None):
+        self.stream = stream
+        self.stream_size = stream_size
+        self.reader = None
+        self.offset = 0
+
+    def release(self):
+        pass  # the stream is owned by the caller
+
+    def decode(self, errors, known_types, lazy=False):
+        if self.reader is not None:
+            self.reader.skip()
+            self.reader = None
+
+        max_payload_size = None if self.stream_size is None else 0xffffffff
+        header = Record._decode_stream_header(self.stream, max_payload_size)
+        if header is None:
+            return (None, False, False, False)
+
+        MB, ME, CF, TNF, TYPE, ID, PAYLOAD_LENGTH, size = header
+        self.offset += size
+        if self.select is not None and not self.select(TNF, TYPE, ID):
+            _skip_payload(self.stream, PAYLOAD_LENGTH)
+            return (_SkippedRecord(TNF, TYPE), MB, ME, CF)
+        if self.stream_size is not None:
+            record_type = Record._decode_type(TNF, TYPE)
+            if PAYLOAD_LENGTH > self.stream_size and \
+               record_type not in known_types:
+                self.reader = PayloadReader(self.stream, PAYLOAD_LENGTH)
+                record = StreamRecord(record_type, ID, self.reader,
+                                      PAYLOAD_LENGTH)
+                return (record, MB, ME, CF)
+            Record._decode_check_lengths(TNF, len(TYPE), PAYLOAD_LENGTH,
+                                         len(ID))
+
+        PAYLOAD = Record._decode_stream_payload(self.stream, PAYLOAD_LENGTH)
+        record = Record._decode_fields(TNF, TYPE, ID, PAYLOAD,
+                                       errors, known_types, lazy)
+        return (record, MB, ME, CF)
+
+    def decode_fields(self):
+        header = Record._decode_stream_header(self.stream)
+        if header is None:
+            return None
+        self.offset += header[7]
+        PAYLOAD = Record._decode_stream_payload(self.stream, header[6])
+        return header[:6] + (PAYLOAD,)
+
+
+def _skip_payload(stream, size):
+    # Move the stream over size PAYLOAD octets, with seek if the
+    # stream is seekable, otherwise the octets are read.
+    if stream.seekable():
+        position = stream.tell()
+        if stream.seek(0, io.SEEK_END) - position < size:
+            errstr = "buffer underflow at reading PAYLOAD field"
+            raise Record._decode_error(errstr)
+        stream.seek(position + size)
+    else:
+        PayloadReader(stream, size).skip()
+
+
+class _BufferDecoder(object):
+    # Decodes records sequentially from any object that supports the
+    # buffer protocol (bytes, bytearray, memoryview, mmap). Records
+    # are located by offset and their fields sliced from a single
+    # memoryview, avoiding the intermediate copies made when reading
+    # the fields from an io.BytesIO stream.
+    select = None
+
+    def __init__(self, buffer):
+        self.buffer = _octets_view(buffer)
+        self.offset = 0
+
+    def release(self):
+        # Release the view of the buffer, a bytearray can then be
+        # resized again. A Python 2 memoryview has no release method.
+        if not _PY2:
+            self.buffer.release()
+
+    def decode(self, errors, known_types, lazy=False):
+        if self.select is None:
+            record, mb, me, cf, self.offset = Record._decode_buffer(
+                self.buffer, self.offset, errors, known_types, lazy)
+            return (record, mb, me, cf)
+
+        header = Record._decode_buffer_header(self.buffer, self.offset)
+        if header is None:
+            return (None, False, False, False)
+        MB, ME, CF, SR, IL, TNF, TYPE, ID, offset, PAYLOAD_LENGTH = header
+        self.offset = offset + PAYLOAD_LENGTH
+        if not self.select(TNF, TYPE, ID):
+            return (_SkippedRecord(TNF, TYPE), MB, ME, CF)
+        PAYLOAD = self.buffer[offset:self.offset]
+        record = Record._decode_fields(TNF, TYPE, ID, PAYLOAD,
+                                       errors, known_types, lazy)
+        return (record, MB, ME, CF)
+
+    def decode_fields(self):
+        fields = Record._decode_buffer_fields(self.buffer, self.offset)
+        if fields is None:
+            return None
+        self.offset = fields[7]
+        return fields[:7]
+
+
+class _RawStreamDecoder(object):
+    # Decodes records sequentially from an unbuffered raw stream, for
+    # which every read is a system call. The header, TYPE, ID and
+    # PAYLOAD of a record are read with one call once the length
+    # fields are known. If the ME flag is not set, that same call
+    # also reads the first 3 octets of the next record, the minimum
+    # size of any record, so the decoder never reads beyond the end
+    # of a well-formed message and the stream remains positioned for
+    # the data that follows. With select, the header, TYPE and ID are
+    # read first and the PAYLOAD of a record that is not selected is
+    # skipped, or not read at all if the stream is seekable.
+    select = None
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.ahead = bytearray()
+        self.offset = 0
+
+    def release(self):
+        pass  # the stream is owned by the caller
+
+    def decode(self, errors, known_types, lazy=False):
+        if self.select is None:
+            fields = self.decode_fields()
+            if fields is None:
+                return (None, False, False, False)
+            MB, ME, CF, TNF, TYPE, ID, PAYLOAD = fields
+        else:
+            header = self._decode_header()
+            if header is None:
+                return (None, False, False, False)
+            MB, ME, CF, TNF, TYPE, ID, PAYLOAD_LENGTH = header
+            self.offset += PAYLOAD_LENGTH
+            if not self.select(TNF, TYPE, ID):
+                _skip_payload(self.stream, PAYLOAD_LENGTH)
+                return (_SkippedRecord(TNF, TYPE), MB, ME, CF)
+            PAYLOAD = bytearray(PAYLOAD_LENGTH)
+            if self._readinto(_octets_view(PAYLOAD)) < PAYLOAD_LENGTH:
+                errstr = "buffer underflow at reading PAYLOAD field"
+                raise Record._decode_error(errstr)
+        record = Record._decode_fields(TNF, TYPE, ID, PAYLOAD,
+                                       errors, known_types, lazy)
+        return (record, MB, ME, CF)
+
+    def _decode_header(self):
+        # Read the header, TYPE and ID fields of the next record with
+        # one call once the length fields are known. Return the MB, ME
+        # and CF flags, the TNF, TYPE and ID fields and the PAYLOAD
+        # length, or None if there is no more data. The stream is then
+        # positioned at the PAYLOAD.
+        ahead, self.ahead = self.ahead, bytearray()
+        if len(ahead) < 3:
+            ahead += self._read(3 - len(ahead))
+            if not ahead:
+                return None
+
+        MB, ME, CF, IL, TNF, struct = Record._decode_header(ahead[0])
+        if len(ahead) < 1 + struct.size:
+            ahead += self._read(1 + struct.size - len(ahead))
+        if len(ahead) < 1 + struct.size:
+            errstr = "buffer underflow at reading length fields"
+            raise Record._decode_error(errstr)
+
+        fields = struct.unpack_from(ahead, 1)
+        TYPE_LENGTH, PAYLOAD_LENGTH, ID_LENGTH = fields if IL else fields+(0,)
+        Record._decode_check_lengths(TNF, TYPE_LENGTH, PAYLOAD_LENGTH,
+                                     ID_LENGTH)
+
+        offset = 1 + struct.size
+        octets = ahead + self._read(offset + TYPE_LENGTH + ID_LENGTH
+                                    - len(ahead))
+        if len(octets) < offset + TYPE_LENGTH:
+            errstr = "buffer underflow at reading TYPE field"
+            raise Record._decode_error(errstr)
+        if len(octets) < offset + TYPE_LENGTH + ID_LENGTH:
+            errstr = "buffer underflow at reading ID field"
+            raise Record._decode_error(errstr)
+        TYPE = bytes(octets[offset:offset+TYPE_LENGTH])
+        ID = bytes(octets[offset+TYPE_LENGTH:])
+        self.offset += len(octets)
+        return (MB, ME, CF, TNF, TYPE, ID, PAYLOAD_LENGTH)
+
+    def decode_fields(self):
+        ahead, self.ahead = self.ahead, bytearray()
+        if len(ahead) < 3:
+            ahead += self._read(3 - len(ahead))
+            if not ahead:
+                return None
+
+        MB, ME, CF, IL, TNF, struct = Record._decode_header(ahead[0])
+        if len(ahead) < 1 + struct.size:
+            ahead += self._read(1 + struct.size - len(ahead))
+        view = _octets_view(ahead)
+        size = Record._decode_buffer_size(view, 0) or len(ahead)
+        del view
+
+        octets = bytearray(size if ME else size + 3)
+        octets[0:len(ahead)] = ahead
+        view = _octets_view(octets)
+        count = len(ahead) + self._readinto(view[len(ahead):])
+        fields = Record._decode_buffer_fields(view[0:count], 0)
+        self.ahead = octets[size:count]
+        self.offset += size
+        return fields[:7]
+
+    def _read(self, size):
+        octets = bytearray(size)
+        count = self._readinto(memoryview(octets))
+        return octets[0:count]
+
+    def _readinto(self, view):
+        # Fill the memoryview from the stream and return the number
+        # of octets read, which is less only at the end of data.
+        count = 0
+        while count < len(view):
+            n = self.stream.readinto(view[count:])
+            if not n:
+                break
+            count += n
+        return count
+
+
+class _ChunkedDecoder(object):
+    # Decodes records from the record fields of a stream or buffer
+    # decoder and reassembles chunked records. A chunk sequence
+    # starts with a record that has the CF flag set and continues
+    # with TNF 6 (unchanged) records up to the first record with CF
+    # not set. The chunk payloads are appended to one bytearray that
+    # is decoded once for a known record type or becomes the data of
+    # a generic record. Reassembly stops with a DecodeError when the
+    # payload would grow beyond limit octets. The payload of a record
+    # that is not selected is not assembled.
+    select = None
+
+    def __init__(self, decoder, limit):
+        self.decoder = decoder
+        self.limit = limit
+
+    @property
+    def offset(self):
+        return self.decoder.offset
+
+    def release(self):
+        self.decoder.release()
+
+    def decode(self, errors, known_types, lazy=False):
+        fields = self.decoder.decode_fields()
+        if fields is None:
+            return (None, False, False, False)
+
+        MB, ME, CF, TNF, TYPE, ID, PAYLOAD = fields
+        selected = self.select is None or self.select(TNF, TYPE, ID)
+        if CF:
+            if TNF == 6:
+                raise DecodeError('TNF value 6 in the first record chunk')
+            if len(PAYLOAD) > self.limit:
+                errstr = 'chunked record payload exceeds {} octets'
+                raise DecodeError(errstr.format(self.limit))
+            PAYLOAD = bytearray(PAYLOAD)
+        elif TNF == 6 and errors == 'strict':
+            raise DecodeError('TNF value 6 in a record that is not a chunk')
+
+        while CF:
+            if ME:
+                raise DecodeError('CF flag set in last record')
+            fields = self.decoder.decode_fields()
+            if fields is None:
+                raise DecodeError('missing the terminating record chunk')
+            mb, ME, CF, tnf, _, id, chunk = fields
+            if tnf != 6:
+                errstr = 'record chunk must have TNF value 6, not {}'
+                raise DecodeError(errstr.format(tnf))
+            if id:
+                raise DecodeError('record chunk must not have an ID field')
+            if mb and errors == 'strict':
+                raise DecodeError('MB flag set in middle record')
+            if len(PAYLOAD) + len(chunk) > self.limit:
+                errstr = 'chunked record payload exceeds {} octets'
+                raise DecodeError(errstr.format(self.limit))
+            if selected:
+                PAYLOAD += chunk
+
+        if not selected:
+            return (_SkippedRecord(TNF, TYPE), MB, ME, False)
+        record = Record._decode_fields(TNF, TYPE, ID, PAYLOAD,
+                                       errors, known_types, lazy)
+        return (record, MB, ME, False)
+
+
+RecordHeader = namedtuple('RecordHeader', 'offset, mb, me, cf, sr, il, tnf, '
+                          'type, id, payload_offset, payload_length')
+
+
+def scan_records(buffer, offset=0):
+    """The scan_records generator function walks the NDEF Record headers
+    in any object that supports the buffer protocol, from offset to
+    the end of the buffer, and yields a RecordHeader named tuple for
+    each record. The tuple holds the record offset, the MB, ME, CF, SR
+    and IL flags, the TNF value, the TYPE and ID field bytes, and the
+    offset and length of the PAYLOAD. No record objects are created and
+    no payload is read, the flags are reported but not verified.
+
+    >>> from ndef.message import scan_records
+    >>> octets = bytearray.fromhex('99010201553100 61 59010201553200 62')
+    >>> for header in scan_records(octets):
+    ...     print(header.offset, header.tnf, header.type, header.id,
+    ...           header.payload_offset, header.payload_length)
+    ...
+    0 1 b'U' b'1' 6 2
+    8 1 b'U' b'2' 14 2
+
+    A DecodeError is raised for a record that is truncated or has
+    invalid length fields.
+
+    """
+    view = _octets_view(buffer)
+    while True:
+        header = Record._decode_buffer_header(view, offset)
+        if header is None:
+            return
+        yield RecordHeader(offset, *header)
+        offset = header[8] + header[9]
+
+
+class MessageParser(object):
+    """The MessageParser class decodes NDEF Records from message octets
+    that are pushed to the parser in pieces of any size. The feed()
+    method returns the records that were completed by the new octets,
+    the octets of an incomplete record are kept until the next call.
+    The parser does no I/O, it works the same for data received from
+    a socket, a serial line or an asyncio protocol.
+
+    >>> from ndef.message import MessageParser
+    >>> parser = MessageParser()
+    >>> parser.feed(bytearray.fromhex('d1010e5402656e48'))
+    []
+    >>> parser.feed(bytearray.fromhex('656c6c6f20576f726c64'))
+    [ndef.text.TextRecord('Hello World', 'en', 'UTF-8')]
+    >>> parser.close()
+
+    The errors, known_types and lazy arguments are interpreted as for
+    message_decoder. With errors 'strict' or 'relax' a decoding error
+    is raised from feed() or, for a message or record that was not
+    completed, from close(). The records that the failed feed() call
+    completed before the error are the records attribute of the
+    exception. Any further feed() then raises a DecodeError until the
+    parser is reset with close(). With errors 'ignore' the parser
+    silently discards all further data after a decoding error. After
+    a record with the ME flag the parser expects the next message to
+    begin.
+
+    """
+    def __init__(self, errors='strict', known_types=Record._known_types,
+                 lazy=False):
+        self.errors = errors
+        self.known_types = known_types
+        self.lazy = lazy
+        self._buffer = bytearray()
+        self._size = None
+        self._types = known_types
+        self._in_message = False
+        self._failed = False
+
+    def feed(self, data):
+        """Append the bytes-like data to the octets already received and
+        return a list with the records that are now complete.
+
+        """
+        records = []
+        if self._failed:
+            if self.errors == 'ignore':
+                return records
+            error = DecodeError('data after a decoding error, close() the '
+                                'parser to reset it')
+            error.records = records
+            raise error
+        self._buffer += data
+        try:
+            offset = 0
+            while True:
+                result = self._decode_next(offset)
+                if result is None:
+                    break
+                record, mb, me, cf, offset = result
+                self._check_flags(record, mb, me, cf)
+                records.append(record)
+            del self._buffer[:offset]
+        except DecodeError as error:
+            self._failed = True
+            self._buffer = bytearray()
+            self._size = None
+            if self.errors == 'ignore':
+                return records
+            error.records = records
+            raise
+        return records
+
+    def close(self):
+        """Signal the end of data. Raises ndef.DecodeError if octets of an
+        incomplete record remain or, when errors is 'strict', if the
+        last record did not have the ME flag set. The parser can then
+        be used for new data.
+
+        """
+        remaining, in_message = len(self._buffer), self._in_message
+        failed = self._failed
+        self._buffer = bytearray()
+        self._size = None
+        self._in_message = False
+        self._failed = False
+        if failed or self.errors == 'ignore':
+            return
+        if remaining:
+            errstr = 'buffer underflow with {} octets of an incomplete record'
+            raise DecodeError(errstr.format(remaining))
+        if in_message and self.errors == 'strict':
+            raise DecodeError('ME flag not set in last record')
+
+    def _decode_next(self, offset):
+        # Decode the record at offset within the buffer and return the
+        # record, the MB, ME and CF flags, and the next offset, or None
+        # if the record is not yet complete. The record size is kept
+        # once known, so that a large payload received in many pieces
+        # is not parsed again on every call. The buffer view is not
+        # referenced after return and the buffer can be resized.
+        view = _octets_view(self._buffer)
+        if self._size is None:
+            self._size = Record._decode_buffer_size(view, offset)
+        if self._size is None or len(view) - offset < self._size:
+            return None
+        self._size = None
+        return Record._decode_buffer(view, offset, self.errors, self._types,
+                                     self.lazy)
+
+    def _check_flags(self, record, mb, me, cf):
+        # Verify the MB, ME and CF flags for the record position within
+        # the current message, this is the same as for message_decoder.
+        strict = self.errors == 'strict'
+        if not self._in_message:
+            if mb is False and strict:
+                raise DecodeError('MB flag not set in first record')
+            if self.known_types is Record._known_types:
+                self._types = type(record)._known_types
+        elif mb is True and strict:
+            raise DecodeError('MB flag set in middle record')
+        if me is True:
+            if cf is True and strict:
+                raise DecodeError('CF flag set in last record')
+            self._in_message = False
+            self._types = self.known_types
+        else:
+            self._in_message = True
+
+
+class MessageView(object):
+    """The MessageView class provides random access to the records of an
+    encoded NDEF Message in any object that supports the buffer
+    protocol. The record headers are read once to index the record
+    offsets, a record is decoded only when it is accessed and then
+    kept for later access. The view supports len(), iteration, index
+    and slice access, and the find() method to locate records by type
+    or name without decoding the other records.
+
+    >>> from ndef.message import MessageView
+    >>> octets = bytearray.fromhex('99010201553100 61 59010201553200 62')
+    >>> view = MessageView(octets)
+    >>> len(view), view.offsets
+    (2, (0, 8))
+    >>> view[-1]
+    ndef.uri.UriRecord('b')
+    >>> view.find(name='2') == view.find('urn:nfc:wkt:U')[1:]
+    True
+
+    The errors, known_types and lazy arguments are interpreted as for
+    message_decoder. The MB, ME and CF flags of all records are
+    verified by the index pass if errors is 'strict', the pass stops
+    at the first record with the ME flag. With errors 'ignore' the
+    view holds the records before the first decoding error. The view
+    references the buffer, which must not be modified while in use.
+
+    """
+    def __init__(self, buffer, errors='strict',
+                 known_types=Record._known_types, lazy=False):
+        self.errors = errors
+        self.known_types = known_types
+        self.lazy = lazy
+        self._types = known_types
+        self._buffer = _octets_view(buffer)
+        self._offsets = []
+        self._headers = []
+        try:
+            self._index()
+        except DecodeError:
+            if errors != 'ignore':
                 raise
-            else:
-                if record is None and errors == 'strict':
+        self._records = len(self._offsets) * [None]
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __iter__(self):
+        index = 0
+        while index < len(self._offsets):
+            record = self._decode(index)
+            if record is None:
+                return
+            yield record
+            index += 1
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            records = []
+            for index in range(*key.indices(len(self._offsets))):
+                record = None
+                if index < len(self._offsets):
+                    record = self._decode(index)
+                if record is not None:
+                    records.append(record)
+            return records
+        if key < 0:
+            key += len(self._offsets)
+        if not 0 <= key < len(self._offsets):
+            raise IndexError("MessageView index out of range")
+        record = self._decode(key)
+        if record is None:
+            raise IndexError("MessageView index out of range")
+        return record
+
+    def __repr__(self):
+        return "{}.{}(<{} records>)".format(
+            self.__module__, type(self).__name__, len(self))
+
+    @property
+    def offsets(self):
+        """A tuple with the buffer offset of each record."""
+        return tuple(self._offsets)
+
+    def find(self, type=None, name=None):
+        """Return a list of the records that have the given record type
+        and name, only the matching records are decoded. A None
+        argument matches any type or name. The name may be given as
+        str or, as for the Record name attribute, as bytes.
+
+        """
+        if type is not None:
+            TNF, TYPE = Record._encode_type(type)
+        if isinstance(name, (bytes, bytearray)):
+            ID = bytes(name)
+        elif name is not None:
+            try:
+                ID = name.encode('latin-1')
+            except AttributeError:
+                errstr = "name may be str, bytes or None, but not {}"
+                raise TypeError(errstr.format(name.__class__.__name__))
+        records = []
+        for index, header in enumerate(self._headers):
+            if type is not None and header[0:2] != (TNF, TYPE):
+                continue
+            if name is not None and header[2] != ID:
+                continue
+            record = self._decode(index)
+            if record is None:
+                break
+            records.append(record)
+        return records
+
+    def _index(self):
+        # Read the record headers from the buffer and append the offset
+        # and the TNF, TYPE and ID fields of each record up to the one
+        # with the ME flag or the end of data. The PAYLOAD is not read.
+        # As for message_decoder, the records after the first are
+        # decoded with the known types of the first record's class.
+        strict = self.errors == 'strict'
+        offset = 0
+        while True:
+            header = Record._decode_buffer_header(self._buffer, offset)
+            if header is None:
+                if self._offsets and strict:
                     raise DecodeError('ME flag not set in last record')
-                if mb is True and errors == 'strict':
-                    raise DecodeError('MB flag set in middle record')
+                return
+            MB, ME, CF, SR, IL, TNF, TYPE, ID = header[0:8]
+            if strict and MB is not (not self._offsets):
+                if MB is False:
+                    raise DecodeError('MB flag not set in first record')
+                raise DecodeError('MB flag set in middle record')
+            if strict and ME is True and CF is True:
+                raise DecodeError('CF flag set in last record')
+            if not self._offsets and \
+               self.known_types is Record._known_types:
+                self._types = _message_known_types(TNF, TYPE,
+                                                   self.known_types)
+            self._offsets.append(offset)
+            self._headers.append((TNF, TYPE, ID))
+            if ME is True:
+                return
+            offset = header[8] + header[9]
+
+    def _decode(self, index):
+        # Return the record at index, decoded on first access. A
+        # decoding error with errors set to 'ignore' drops the record
+        # and all that follow from the view, then None is returned.
+        record = self._records[index]
+        if record is None:
+            try:
+                known_types = self._types if index else self.known_types
+                record = Record._decode_buffer(
+                    self._buffer, self._offsets[index], self.errors,
+                    known_types, self.lazy)[0]
+            except DecodeError:
+                if self.errors != 'ignore':
+                    raise
+                del self._offsets[index:]
+                del self._headers[index:]
+                del self._records[index:]
+                return None
+            self._records[index] = record
+        return record
 
 
-def message_encoder(message=None, stream=None):
+def message_encoder(message=None, stream=None, chunk_size=None,
+                    max_payload_size=None):
     """The message_encoder generator function generates the encoded
     representation of an NDEF Message. The message argument is the
     iterable of ndef.record.Record class or subclass objects that
@@ -126,8 +1000,26 @@ def message_encoder(message=None, stream=None):
     >>> b''.join(results).hex()
     '900000100000500000'
 
+    If a chunk_size is given, the payload of a record that is longer
+    than chunk_size octets is split into a chunked record. The first
+    chunk has the record type and name, all further chunks have the
+    'unchanged' record type, and all octets of the record chunks are
+    generated as one result for the record. A record that is already
+    followed by an 'unchanged' type record is not split again.
+
+    >>> message = [Record('text/plain', '', b'He more text')]
+    >>> b''.join(message_encoder(message, chunk_size=5)).hex()
+    'b20a05746578742f706c61696e4865206d6f36000572652074655600027874'
+
+    The max_payload_size argument, if set, replaces the class limit
+    Record.MAX_PAYLOAD_SIZE for the records encoded by this call. An
+    ndef.record.StreamRecord is encoded into the stream with the
+    PAYLOAD octets copied from its source in blocks, which allows
+    encoding payloads of up to 4 GB without holding them in memory.
+
     """
-    encoder = _message_encoder(stream)
+    _check_chunk_size(chunk_size)
+    encoder = _message_encoder(stream, chunk_size, max_payload_size)
     if message is None:
         record = None
         while True:
@@ -147,7 +1039,146 @@ def message_encoder(message=None, stream=None):
         yield encoder.send(None)
 
 
-def _message_encoder(stream):
+def encode_message(message, chunk_size=None, max_payload_size=None):
+    """The encode_message function returns the encoded representation
+    of an NDEF Message as a single bytes object. The message argument
+    is the iterable of ndef.record.Record class or subclass objects
+    that shall be encoded. The record flags are determined in a single
+    pass over the message and the encoded record fields are joined
+    once into the message octets, without the per-record bytes that
+    are generated by message_encoder.
+
+    >>> from ndef.message import encode_message
+    >>> from ndef.record import Record
+    >>> message = [Record(), Record(), Record()]
+    >>> encode_message(message).hex()
+    '900000100000500000'
+
+    The result is the same as joining the bytes from message_encoder
+    for the same message, an empty message encodes as empty bytes. The
+    chunk_size argument splits longer payloads into record chunks and
+    max_payload_size replaces the payload limit, both as described for
+    message_encoder.
+
+    """
+    octets = []
+    for struct, header, TYPE, ID, PAYLOAD in _message_fields(
+            message, chunk_size, max_payload_size):
+        octets.append(struct.pack(*header) + TYPE + ID)
+        octets.append(bytes(PAYLOAD) if _PY2 else PAYLOAD)
+    return b''.join(octets)
+
+
+def encode_message_into(message, buffer, offset=0, chunk_size=None,
+                        max_payload_size=None):
+    """The encode_message_into function encodes an NDEF Message directly
+    into the writable buffer at offset and returns the offset after
+    the last record. The message argument is the iterable of
+    ndef.record.Record class or subclass objects that shall be
+    encoded. The buffer may be a bytearray, memoryview, mmap (on
+    Python 3) or any other object that supports the writable buffer
+    protocol. The size of the encoded message is determined before
+    anything is written, a ValueError is raised if it does not fit
+    into the buffer. The chunk_size argument splits longer payloads
+    into record chunks and max_payload_size replaces the payload
+    limit, both as described for message_encoder.
+
+    >>> from ndef.message import encode_message_into
+    >>> from ndef.record import Record
+    >>> buffer = bytearray(10)
+    >>> encode_message_into([Record(), Record(), Record()], buffer, 1)
+    10
+    >>> buffer.hex()
+    '00900000100000500000'
+
+    """
+    encoded = _message_fields(message, chunk_size, max_payload_size)
+    size = _message_size(encoded)
+
+    view = _octets_view(buffer, writable=True)
+    if not 0 <= offset <= len(view) - size:
+        errstr = "buffer of {} octets can not take {} octets at offset {}"
+        raise ValueError(errstr.format(len(view), size, offset))
+    for struct, header, TYPE, ID, PAYLOAD in encoded:
+        offset = Record._encode_into(view, offset, struct, header,
+                                     TYPE, ID, PAYLOAD)
+    return offset
+
+
+def encode_message_segments(message, chunk_size=None, max_payload_size=None):
+    """The encode_message_segments function returns the encoded
+    representation of an NDEF Message as a list of buffer segments
+    that are suitable for scatter/gather output with socket.sendmsg,
+    os.writev or a file's writelines method. The message argument is
+    the iterable of ndef.record.Record class or subclass objects that
+    shall be encoded. For each record there is one bytes segment with
+    the packed header, TYPE and ID fields and, unless the payload is
+    empty, a memoryview of the record's PAYLOAD. The payload octets
+    are never copied.
+
+    >>> from ndef.message import encode_message_segments
+    >>> from ndef.record import Record
+    >>> message = [Record('text/plain', '', b'ABC'), Record()]
+    >>> segments = encode_message_segments(message)
+    >>> [bytes(segment) for segment in segments]
+    [b'\\x92\\n\\x03text/plain', b'ABC', b'P\\x00\\x00']
+
+    The memoryview of a generic record's PAYLOAD references the
+    Record.data bytearray, which can not change size while any
+    segment still references it. The chunk_size argument splits longer
+    payloads into record chunks as described for message_encoder, the
+    PAYLOAD segment of each chunk is then a slice of the record's
+    PAYLOAD. The max_payload_size argument replaces the payload limit
+    as described for message_encoder. On Python 2, where file and
+    socket output does not accept a memoryview, the PAYLOAD segment is
+    a bytes copy.
+
+    """
+    segments = []
+    for struct, header, TYPE, ID, PAYLOAD in _message_fields(
+            message, chunk_size, max_payload_size):
+        segments.append(struct.pack(*header) + TYPE + ID)
+        if PAYLOAD:
+            segments.append(bytes(PAYLOAD) if _PY2 else memoryview(PAYLOAD))
+    return segments
+
+
+def _message_fields(message, chunk_size=None, max_payload_size=None):
+    # Return a list with the header struct, the header values, and
+    # the TYPE, ID and PAYLOAD fields of each record or record chunk
+    # in message. The MB, ME and CF flags are set for the position of
+    # the record. All records are type checked before the first is
+    # encoded. A max_payload_size replaces Record.MAX_PAYLOAD_SIZE.
+    _check_chunk_size(chunk_size)
+    records = list(message)
+    for record in records:
+        if not isinstance(record, Record):
+            errstr = "an ndef.Record class instance is required, not {}"
+            raise TypeError(errstr.format(type(record).__name__))
+
+    encoded = []
+    for index, record in enumerate(records):
+        me_flag = index == len(records) - 1
+        cf_flag = not me_flag and records[index+1].type == 'unchanged'
+        encoded.extend(record._encode_chunks(index == 0, me_flag, cf_flag,
+                                             chunk_size, max_payload_size))
+    return encoded
+
+
+def _message_size(encoded):
+    # Return the number of octets of the message from the encoded
+    # fields returned by _message_fields.
+    return sum([struct.size + len(TYPE) + len(ID) + len(PAYLOAD)
+                for struct, header, TYPE, ID, PAYLOAD in encoded])
+
+
+def _check_chunk_size(chunk_size):
+    if chunk_size is not None and chunk_size < 1:
+        errstr = "chunk_size must be a positive integer, not {}"
+        raise ValueError(errstr.format(chunk_size))
+
+
+def _message_encoder(stream, chunk_size=None, max_payload_size=None):
     mb_flag = True
     this_record = yield
     next_record = yield
@@ -157,7 +1188,8 @@ def _message_encoder(stream):
             raise TypeError(errstr.format(type(this_record).__name__))
         me_flag = next_record is None
         cf_flag = not me_flag and next_record.type == 'unchanged'
-        this_result = this_record._encode(mb_flag, me_flag, cf_flag, stream)
+        this_result = this_record._encode(mb_flag, me_flag, cf_flag, stream,
+                                          chunk_size, max_payload_size)
         this_record = next_record
         next_record = (yield this_result)
         mb_flag = False
@@ -16,7 +16,8 @@ from struct import Struct, error as struct_error
 from types import FunctionType, MethodType
 from abc import ABCMeta, abstractmethod
 from functools import wraps
-from io import BytesIO
+import io
+import os
 import re
 
 import sys
@@ -61,6 +62,40 @@ def encode_error(obj, fmt, *args, **kwargs):
     return EncodeError(mod + '.' + cls + " " + fmt.format(*args, **kwargs))
 
 
+# Precompiled Struct objects for the NDEF Record header, indexed by
+# the SR and IL flags as (SR << 1 | IL). The decode structs unpack the
+# TYPE_LENGTH, PAYLOAD_LENGTH and optional ID_LENGTH fields that follow
+# the first octet, the encode structs pack the complete header.
+_decode_header_structs = (
+    Struct('>BL'), Struct('>BLB'), Struct('>BB'), Struct('>BBB'))
+_encode_header_structs = (
+    Struct('>BBL'), Struct('>BBLB'), Struct('>BBB'), Struct('>BBBB'))
+
+# The first octet of an NDEF Record, unpacked from a buffer.
+_octet0_struct = Struct('>B')
+
+
+def _make_header_table():
+    # Return a 256 item tuple with the decoded MB, ME, CF, IL and TNF
+    # values and the length fields Struct for each possible value of
+    # the first octet of an NDEF Record. The item is None where the
+    # TNF value 7 is not allowed.
+    table = []
+    for octet0 in range(256):
+        MB = bool(octet0 & 0b10000000)
+        ME = bool(octet0 & 0b01000000)
+        CF = bool(octet0 & 0b00100000)
+        SR = bool(octet0 & 0b00010000)
+        IL = bool(octet0 & 0b00001000)
+        TNF = octet0 & 0b00000111
+        struct = _decode_header_structs[SR << 1 | IL]
+        table.append((MB, ME, CF, IL, TNF, struct) if TNF < 7 else None)
+    return tuple(table)
+
+
+_header_table = _make_header_table()
+
+
 class Record(object):
     """The Record class implements generic decoding and encoding of an
     NDEF Record. The NDEF Record TNF and TYPE fields are represented
@@ -111,6 +146,12 @@ class Record(object):
     # modifications.
     __hash__ = None
 
+    # Record instances have no __dict__, derived record classes add
+    # the slots for their own state. The _payload_cache and
+    # _lazy_payload slots are only set when used.
+    __slots__ = ('_type', '_name', '_data', '_payload_cache',
+                 '_lazy_payload')
+
     # NDEF supports up to 4 GB payload but it seems practical and wise
     # to restrict the maximum capacity we're dealing with to 1 MB.
     MAX_PAYLOAD_SIZE = 0x100000
@@ -138,6 +179,7 @@ class Record(object):
         if cls != Record and id(cls._known_types) == id(Record._known_types):
             cls._known_types = {}  # shadow Record.known_types
         cls._known_types[record_class._type] = record_class
+        _register_dispatch(cls._known_types, record_class)
 
     def __init__(self, type=None, name=None, data=None):
         """Initialize the Record instance with type, name and data
@@ -151,7 +193,7 @@ class Record(object):
             self._data = bytearray()
         elif isinstance(data, str):
             self._data = bytearray(data if _PY2 else data.encode('latin'))
-        elif isinstance(data, (bytearray, Sequence)):
+        elif isinstance(data, (bytearray, memoryview, Sequence)):
             self._data = bytearray(data)
         else:
             errstr = "data may be sequence or None, but not {}"
@@ -171,7 +213,10 @@ class Record(object):
         attribute is read-writable.
 
         """
-        return getattr(self, '_name', '')
+        try:
+            return object.__getattribute__(self, '_name')
+        except AttributeError:
+            return ''
 
     @name.setter
     def name(self, value):
@@ -201,11 +246,28 @@ class Record(object):
         bytes object (a bytes str for Python 2 - note that unlike the
         Python 3 bytes type this is a sequence of characters).
 
+        For the TextRecord, UriRecord, SmartposterRecord, Handover,
+        Bluetooth, Wi-Fi and SignatureRecord classes the encoded
+        PAYLOAD is cached until a property setter changes the record
+        or a list of contained records is modified. A record that
+        holds a bytearray, such as a Smartposter with an icon record,
+        is encoded on every access.
+
         """
         if type(self) is Record:
             return self._data
-        else:
+        key = self._payload_key()
+        if key is None:
             return bytes(self._encode_payload())
+        try:
+            cache = object.__getattribute__(self, '_payload_cache')
+        except AttributeError:
+            cache = None
+        if cache is not None and cache[0] == key:
+            return cache[1]
+        octets = bytes(self._encode_payload())
+        self._payload_cache = (key, octets)
+        return octets
 
     def __eq__(self, other):
         """Compare this Record instance against an other Record instance. The
@@ -219,6 +281,54 @@ class Record(object):
                 self.name == other.name and
                 self.data == other.data)
 
+    def _payload_key(self):
+        # Return None if the PAYLOAD is not cached, which is the
+        # default. A derived class that caches its PAYLOAD returns
+        # the state that may change without a property setter, such
+        # as the content of a list, and its setters clear the
+        # _payload_cache slot. The cached PAYLOAD is used while the
+        # key compares equal to the key stored with it.
+        return None
+
+    def __getattr__(self, name):
+        """Decode the PAYLOAD of a record that was returned by a lazy
+        message_decoder and then retry the attribute lookup. This is
+        only called when normal attribute lookup failed, which for a
+        lazy record is the first access to its decoded state. Any
+        DecodeError from decoding the PAYLOAD is raised here, and
+        again on any further access. Attributes that were assigned
+        before the PAYLOAD was decoded keep their value.
+
+        """
+        try:
+            if name.startswith('__') and name.endswith('__'):
+                raise AttributeError  # copy and pickle probe, no decode
+            octets, errors = object.__getattribute__(self, '_lazy_payload')
+        except AttributeError:
+            errstr = "'{}' object has no attribute '{}'"
+            raise AttributeError(errstr.format(type(self).__name__, name))
+        record = type(self)._decode_payload(octets, errors)
+        del self._lazy_payload
+        for attr, value in _instance_items(record):
+            try:
+                object.__getattribute__(self, attr)
+            except AttributeError:
+                object.__setattr__(self, attr, value)
+        return getattr(self, name)
+
+    def __getstate__(self):
+        """Return the instance attributes for copy and pickle. The _type
+        slot, that derived record classes shadow with a class
+        attribute, is only set for a generic Record. The cached
+        PAYLOAD is not included, a lazy record stays lazy.
+
+        """
+        return _instance_state(self)
+
+    def __setstate__(self, state):
+        """Restore the instance attributes from __getstate__."""
+        _restore_state(self, state)
+
     def __repr__(self):
         """Return a formal representation of the Record object."""
         return "{}.{}({:args})".format(
@@ -256,109 +366,401 @@ class Record(object):
     # private encode/decode interface for the message encoder/decoder
     #
 
-    def _encode(self, mb=False, me=False, cf=False, stream=None):
+    def _encode(self, mb=False, me=False, cf=False, stream=None,
+                chunk_size=None, max_payload_size=None):
         """Encode the NDEF record and return the encoded octets as a bytes
         object (if stream is None) or write the octets into the
         file-like byte stream and return the number of octets
         written. The mb, me, and cf arguments are interpreted as truth
         values for the NDEF Record Message Begin, Message End, and
-        Chunk Flag bits in the first octet.
+        Chunk Flag bits in the first octet. If chunk_size is set, a
+        longer PAYLOAD is encoded as a sequence of record chunks. The
+        max_payload_size, if set, replaces MAX_PAYLOAD_SIZE.
+
+        """
+        chunks = self._encode_chunks(mb, me, cf, chunk_size, max_payload_size)
+        # On Python 2 a bytearray PAYLOAD would turn the concatenation
+        # into a bytearray that b''.join() does not accept.
+        octets = b''.join([struct.pack(*header) + TYPE + ID +
+                           (bytes(PAYLOAD) if _PY2 else PAYLOAD)
+                           for struct, header, TYPE, ID, PAYLOAD in chunks])
+        return octets if stream is None else stream.write(octets)
+
+    def _encode_blocks(self, mb=False, me=False, cf=False, chunk_size=None,
+                       max_payload_size=None):
+        # Generate the encoded octets of the record in one or more
+        # blocks, for output that is written and flow controlled per
+        # block. A record with the PAYLOAD in memory is one block.
+        yield self._encode(mb, me, cf, None, chunk_size, max_payload_size)
+
+    def encode_into(self, buffer, offset=0, mb=False, me=False, cf=False):
+        """Encode the NDEF record directly into the writable buffer at
+        offset and return the offset after the encoded record. The
+        buffer may be a bytearray, memoryview, mmap (on Python 3) or
+        any other object that supports the writable buffer protocol.
+        The mb, me, and cf arguments are interpreted as truth values
+        for the NDEF Record Message Begin, Message End, and Chunk Flag
+        bits in the first octet. Raises ValueError if the buffer has
+        not enough space after offset, nothing is written in that case.
+
+        >>> import ndef
+        >>> buffer = bytearray(8)
+        >>> ndef.Record('urn:nfc:wkt:T', '', b'ab').encode_into(buffer, 1)
+        7
+        >>> buffer
+        bytearray(b'\\x00\\x11\\x01\\x02Tab\\x00')
 
         """
+        TNF, TYPE, ID, PAYLOAD = self._encode_fields()
+        struct, header = self._encode_header(TNF, TYPE, ID, len(PAYLOAD),
+                                             mb, me, cf)
+        view = _octets_view(buffer, writable=True)
+        size = struct.size + len(TYPE) + len(ID) + len(PAYLOAD)
+        if not 0 <= offset <= len(view) - size:
+            errstr = "buffer of {} octets can not take {} octets at offset {}"
+            raise self._value_error(errstr, len(view), size, offset)
+        return self._encode_into(view, offset, struct, header,
+                                 TYPE, ID, PAYLOAD)
+
+    @staticmethod
+    def _encode_into(view, offset, struct, header, TYPE, ID, PAYLOAD):
+        # Write the header and the TYPE, ID and PAYLOAD fields into
+        # the memoryview at offset and return the offset after the
+        # PAYLOAD. The view must have the space for all fields.
+        struct.pack_into(view, offset, *header)
+        offset += struct.size
+        for field in (TYPE, ID, PAYLOAD):
+            end = offset + len(field)
+            view[offset:end] = field
+            offset = end
+        return offset
+
+    def _encode_fields(self, max_payload_size=None):
+        # Return the NDEF Record TNF, TYPE, ID and PAYLOAD fields for
+        # encoding this record. TYPE and ID are bytes, the PAYLOAD is
+        # the record data (a bytearray for a generic record). Raises
+        # EncodeError if the PAYLOAD exceeds max_payload_size, by
+        # default MAX_PAYLOAD_SIZE.
+        # The 'latin-1' codec name is looked up faster than 'latin'.
         TNF, TYPE = self._encode_type(self.type)
         if TNF == 0:
             TYPE, ID, PAYLOAD = b'', b'', b''
         elif TNF == 5:
-            TYPE, ID, PAYLOAD = b'', self.name.encode('latin'), self.data
+            TYPE, ID, PAYLOAD = b'', self.name.encode('latin-1'), self.data
         elif TNF == 6:
             TYPE, ID, PAYLOAD = b'', b'', self.data
         else:
-            ID, PAYLOAD = self.name.encode('latin'), self.data
-
-        if len(PAYLOAD) > self.MAX_PAYLOAD_SIZE:
+            ID, PAYLOAD = self.name.encode('latin-1'), self.data
+
+        self._encode_check_length(len(PAYLOAD), max_payload_size)
+        return TNF, TYPE, ID, PAYLOAD
+
+    def _encode_check_length(self, PAYLOAD_LENGTH, max_payload_size=None):
+        # Raise EncodeError if PAYLOAD_LENGTH exceeds max_payload_size,
+        # by default MAX_PAYLOAD_SIZE, or the 32-bit PAYLOAD_LENGTH field.
+        if max_payload_size is None:
+            max_payload_size = self.MAX_PAYLOAD_SIZE
+        max_payload_size = min(max_payload_size, 0xffffffff)
+        if PAYLOAD_LENGTH > max_payload_size:
             errstr = "payload of more than {} octets can not be encoded"
-            raise self._encode_error(errstr.format(self.MAX_PAYLOAD_SIZE))
+            raise self._encode_error(errstr.format(max_payload_size))
+
+    def _encode_chunks(self, mb, me, cf, chunk_size=None,
+                       max_payload_size=None):
+        # Return a list of (struct, header, TYPE, ID, PAYLOAD) tuples
+        # that encode this record with the mb, me and cf flags. If
+        # chunk_size is set and the PAYLOAD is longer, the record is
+        # split into chunks of chunk_size octets. The first chunk has
+        # the record TNF, TYPE and ID, all further chunks have TNF 6
+        # (unchanged) and the CF flag is set on all but the last
+        # chunk. A record that is already part of a chunk sequence is
+        # not split again. On Python 3 the chunks are memoryview
+        # slices and the PAYLOAD octets are not copied.
+        TNF, TYPE, ID, PAYLOAD = self._encode_fields(max_payload_size)
+        if (not chunk_size or len(PAYLOAD) <= chunk_size
+                or cf or TNF in (0, 6)):
+            return [self._encode_header(TNF, TYPE, ID, len(PAYLOAD),
+                                        mb, me, cf)
+                    + (TYPE, ID, PAYLOAD)]
+
+        if not _PY2:
+            PAYLOAD = memoryview(PAYLOAD)
+        chunks = [PAYLOAD[offset:offset+chunk_size]
+                  for offset in range(0, len(PAYLOAD), chunk_size)]
+        encoded = [self._encode_header(TNF, TYPE, ID, len(chunks[0]),
+                                       mb, False, True)
+                   + (TYPE, ID, chunks[0])]
+        for chunk in chunks[1:-1]:
+            encoded.append(self._encode_header(6, b'', b'', len(chunk),
+                                               False, False, True)
+                           + (b'', b'', chunk))
+        encoded.append(self._encode_header(6, b'', b'', len(chunks[-1]),
+                                           False, me, False)
+                       + (b'', b'', chunks[-1]))
+        return encoded
+
+    @staticmethod
+    def _encode_header(TNF, TYPE, ID, PAYLOAD_LENGTH, mb, me, cf):
+        # Return the precompiled header struct and the tuple of values
+        # to pack for the record fields, i.e. octet0 with the MB, ME,
+        # CF, SR, IL and TNF bits followed by the TYPE, PAYLOAD and,
+        # if present, ID length. The struct index is SR << 1 | IL.
+        octet0 = (TNF | (0b10000000 if mb else 0) |
+                  (0b01000000 if me else 0) | (0b00100000 if cf else 0))
+        index = 0
+        if PAYLOAD_LENGTH < 256:
+            octet0, index = octet0 | 0b00010000, 2
+        if ID:
+            return (_encode_header_structs[index | 1],
+                    (octet0 | 0b00001000, len(TYPE), PAYLOAD_LENGTH, len(ID)))
+        return (_encode_header_structs[index],
+                (octet0, len(TYPE), PAYLOAD_LENGTH))
 
-        MB = 0b10000000 if mb else 0
-        ME = 0b01000000 if me else 0
-        CF = 0b00100000 if cf else 0
-        SR = 0b00010000 if len(PAYLOAD) < 256 else 0
-        IL = 0b00001000 if len(ID) > 0 else 0
+    @classmethod
+    def _decode(cls, stream, errors, known_types, lazy=False):
+        fields = cls._decode_stream_fields(stream)
+        if fields is None:
+            return (None, False, False, False)
 
-        octet0 = MB | ME | CF | SR | IL | TNF
-        struct = Struct('>BB' + ('B' if SR else 'L') + ('B' if IL else ''))
-        fields = (octet0, len(TYPE), len(PAYLOAD)) + ((len(ID),) if IL else ())
+        MB, ME, CF, TNF, TYPE, ID, PAYLOAD = fields
+        record = cls._decode_fields(TNF, TYPE, ID, PAYLOAD,
+                                    errors, known_types, lazy)
+        return (record, MB, ME, CF)
 
-        s = BytesIO() if stream is None else stream
-        n = s.write(struct.pack(*fields) + TYPE + ID + PAYLOAD)
-        return s.getvalue() if stream is None else n
+    @classmethod
+    def _decode_stream_fields(cls, stream):
+        # Read the NDEF record that follows in the file-like byte
+        # stream and return the MB, ME and CF flags with the TNF,
+        # TYPE, ID and PAYLOAD fields, or None if the stream has no
+        # more data.
+        header = cls._decode_stream_header(stream)
+        if header is None:
+            return None
+
+        PAYLOAD = cls._decode_stream_payload(stream, header[6])
+        return header[:6] + (PAYLOAD,)
 
     @classmethod
-    def _decode(cls, stream, errors, known_types):
+    def _decode_stream_header(cls, stream, max_payload_size=None):
+        # Read the NDEF record header and the TYPE and ID fields that
+        # follow in the file-like byte stream and return the MB, ME
+        # and CF flags, the TNF, TYPE and ID fields, the PAYLOAD_LENGTH
+        # and the size of the complete record, or None if the stream
+        # has no more data. The stream is then positioned at the first
+        # PAYLOAD octet.
         try:
             octet0 = ord(stream.read(1)[0]) if _PY2 else stream.read(1)[0]
         except IndexError:
-            return (None, False, False, False)
+            return None
 
-        MB = bool(octet0 & 0b10000000)
-        ME = bool(octet0 & 0b01000000)
-        CF = bool(octet0 & 0b00100000)
-        SR = bool(octet0 & 0b00010000)
-        IL = bool(octet0 & 0b00001000)
-        TNF = octet0 & 0b00000111
-
-        if TNF == 7:
-            raise cls._decode_error("TNF field value must be between 0 and 6")
+        MB, ME, CF, IL, TNF, struct = cls._decode_header(octet0)
 
         try:
-            struct = Struct('>B' + ('B' if SR else 'L') + ('B' if IL else ''))
-            fields = struct.unpack(stream.read(struct.size)) + (0,)
+            fields = struct.unpack(stream.read(struct.size))
         except struct_error:
             errstr = "buffer underflow at reading length fields"
             raise cls._decode_error(errstr)
 
-        try:
-            if TNF in (0, 5, 6):
-                assert fields[0] == 0, "TYPE_LENGTH must be 0"
-            if TNF == 0:
-                assert fields[2] == 0, "ID_LENGTH must be 0"
-                assert fields[1] == 0, "PAYLOAD_LENGTH must be 0"
-            if TNF in (1, 2, 3, 4):
-                assert fields[0] > 0, "TYPE_LENGTH must be > 0"
-        except AssertionError as error:
-            raise cls._decode_error(str(error) + " for TNF value {}", TNF)
-
-        if fields[1] > cls.MAX_PAYLOAD_SIZE:
-            errstr = "payload of more than {} octets can not be decoded"
-            raise cls._decode_error(errstr.format(cls.MAX_PAYLOAD_SIZE))
+        TYPE_LENGTH, PAYLOAD_LENGTH, ID_LENGTH = fields if IL else fields+(0,)
+        cls._decode_check_lengths(TNF, TYPE_LENGTH, PAYLOAD_LENGTH, ID_LENGTH,
+                                  max_payload_size)
+
+        TYPE = stream.read(TYPE_LENGTH)
+        if len(TYPE) != TYPE_LENGTH:
+            raise cls._decode_error("buffer underflow at reading TYPE field")
+        ID = stream.read(ID_LENGTH)
+        if len(ID) != ID_LENGTH:
+            raise cls._decode_error("buffer underflow at reading ID field")
+
+        size = 1 + struct.size + TYPE_LENGTH + ID_LENGTH + PAYLOAD_LENGTH
+        return (MB, ME, CF, TNF, TYPE, ID, PAYLOAD_LENGTH, size)
 
-        TYPE, ID, PAYLOAD = [stream.read(fields[i]) for i in (0, 2, 1)]
+    @classmethod
+    def _decode_stream_payload(cls, stream, PAYLOAD_LENGTH):
+        # Read and return the PAYLOAD_LENGTH octets of the PAYLOAD
+        # field from the file-like byte stream.
+        PAYLOAD = stream.read(PAYLOAD_LENGTH)
+        if len(PAYLOAD) != PAYLOAD_LENGTH:
+            errstr = "buffer underflow at reading PAYLOAD field"
+            raise cls._decode_error(errstr)
+        return PAYLOAD
+
+    @classmethod
+    def _decode_buffer(cls, buffer, offset, errors, known_types, lazy=False):
+        # Decode the NDEF record that starts at offset within the
+        # memoryview buffer and return the record, the MB, ME and CF
+        # flags, and the offset of the next record.
+        fields = cls._decode_buffer_fields(buffer, offset)
+        if fields is None:
+            return (None, False, False, False, offset)
+
+        MB, ME, CF, TNF, TYPE, ID, PAYLOAD, offset = fields
+        record = cls._decode_fields(TNF, TYPE, ID, PAYLOAD,
+                                    errors, known_types, lazy)
+        return (record, MB, ME, CF, offset)
+
+    @classmethod
+    def _decode_buffer_fields(cls, buffer, offset):
+        # Read the NDEF record that starts at offset within the
+        # memoryview buffer and return the MB, ME and CF flags, the
+        # TNF, TYPE, ID and PAYLOAD fields, and the offset of the
+        # next record, or None if there is no more data. The TYPE, ID
+        # and PAYLOAD fields are sliced from the buffer without
+        # copying, so that the only copy of a generic record PAYLOAD
+        # is the bytearray owned by the record.
+        header = cls._decode_buffer_header(buffer, offset)
+        if header is None:
+            return None
+
+        MB, ME, CF, SR, IL, TNF, TYPE, ID, offset, PAYLOAD_LENGTH = header
+        PAYLOAD = buffer[offset:offset+PAYLOAD_LENGTH]
+        offset = offset + PAYLOAD_LENGTH
+
+        return (MB, ME, CF, TNF, TYPE, ID, PAYLOAD, offset)
+
+    @classmethod
+    def _decode_buffer_header(cls, buffer, offset):
+        # Read the header of the NDEF record that starts at offset
+        # within the memoryview buffer and return the MB, ME, CF, SR
+        # and IL flags, the TNF, TYPE and ID fields, and the PAYLOAD
+        # offset and length, or None if there is no more data. The
+        # PAYLOAD must be within the buffer but is not read.
+        if offset >= len(buffer):
+            return None
+
+        octet0 = _octet0_struct.unpack_from(buffer, offset)[0]
+        MB, ME, CF, IL, TNF, struct = cls._decode_header(octet0)
 
         try:
-            assert fields[0] == len(TYPE), "TYPE field"
-            assert fields[2] == len(ID), "ID field"
-            assert fields[1] == len(PAYLOAD), "PAYLOAD field"
-        except AssertionError as error:
-            raise cls._decode_error("buffer underflow at reading {}", error)
-
-        record_type = cls._decode_type(TNF, TYPE)
-        if record_type in known_types:
-            record_cls = known_types[record_type]
-            min_payload_length = record_cls._decode_min_payload_length
-            max_payload_length = record_cls._decode_max_payload_length
+            fields = struct.unpack_from(buffer, offset + 1)
+        except struct_error:
+            errstr = "buffer underflow at reading length fields"
+            raise cls._decode_error(errstr)
+
+        TYPE_LENGTH, PAYLOAD_LENGTH, ID_LENGTH = fields if IL else fields+(0,)
+        cls._decode_check_lengths(TNF, TYPE_LENGTH, PAYLOAD_LENGTH, ID_LENGTH)
+
+        offset = offset + 1 + struct.size
+        if offset + TYPE_LENGTH > len(buffer):
+            raise cls._decode_error("buffer underflow at reading TYPE field")
+        TYPE = buffer[offset:offset+TYPE_LENGTH].tobytes()
+        offset = offset + TYPE_LENGTH
+        if offset + ID_LENGTH > len(buffer):
+            raise cls._decode_error("buffer underflow at reading ID field")
+        ID = buffer[offset:offset+ID_LENGTH].tobytes()
+        offset = offset + ID_LENGTH
+        if offset + PAYLOAD_LENGTH > len(buffer):
+            errstr = "buffer underflow at reading PAYLOAD field"
+            raise cls._decode_error(errstr)
+
+        SR = bool(octet0 & 0b00010000)
+        return (MB, ME, CF, SR, IL, TNF, TYPE, ID, offset, PAYLOAD_LENGTH)
+
+    @classmethod
+    def _decode_buffer_size(cls, buffer, offset):
+        # Return the number of octets of the NDEF record that starts
+        # at offset within the memoryview buffer, or None if the
+        # buffer ends before the length fields. The length fields are
+        # verified, so that an invalid record is reported before its
+        # octets are all available.
+        if offset >= len(buffer):
+            return None
+
+        octet0 = _octet0_struct.unpack_from(buffer, offset)[0]
+        MB, ME, CF, IL, TNF, struct = cls._decode_header(octet0)
+        if offset + 1 + struct.size > len(buffer):
+            return None
+
+        fields = struct.unpack_from(buffer, offset + 1)
+        TYPE_LENGTH, PAYLOAD_LENGTH, ID_LENGTH = fields if IL else fields+(0,)
+        cls._decode_check_lengths(TNF, TYPE_LENGTH, PAYLOAD_LENGTH, ID_LENGTH)
+        return 1 + struct.size + TYPE_LENGTH + ID_LENGTH + PAYLOAD_LENGTH
+
+    @classmethod
+    def _decode_header(cls, octet0):
+        # Return the MB, ME, CF, IL and TNF values and the length
+        # fields Struct for the first octet of an NDEF Record.
+        header = _header_table[octet0]
+        if header is None:
+            raise cls._decode_error("TNF field value must be between 0 and 6")
+        return header
+
+    @classmethod
+    def _decode_check_lengths(cls, TNF, TYPE_LENGTH, PAYLOAD_LENGTH,
+                              ID_LENGTH, max_payload_size=None):
+        # Verify the TYPE_LENGTH, PAYLOAD_LENGTH and ID_LENGTH values
+        # against the constraints of the TNF value and the
+        # max_payload_size limit, by default MAX_PAYLOAD_SIZE.
+        if TNF in (0, 5, 6) and TYPE_LENGTH != 0:
+            errstr = "TYPE_LENGTH must be 0 for TNF value {}"
+            raise cls._decode_error(errstr, TNF)
+        if TNF == 0 and ID_LENGTH != 0:
+            errstr = "ID_LENGTH must be 0 for TNF value {}"
+            raise cls._decode_error(errstr, TNF)
+        if TNF == 0 and PAYLOAD_LENGTH != 0:
+            errstr = "PAYLOAD_LENGTH must be 0 for TNF value {}"
+            raise cls._decode_error(errstr, TNF)
+        if TNF in (1, 2, 3, 4) and TYPE_LENGTH == 0:
+            errstr = "TYPE_LENGTH must be > 0 for TNF value {}"
+            raise cls._decode_error(errstr, TNF)
+
+        if max_payload_size is None:
+            max_payload_size = cls.MAX_PAYLOAD_SIZE
+        if PAYLOAD_LENGTH > max_payload_size:
+            errstr = "payload of more than {} octets can not be decoded"
+            raise cls._decode_error(errstr.format(max_payload_size))
+
+    @classmethod
+    def _decode_fields(cls, TNF, TYPE, ID, PAYLOAD, errors, known_types,
+                       lazy=False):
+        # Return a record for the NDEF Record TNF, TYPE, ID and
+        # PAYLOAD fields. The record is a known_types class instance
+        # if the record type is found in known_types, otherwise a
+        # generic Record. The PAYLOAD may be a bytes object, a
+        # memoryview or a bytearray, a known record type's
+        # _decode_payload method always receives bytes. A bytearray
+        # (a reassembled chunked payload) becomes the data of a
+        # generic Record without another copy. If lazy is True, a known type
+        # record is created without running _decode_payload, this
+        # happens on first access to an attribute that is not yet
+        # set (see Record.__getattr__).
+        dispatch = _dispatch_tables.get(id(known_types))
+        if dispatch is not None and dispatch[0] is known_types:
+            entry = dispatch[1].get((TNF, TYPE))
+            if entry and known_types.get(entry[0]) is not entry[1]:
+                entry = None  # the mapping was changed after registration
+        else:
+            entry = None
+        if entry is None:
+            record_type = cls._decode_type(TNF, TYPE)
+            if record_type in known_types:
+                entry = _dispatch_entry(record_type, known_types[record_type])
+        if entry is not None:
+            record_type, record_cls, min_payload_length, max_payload_length \
+                = entry
             if len(PAYLOAD) < min_payload_length:
                 errstr = "payload length can not be less than {}"
                 raise record_cls._decode_error(errstr, min_payload_length)
             if len(PAYLOAD) > max_payload_length:
                 errstr = "payload length can not be more than {}"
                 raise record_cls._decode_error(errstr, max_payload_length)
-            record = record_cls._decode_payload(PAYLOAD, errors)
+            if isinstance(PAYLOAD, memoryview):
+                PAYLOAD = PAYLOAD.tobytes()
+            elif isinstance(PAYLOAD, bytearray):
+                PAYLOAD = bytes(PAYLOAD)
+            if lazy:
+                record = record_cls.__new__(record_cls)
+                record._lazy_payload = (PAYLOAD, errors)
+            else:
+                record = record_cls._decode_payload(PAYLOAD, errors)
             assert isinstance(record, Record)
             record.name = ID
+        elif isinstance(PAYLOAD, bytearray):
+            record = Record(record_type, ID)
+            record._data = PAYLOAD
         else:
             record = Record(record_type, ID, PAYLOAD)
-
-        return (record, MB, ME, CF)
+        return record
 
     _decode_min_payload_length = 0
     _decode_max_payload_length = 0xffffffff
@@ -383,13 +785,25 @@ class Record(object):
         # plus TYPE, for TNF 0, 5, and 6 it is a fixed string, for TNF
         # 2 and 3 it is directly the TYPE string. Other TNF values are
         # not allowed.
+        # Results are memoized per (TNF, TYPE) so that decoding the
+        # same record type again returns the same string object.
+        try:
+            return _record_type_strings[(TNF, TYPE)]
+        except (KeyError, TypeError):
+            pass
         prefix = ('', 'urn:nfc:wkt:', '', '', 'urn:nfc:ext:',
                   'unknown', 'unchanged')
         if not 0 <= TNF <= 6:
             raise cls._value_error('NDEF Record TNF values must be 0 to 6')
         if TNF in (0, 5, 6):
-            TYPE = b''
-        return prefix[TNF] + (TYPE if _PY2 else TYPE.decode('ascii'))
+            record_type = prefix[TNF]
+        else:
+            record_type = prefix[TNF] + (TYPE if _PY2 else
+                                         TYPE.decode('ascii'))
+        if isinstance(TYPE, bytes):
+            _cache_insert(_record_type_strings, _RECORD_TYPES_CACHE_SIZE,
+                          (TNF, TYPE), record_type)
+        return record_type
 
     @classmethod
     def _encode_type(cls, value):
@@ -401,7 +815,12 @@ class Record(object):
         # 2. A record type that looks like an absolute URI becomes TNF
         # 3. Anything else produces a ValueError. A record type that
         # results in a TYPE field longer than 255 byte also produces a
-        # ValueError.
+        # ValueError. Results are memoized per record type value.
+        try:
+            return _record_types[value]
+        except (KeyError, TypeError):
+            pass
+
         if value is None:
             _value = b''
         elif isinstance(value, bytearray):
@@ -435,6 +854,9 @@ class Record(object):
             errstr = "an NDEF Record TYPE can not be more than 255 octet"
             raise cls._value_error(errstr)
 
+        if not isinstance(value, bytearray):
+            _cache_insert(_record_types, _RECORD_TYPES_CACHE_SIZE,
+                          value, (TNF, TYPE))
         return (TNF, TYPE)
 
     @classmethod
@@ -473,41 +895,21 @@ class Record(object):
         # ('H*', b'\x00\x0A\x31\x32\x33') -> (10, b'123')
         # ('*H', b'\x00\x01\x00\x02\x31') -> (1, 2, b'1')
         #
-        assert fmt[0] not in ('@', '=', '!'), "only '>' and '<' are allowed"
-        assert fmt.count('*') < 2, "only one '*' expression is allowed"
-        assert '*' not in fmt or fmt.find('*') > fmt.rfind('+')
-        order, fmt = (fmt[0], fmt[1:]) if fmt[0] in ('>', '<') else ('>', fmt)
+        # The format string is compiled only once into a sequence of
+        # decode operations that is then cached for further calls.
+        #
+        try:
+            decoder = _struct_decoders[fmt]
+        except KeyError:
+            try:
+                decoder = _compile_struct_decoder(fmt)
+            except struct_error as error:
+                raise cls._decode_error(str(error))
+            _cache_insert(_struct_decoders, _STRUCT_CACHE_SIZE, fmt, decoder)
         try:
             values = list()
-            this_fmt = fmt
-            while this_fmt:
-                this_fmt, plus_fmt, next_fmt = this_fmt.partition('+')
-                if '*' in this_fmt:
-                    this_fmt, next_fmt = this_fmt.split('*', 1)
-                    if this_fmt:
-                        next_fmt = '*' + next_fmt
-                    elif next_fmt:
-                        trailing = len(octets) - offset
-                        size_fmt = Struct(next_fmt).size
-                        this_fmt = int(trailing / size_fmt) * next_fmt
-                        next_fmt = '*' if trailing % size_fmt else ''
-                    else:
-                        this_fmt = str(len(octets) - offset) + 's'
-                        next_fmt = ''
-                struct = Struct(order + this_fmt)
-                values = values + list(struct.unpack_from(octets, offset))
-                offset = offset + struct.size
-                if plus_fmt:
-                    if next_fmt.startswith('('):
-                        this_fmt, next_fmt = next_fmt[1:].split(')', 1)
-                        struct = Struct(order + values.pop() * this_fmt)
-                        values.append(struct.unpack_from(octets, offset))
-                        offset = offset + struct.size
-                    else:
-                        struct = Struct('{:d}s'.format(values.pop()))
-                        values.extend(struct.unpack_from(octets, offset))
-                        offset = offset + struct.size
-                this_fmt = next_fmt
+            for operation in decoder:
+                offset = operation(octets, offset, values)
         except struct_error as error:
             raise cls._decode_error(str(error))
         else:
@@ -553,45 +955,22 @@ class Record(object):
         # ('H*', 10, b'123') -> b'\x00\x0A\x31\x32\x33'
         # ('*H', 1, 2, 3) -> b\x00\x01\x00\x02\x00\x03'
         #
-        assert fmt[0] not in ('@', '=', '!'), "only '>' and '<' are allowed"
-        assert fmt.count('*') < 2, "only one '*' expression is allowed"
-        assert '*' not in fmt or fmt.find('*') > fmt.rfind('+')
-        order, fmt = (fmt[0], fmt[1:]) if fmt[0] in ('>', '<') else ('>', fmt)
+        # The format string is compiled only once into a sequence of
+        # encode operations that is then cached for further calls.
+        #
+        try:
+            encoder = _struct_encoders[fmt]
+        except KeyError:
+            try:
+                encoder = _compile_struct_encoder(fmt)
+            except struct_error as error:
+                raise cls._encode_error(str(error))
+            _cache_insert(_struct_encoders, _STRUCT_CACHE_SIZE, fmt, encoder)
         try:
-            values = list(values)
             octets = list()
-            this_fmt = fmt
-            while this_fmt:
-                this_fmt, plus_fmt, next_fmt = this_fmt.partition('+')
-                if '*' in this_fmt:
-                    this_fmt, next_fmt = this_fmt.split('*', 1)
-                    if this_fmt:
-                        next_fmt = '*' + next_fmt
-                    elif next_fmt:
-                        this_fmt = len(values) * next_fmt
-                        next_fmt = ''
-                    else:
-                        this_fmt = str(len(values[0])) + 's'
-                        next_fmt = ''
-                vcount = len(this_fmt) - sum(map(str.isdigit, this_fmt))
-                if plus_fmt:
-                    assert this_fmt, "'+' character without preceeding format"
-                    if next_fmt.startswith('('):
-                        length = len(values[vcount-1])
-                        values.insert(vcount-1, length)
-                        this_fmt += length * next_fmt[1:].split(')', 1)[0]
-                        next_fmt = next_fmt[1:].split(')', 1)[1]
-                        values[vcount:vcount+1] = list(values[vcount])
-                        vcount = vcount + length
-                    else:
-                        vcount = vcount + 1
-                        length = len(values[vcount-2])
-                        values.insert(vcount-2, length)
-                        this_fmt = this_fmt + str(length) + 's'
-                struct = Struct(order + this_fmt)
-                octets.append(struct.pack(*values[0:vcount]))
-                del values[0:vcount]
-                this_fmt = next_fmt
+            index = 0
+            for operation in encoder:
+                index = operation(values, index, octets)
         except struct_error as error:
             raise cls._encode_error(str(error))
         else:
@@ -700,6 +1079,658 @@ class Record(object):
             raise cls._value_error(errstr, value)
 
 
+def _cache_insert(cache, size, key, value):
+    # Insert into a memoization dictionary that is cleared when it
+    # has grown to size entries.
+    if len(cache) >= size:
+        cache.clear()
+    cache[key] = value
+
+
+# The memoized Record._encode_type and Record._decode_type results,
+# mapping record type values to (TNF, TYPE) tuples and (TNF, TYPE)
+# tuples to record type strings.
+
+_RECORD_TYPES_CACHE_SIZE = 1024
+_record_types = dict()
+_record_type_strings = dict()
+
+# The decode dispatch tables for the known types mappings maintained
+# by Record.register_type. Each table maps the raw (TNF, TYPE) fields
+# of a registered record type to a tuple of the record type string,
+# the record class, and the class' minimum and maximum payload length
+# for decoding. The tables are indexed by id() of the known types
+# mapping, which is also kept to verify the identity.
+
+_dispatch_tables = dict()
+
+
+def _dispatch_entry(record_type, record_class):
+    return (record_type, record_class,
+            record_class._decode_min_payload_length,
+            record_class._decode_max_payload_length)
+
+
+def _register_dispatch(known_types, record_class):
+    try:
+        TNF, TYPE = Record._encode_type(record_class._type)
+    except (TypeError, ValueError):
+        return  # can still be found through the known types mapping
+    record_type = Record._decode_type(TNF, TYPE)
+    if known_types.get(record_type) is record_class:
+        table = _dispatch_tables.setdefault(id(known_types),
+                                            (known_types, dict()))[1]
+        table[(TNF, TYPE)] = _dispatch_entry(record_type, record_class)
+
+
+# The compiled extended struct format strings used by the
+# Record._decode_struct and Record._encode_struct methods. Each format
+# string maps to a tuple of operations that decode or encode one part
+# of the structure. The caches are cleared when they have grown to
+# _STRUCT_CACHE_SIZE entries, as some format strings are built at
+# runtime with a length value.
+
+_STRUCT_CACHE_SIZE = 256
+_struct_decoders = dict()
+_struct_encoders = dict()
+
+
+def _split_struct_format(fmt):
+    # Split an extended struct format string into the byte order
+    # character and a list of (kind, format) items. The kind is
+    # 'fixed' for plain struct format characters, 'bytes' and
+    # 'sequence' for a '+' without or with a following '(..)'
+    # expression, 'repeat' for a '*' with trailing format characters,
+    # and 'trailing' for a final '*' character.
+    assert fmt[0] not in ('@', '=', '!'), "only '>' and '<' are allowed"
+    assert fmt.count('*') < 2, "only one '*' expression is allowed"
+    assert '*' not in fmt or fmt.find('*') > fmt.rfind('+')
+    order, fmt = (fmt[0], fmt[1:]) if fmt[0] in ('>', '<') else ('>', fmt)
+    items = list()
+    this_fmt = fmt
+    while this_fmt:
+        this_fmt, plus_fmt, next_fmt = this_fmt.partition('+')
+        if '*' in this_fmt:
+            this_fmt, next_fmt = this_fmt.split('*', 1)
+            if this_fmt:
+                next_fmt = '*' + next_fmt
+            elif next_fmt:
+                items.append(('repeat', next_fmt))
+                next_fmt = ''
+            else:
+                items.append(('trailing', ''))
+        if plus_fmt:
+            assert this_fmt, "'+' character without preceeding format"
+            if next_fmt.startswith('('):
+                inner_fmt, next_fmt = next_fmt[1:].split(')', 1)
+                items.append(('sequence', this_fmt, inner_fmt))
+            else:
+                items.append(('bytes', this_fmt))
+        elif this_fmt:
+            items.append(('fixed', this_fmt))
+        this_fmt = next_fmt
+    return order, items
+
+
+def _value_count(fmt):
+    # Number of values packed or unpacked by a struct format string
+    # that contains no repeat counts except for the 's' format.
+    return len(fmt) - sum(map(str.isdigit, fmt))
+
+
+def _compile_struct_decoder(fmt):
+    order, items = _split_struct_format(fmt)
+    operations = list()
+    for item in items:
+        kind, this_fmt = item[0], item[1]
+        if kind == 'trailing':
+            operations.append(_decode_trailing_octets)
+        elif kind == 'repeat':
+            operations.append(_decode_repeated(Struct(order + this_fmt)))
+        else:
+            operations.append(_decode_fixed(Struct(order + this_fmt)))
+            if kind == 'bytes':
+                operations.append(_decode_counted_octets)
+            elif kind == 'sequence':
+                operations.append(_decode_sequence(order, item[2]))
+    return tuple(operations)
+
+
+def _decode_fixed(struct):
+    def operation(octets, offset, values):
+        values.extend(struct.unpack_from(octets, offset))
+        return offset + struct.size
+    return operation
+
+
+def _decode_counted_octets(octets, offset, values):
+    # Decode the number of octets given by the last decoded value.
+    length = values.pop()
+    if offset + length > len(octets):
+        Struct('{:d}s'.format(length)).unpack_from(octets, offset)
+    values.append(bytes(octets[offset:offset+length]))
+    return offset + length
+
+
+def _decode_trailing_octets(octets, offset, values):
+    # Decode all remaining octets.
+    if offset > len(octets):
+        Struct(str(len(octets) - offset) + 's')
+    values.append(bytes(octets[offset:]))
+    return len(octets)
+
+
+def _decode_sequence(order, fmt):
+    # Decode the format as many times as given by the last decoded
+    # value and return the values as a single tuple.
+    struct = Struct(order + fmt)
+
+    def operation(octets, offset, values):
+        count = values.pop()
+        if offset + count * struct.size > len(octets):
+            Struct(order + count * fmt).unpack_from(octets, offset)
+        sequence = list()
+        for _ in range(count):
+            sequence.extend(struct.unpack_from(octets, offset))
+            offset = offset + struct.size
+        values.append(tuple(sequence))
+        return offset
+    return operation
+
+
+def _decode_repeated(struct):
+    # Decode the format as often as it fits into the remaining octets
+    # and any leftover octets as a single bytes value.
+    def operation(octets, offset, values):
+        if offset > len(octets):
+            struct.unpack_from(octets, offset)
+        count = (len(octets) - offset) // struct.size
+        for _ in range(count):
+            values.extend(struct.unpack_from(octets, offset))
+            offset = offset + struct.size
+        if offset < len(octets):
+            values.append(bytes(octets[offset:]))
+        return len(octets)
+    return operation
+
+
+def _compile_struct_encoder(fmt):
+    order, items = _split_struct_format(fmt)
+    operations = list()
+    for item in items:
+        kind, this_fmt = item[0], item[1]
+        if kind == 'trailing':
+            operations.append(_encode_trailing_octets)
+        elif kind == 'repeat':
+            operations.append(_encode_repeated(order, this_fmt))
+        elif kind == 'fixed':
+            operations.append(_encode_fixed(order, this_fmt))
+        elif kind == 'bytes':
+            operations.append(_encode_counted_octets(order, this_fmt))
+        elif kind == 'sequence':
+            operations.append(_encode_sequence(order, this_fmt, item[2]))
+    return tuple(operations)
+
+
+def _encode_fixed(order, fmt):
+    struct, count = Struct(order + fmt), _value_count(fmt)
+
+    def operation(values, index, octets):
+        octets.append(struct.pack(*values[index:index+count]))
+        return index + count
+    return operation
+
+
+def _encode_octets(value):
+    # Return the octets of a bytes value that is to be packed with
+    # the 's' format character, raising the struct.error of that
+    # format for any other type.
+    if isinstance(value, (bytes, bytearray)):
+        return value
+    return Struct('{:d}s'.format(len(value))).pack(value)
+
+
+def _encode_trailing_octets(values, index, octets):
+    octets.append(_encode_octets(values[index]))
+    return index + 1
+
+
+def _encode_counted_octets(order, fmt):
+    # Encode len(value) with the last format character followed by
+    # the value octets.
+    struct, count = Struct(order + fmt), _value_count(fmt) - 1
+
+    def operation(values, index, octets):
+        value = values[index+count]
+        octets.append(struct.pack(*(values[index:index+count] +
+                                    (len(value),))))
+        octets.append(_encode_octets(value))
+        return index + count + 1
+    return operation
+
+
+def _encode_sequence(order, fmt, inner_fmt):
+    # Encode len(value) with the last format character followed by
+    # the sequence value items encoded with inner_fmt.
+    struct, count = Struct(order + fmt), _value_count(fmt) - 1
+    inner_struct = Struct(order + inner_fmt)
+    inner_count = _value_count(inner_fmt)
+
+    def operation(values, index, octets):
+        fixed, sequence = values[index:index+count], values[index+count]
+        if inner_count == 1:
+            octets.append(struct.pack(*(fixed + (len(sequence),))))
+            octets.extend([inner_struct.pack(item) for item in sequence])
+        else:
+            seq_struct = Struct(order + fmt + len(sequence) * inner_fmt)
+            octets.append(seq_struct.pack(*(fixed + (len(sequence),) +
+                                            tuple(sequence))))
+        return index + count + 1
+    return operation
+
+
+def _encode_repeated(order, fmt):
+    # Encode all remaining values with the format.
+    struct, count = Struct(order + fmt), _value_count(fmt)
+
+    def operation(values, index, octets):
+        if count == 1:
+            octets.extend([struct.pack(value) for value in values[index:]])
+        else:
+            struct_n = Struct(order + (len(values) - index) * fmt)
+            octets.append(struct_n.pack(*values[index:]))
+        return len(values)
+    return operation
+
+
+# A one-dimensional memoryview of unsigned bytes for decoding from or
+# encoding into any object that supports the buffer protocol.
+
+def _octets_view(buffer, writable=False):
+    view = memoryview(buffer)
+    if writable and view.readonly:
+        errstr = "a writable buffer is required, not {}"
+        raise TypeError(errstr.format(type(buffer).__name__))
+    if not _PY2 and (view.ndim != 1 or view.format != 'B'):
+        view = view.cast('B')
+    return view
+
+
+# The instance attributes of records, stored in slots or, for derived
+# classes that do not define __slots__, in the instance __dict__. The
+# slot descriptors of a record class are collected once per class.
+
+_class_slots = dict()
+
+
+def _instance_items(record):
+    cls = type(record)
+    try:
+        slots, has_dict = _class_slots[cls]
+    except KeyError:
+        slots, has_dict = [], False
+        for klass in reversed(cls.__mro__[:-1]):
+            names = klass.__dict__.get('__slots__')
+            if names is None:
+                has_dict = True
+                continue
+            for name in ((names,) if isinstance(names, str) else names):
+                if name == '__dict__':
+                    has_dict = True
+                elif name != '__weakref__':
+                    slots.append((name, klass.__dict__[name].__get__))
+        slots, has_dict = _class_slots[cls] = (tuple(slots), has_dict)
+    items = []
+    for name, get in slots:
+        try:
+            items.append((name, get(record)))
+        except AttributeError:
+            pass
+    if has_dict:
+        items.extend(object.__getattribute__(record, '__dict__').items())
+    return items
+
+
+def _instance_state(obj):
+    # Return the instance attributes of a slotted object as the state
+    # for copy and pickle, without a cached PAYLOAD. An unset slot is
+    # not included, as is the _type slot shadowed by the class
+    # attribute of a derived record class.
+    return dict([(attr, value) for attr, value in _instance_items(obj)
+                 if attr != '_payload_cache'])
+
+
+def _restore_state(obj, state):
+    # Set the instance attributes from the _instance_state of a copied
+    # or pickled object.
+    for attr, value in state.items():
+        object.__setattr__(obj, attr, value)
+
+
+class _LazyList(object):
+    # A data descriptor for a list attribute of a record class. The
+    # list is stored in the slot given by name and only created on
+    # first access, so that a record does not carry empty lists for
+    # the attributes that were never used. The record's __init__
+    # method sets the slot to None, an unset slot is only expected
+    # for a lazily decoded record.
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = getattr(instance, self.name, None)
+        if value is None:
+            value = []
+            setattr(instance, self.name, value)
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.name, value)
+
+
+# Return the PAYLOAD cache key for a sequence of values, or None if a
+# value is a bytearray that may be modified in place. The values are
+# compared by identity first, nothing is copied.
+def _values_key(values):
+    key = tuple(values)
+    for value in key:
+        if isinstance(value, bytearray):
+            return None
+    return key
+
+
+# Return the PAYLOAD cache key for a list of contained records, made
+# of the type, name and data of each record, or None if a record
+# holds its data in a bytearray. The data of a derived record is its
+# cached PAYLOAD, so a change of a contained record changes the key.
+def _records_key(records):
+    key = []
+    for record in records:
+        data = record.data
+        if isinstance(data, bytearray):
+            return None
+        key.append((record.type, record.name, data))
+    return tuple(key)
+
+
+class StreamRecord(Record):
+    """A generic NDEF Record with PAYLOAD octets that are read from a
+    file-like, byte-oriented stream of known length, rather than held
+    in memory. The message_decoder returns large generic records from
+    stream input as StreamRecord objects if the stream_payload_size
+    argument is set. The stream attribute is then a PayloadReader
+    positioned on the message stream at the first PAYLOAD octet.
+
+    >>> import io, ndef
+    >>> octets = bytearray.fromhex('d50005414243444553')
+    >>> stream = io.BytesIO(octets)
+    >>> decoder = ndef.message_decoder(stream, stream_payload_size=4)
+    >>> record = next(decoder)
+    >>> print(record)
+    NDEF Stream Record TYPE 'unknown' ID '' PAYLOAD 5 byte
+    >>> record.stream.read(2)
+    b'AB'
+    >>> record.stream.read()
+    b'CDE'
+
+    For encoding, the stream argument may also be the path of a file
+    or an mmap object. If length is None it is the size of the file or
+    the number of octets from the current position to the end of a
+    seekable stream or mmap. When the message_encoder writes into an
+    output stream, the PAYLOAD octets are copied from the source in
+    blocks and never held in memory as a whole. A seekable stream or
+    mmap is positioned back to the first PAYLOAD octet whenever the
+    payload is read, so the record can be encoded more than once. A
+    stream that is not seekable provides the payload only once, a
+    further read raises an EncodeError or, for the data attribute, a
+    DecodeError. The MAX_PAYLOAD_SIZE of a StreamRecord is the largest
+    32-bit PAYLOAD_LENGTH, 0xFFFFFFFF octets.
+
+    >>> record = ndef.StreamRecord('unknown', '', io.BytesIO(b'ABCDE'))
+    >>> ostream = io.BytesIO()
+    >>> list(ndef.message_encoder([record], ostream))
+    [8]
+    >>> ostream.getvalue()
+    b'\\xd5\\x00\\x05ABCDE'
+
+    """
+    __slots__ = ('_stream', '_length', '_start', '_spent')
+
+    # The PAYLOAD is copied from the source in blocks when encoded into
+    # a stream, only the 32-bit PAYLOAD_LENGTH field limits its size.
+    MAX_PAYLOAD_SIZE = 0xffffffff
+
+    def __init__(self, type=None, name=None, stream=None, length=None):
+        self._type = self._decode_type(*self._encode_type(type))
+        self.name = name
+        self._stream = stream
+        self._start = self._source_start(stream)
+        self._spent = False
+        if length is None:
+            length = 0 if stream is None else self._source_length(stream)
+        self._length = length
+
+    @property
+    def stream(self):
+        """The file-like, byte-oriented stream, the file path, or the mmap
+        that provides the PAYLOAD octets. The stream attribute is
+        read-only.
+
+        """
+        return self._stream
+
+    @property
+    def length(self):
+        """The number of PAYLOAD octets to read from the stream. The
+        length attribute is read-only.
+
+        """
+        return self._length
+
+    @property
+    def data(self):
+        """A bytearray with the PAYLOAD octets. On first access the
+        octets are read from the stream, which is then positioned after
+        the PAYLOAD.
+
+        """
+        try:
+            return object.__getattribute__(self, '_data')
+        except AttributeError:
+            pass
+        octets = bytearray()
+        errstr = "buffer underflow at reading PAYLOAD field"
+        source, opened = self._open_source(self._decode_error)
+        try:
+            for block in _read_blocks(source, self._length,
+                                      self._decode_error(errstr)):
+                octets.extend(block)
+        finally:
+            if opened:
+                source.close()
+        self._data = octets
+        return octets
+
+    def __format__(self, format_spec):
+        if format_spec == 'args':
+            return "{!r}, {!r}, {!r}, {!r}".format(
+                self.type, self.name, self.stream, self.length)
+        if format_spec == 'data':
+            return "PAYLOAD {} byte".format(self.length)
+        return super(StreamRecord, self).__format__(format_spec)
+
+    def __str__(self):
+        return "NDEF Stream Record TYPE '{r.type}' ID '{r.name}' {r:data}"\
+            .format(r=self)
+
+    def _encode(self, mb=False, me=False, cf=False, stream=None,
+                chunk_size=None, max_payload_size=None):
+        # Encode into the output stream block by block, see
+        # _encode_blocks. Without an output stream the record is
+        # encoded from its data.
+        if stream is None:
+            return super(StreamRecord, self)._encode(
+                mb, me, cf, stream, chunk_size, max_payload_size)
+        count = 0
+        for octets in self._encode_blocks(mb, me, cf, chunk_size,
+                                          max_payload_size):
+            stream.write(octets)
+            count += len(octets)
+        return count
+
+    def _encode_blocks(self, mb=False, me=False, cf=False, chunk_size=None,
+                       max_payload_size=None):
+        # Generate the header, TYPE and ID of the record (or of each
+        # record chunk) followed by the PAYLOAD octets read in blocks
+        # from the payload source. Only one block is held in memory
+        # at a time. If the data was already read, the record is
+        # encoded from its data.
+        TNF, TYPE = self._encode_type(self.type)
+        try:
+            object.__getattribute__(self, '_data')
+        except AttributeError:
+            from_source = TNF != 0
+        else:
+            from_source = False
+        if not from_source:
+            for octets in super(StreamRecord, self)._encode_blocks(
+                    mb, me, cf, chunk_size, max_payload_size):
+                yield octets
+            return
+
+        if TNF in (5, 6):
+            TYPE = b''
+        ID = b'' if TNF == 6 else self.name.encode('latin-1')
+        length = self._length
+        self._encode_check_length(length, max_payload_size)
+
+        sizes = [length]
+        if chunk_size and length > chunk_size and not cf and TNF != 6:
+            sizes = [chunk_size] * (length // chunk_size)
+            if length % chunk_size:
+                sizes.append(length % chunk_size)
+
+        errstr = "stream ended before {} PAYLOAD octets were read"
+        error = self._encode_error(errstr, length)
+        source, opened = self._open_source(self._encode_error)
+        try:
+            for index, size in enumerate(sizes):
+                last = index == len(sizes) - 1
+                struct, header = self._encode_header(
+                    TNF, TYPE, ID, size, mb, me and last, cf or not last)
+                yield struct.pack(*header) + TYPE + ID
+                for octets in _read_blocks(source, size, error):
+                    yield octets
+                TNF, TYPE, ID, mb = 6, b'', b'', False
+        finally:
+            if opened:
+                source.close()
+
+    def _open_source(self, error):
+        # Return the payload source as a readable object and whether
+        # it was opened here (from a file path) and must be closed. A
+        # seekable source is positioned at the first PAYLOAD octet, a
+        # source that is not seekable can be read only once, the
+        # error function makes the exception for a second read.
+        if not hasattr(self._stream, 'read'):
+            return open(self._stream, 'rb'), True
+        if self._start is not None:
+            self._stream.seek(self._start)
+        elif self._spent:
+            errstr = "payload stream is not seekable and was already read"
+            raise error(errstr)
+        self._spent = True
+        return self._stream, False
+
+    def _source_start(self, source):
+        # Return the position of the first PAYLOAD octet in a seekable
+        # stream or mmap source, or None for a file path and a stream
+        # that is not seekable.
+        if not hasattr(source, 'read'):
+            return None
+        try:
+            return source.tell()
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def _source_length(self, source):
+        # Return the size of the file at path source, or the number of
+        # octets from the current position to the end of a seekable
+        # stream or mmap source.
+        if not hasattr(source, 'read'):
+            return os.path.getsize(source)
+        try:
+            position = source.tell()
+            source.seek(0, 2)
+            length = source.tell() - position
+            source.seek(position)
+        except (AttributeError, OSError, ValueError):
+            errstr = "length is required for a stream that is not seekable"
+            raise self._value_error(errstr)
+        return length
+
+
+class PayloadReader(io.RawIOBase):
+    """A read-only, file-like object for the PAYLOAD octets of a record
+    that are read directly from the underlying stream. The reader
+    returns at most length octets and then signals end of file. A
+    DecodeError is raised if the underlying stream ends before.
+
+    """
+    def __init__(self, stream, length):
+        self._stream = stream
+        self._remaining = length
+        self.length = length
+
+    @property
+    def remaining(self):
+        """The number of PAYLOAD octets that were not yet read."""
+        return self._remaining
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        view = _octets_view(b, writable=True)
+        size = min(len(view), self._remaining)
+        if size == 0:
+            return 0
+        count = self._stream.readinto(view[:size])
+        if not count:
+            errstr = "buffer underflow at reading PAYLOAD field"
+            raise Record._decode_error(errstr)
+        self._remaining -= count
+        return count
+
+    def skip(self):
+        """Read over all remaining PAYLOAD octets and return their number.
+        This is done by the message_decoder before it decodes the next
+        record.
+
+        """
+        skipped = self._remaining
+        if skipped:
+            buffer = bytearray(min(skipped, 0x10000))
+            while self._remaining:
+                self.readinto(buffer)
+        return skipped
+
+
+def _read_blocks(source, size, error):
+    # Generate size octets read from the file-like source in blocks
+    # of up to 64 KiB. Raise error if the source ends before.
+    while size > 0:
+        octets = source.read(min(size, 0x10000))
+        if not octets:
+            raise error
+        yield octets
+        size -= len(octets)
+
+
 class GlobalRecord(Record):  # pragma: no cover
     """The GlobalRecord class is mostly to provide a namespace for
     grouping record classes in help(). Beyond that it is also an
@@ -708,6 +1739,7 @@ class GlobalRecord(Record):  # pragma: no cover
 
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         assert hasattr(self, '_type'),\
@@ -730,6 +1762,7 @@ class LocalRecord(Record):  # pragma: no cover
 
     """
     __metaclass__ = ABCMeta
+    __slots__ = ()
 
     def __init__(self, *args, **kwargs):
         assert hasattr(self, '_type'),\
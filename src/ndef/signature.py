@@ -16,7 +16,7 @@ store and an option URI to the next certificate in the chain.
 
 """
 from __future__ import absolute_import, division
-from .record import Record, GlobalRecord, convert
+from .record import Record, GlobalRecord, convert, _values_key
 from collections import namedtuple
 
 VersionTuple = namedtuple('Version', 'major, minor')
@@ -85,6 +85,9 @@ class SignatureRecord(GlobalRecord):
     ... ndef.message_encoder(records_verified))))
 
     """
+    __slots__ = ('_signature_type', '_hash_type', '_signature',
+                 '_signature_uri', '_certificate_format',
+                 '_certificate_store', '_certificate_uri')
     _type = 'urn:nfc:wkt:Sig'
     _version = 0x20  # this class implements v2.0 of the Signature RTD
     _mapping_signature_type = (
@@ -148,6 +151,7 @@ class SignatureRecord(GlobalRecord):
     @signature_type.setter
     def signature_type(self, value):
         self._signature_type = self._get_enum_signature_type(value)
+        self._payload_cache = None
 
     def _get_enum_signature_type(self, value):
         for enum, name in self._mapping_signature_type:
@@ -170,6 +174,7 @@ class SignatureRecord(GlobalRecord):
     @hash_type.setter
     def hash_type(self, value):
         self._hash_type = self._get_enum_hash_type(value)
+        self._payload_cache = None
 
     def _get_enum_hash_type(self, value):
         for enum, name in self._mapping_hash_type:
@@ -200,6 +205,7 @@ class SignatureRecord(GlobalRecord):
             errstr = "cannot set both signature and signature_uri"
             raise self._value_error(errstr)
         self._signature = value
+        self._payload_cache = None
 
     @property
     def signature_uri(self):
@@ -216,6 +222,7 @@ class SignatureRecord(GlobalRecord):
             errstr = "cannot set both signature and signature_uri"
             raise self._value_error(errstr)
         self._signature_uri = value
+        self._payload_cache = None
 
     @property
     def certificate_format(self):
@@ -225,6 +232,7 @@ class SignatureRecord(GlobalRecord):
     @certificate_format.setter
     def certificate_format(self, value):
         self._certificate_format = self._get_enum_certificate_format(value)
+        self._payload_cache = None
 
     def _get_enum_certificate_format(self, value):
         for enum, name in self._mapping_certificate_format:
@@ -266,6 +274,7 @@ class SignatureRecord(GlobalRecord):
     @convert('value_to_unicode')
     def certificate_uri(self, value):
         self._certificate_uri = value
+        self._payload_cache = None
 
     def __format__(self, format_spec):
         if format_spec == 'args':
@@ -289,6 +298,11 @@ class SignatureRecord(GlobalRecord):
 
         return super(SignatureRecord, self).__format__(format_spec)
 
+    def _payload_key(self):
+        # The signature and certificates may be bytearrays that are
+        # modified in place, the certificate store is a list.
+        return _values_key([self._signature] + self._certificate_store)
+
     def _encode_payload(self):
 
         # Version Field
@@ -13,7 +13,8 @@ resource.
 """
 from __future__ import absolute_import, division
 from .message import message_decoder, message_encoder
-from .record import Record, GlobalRecord, LocalRecord, convert
+from .record import Record, GlobalRecord, LocalRecord, convert, _LazyList
+from .record import _records_key
 from .text import TextRecord
 from .uri import UriRecord
 
@@ -25,6 +26,7 @@ class ActionRecord(LocalRecord):
     action that strategy for acting on the resource.
 
     """
+    __slots__ = ('_action',)
     _type = 'urn:nfc:wkt:act'
     _action_strings = ('exec', 'save', 'edit')
 
@@ -87,6 +89,7 @@ class SizeRecord(LocalRecord):
     to by the IRI/URI as a 32-bit unsigned integer.
 
     """
+    __slots__ = ('_value',)
     _type = 'urn:nfc:wkt:s'
 
     def __init__(self, resource_size=None):
@@ -135,6 +138,7 @@ class TypeRecord(LocalRecord):
     to by the IRI/URI as a, typically mime-type, string.
 
     """
+    __slots__ = ('_value',)
     _type = 'urn:nfc:wkt:t'
 
     def __init__(self, resource_type=None):
@@ -191,8 +195,21 @@ class SmartposterRecord(GlobalRecord):
     >>> record.action = 'exec'
 
     """
+    __slots__ = ('_title_records', '_uri_records', '_action_records',
+                 '_icon_records', '_size_records', '_type_records')
     _type = 'urn:nfc:wkt:Sp'
 
+    # The lists of sub-records are created on first use, see the
+    # _records method for read access that does not create them. The
+    # slots are initialized with None so that reading an unused list
+    # does not fail over to Record.__getattr__.
+    title_records = _LazyList('_title_records')
+    uri_records = _LazyList('_uri_records')
+    action_records = _LazyList('_action_records')
+    icon_records = _LazyList('_icon_records')
+    size_records = _LazyList('_size_records')
+    type_records = _LazyList('_type_records')
+
     def __init__(self, resource='', title=None, action=None, icon=None,
                  resource_size=None, resource_type=None):
         """Initialize the record with resource, title, action, icon,
@@ -207,12 +224,9 @@ class SmartposterRecord(GlobalRecord):
         an integer.
 
         """
-        self.title_records = []
-        self.uri_records = []
-        self.action_records = []
-        self.icon_records = []
-        self.size_records = []
-        self.type_records = []
+        self._title_records = self._uri_records = None
+        self._action_records = self._icon_records = None
+        self._size_records = self._type_records = None
         if resource is not None:
             self.resource = resource
         if title is not None:
@@ -253,7 +267,7 @@ class SmartposterRecord(GlobalRecord):
 
         """
         try:
-            return self.uri_records[0]
+            return self._records('uri_records')[0]
         except IndexError:
             return None
 
@@ -268,7 +282,8 @@ class SmartposterRecord(GlobalRecord):
     @property
     def titles(self):
         """Get a dictionary of all titles with {language: text} items."""
-        return dict([(t.language, t.text) for t in self.title_records])
+        return dict([(t.language, t.text)
+                     for t in self._records('title_records')])
 
     @property
     def title(self):
@@ -282,7 +297,7 @@ class SmartposterRecord(GlobalRecord):
         except KeyError:
             pass
         try:
-            return self.title_records[0].text
+            return self._records('title_records')[0].text
         except IndexError:
             return None
 
@@ -308,7 +323,7 @@ class SmartposterRecord(GlobalRecord):
 
         """
         try:
-            return self.action_records[0].action
+            return self._records('action_records')[0].action
         except IndexError:
             return None
 
@@ -332,14 +347,15 @@ class SmartposterRecord(GlobalRecord):
         except KeyError:
             pass
         try:
-            return self.icon_records[0].data
+            return self._records('icon_records')[0].data
         except IndexError:
             return None
 
     @property
     def icons(self):
         """Get a dictionary of all icons with {mime-type: icon-data} items."""
-        return dict([(r.type, r.data) for r in self.icon_records])
+        return dict([(r.type, r.data)
+                     for r in self._records('icon_records')])
 
     def add_icon(self, icon_type, icon_data):
         """Add a Smartposter icon as icon_data bytes for the image or video
@@ -360,7 +376,7 @@ class SmartposterRecord(GlobalRecord):
 
         """
         try:
-            return self.size_records[0].resource_size
+            return self._records('size_records')[0].resource_size
         except IndexError:
             return None
 
@@ -380,7 +396,7 @@ class SmartposterRecord(GlobalRecord):
 
         """
         try:
-            return self.type_records[0].resource_type
+            return self._records('type_records')[0].resource_type
         except IndexError:
             return None
 
@@ -402,7 +418,7 @@ class SmartposterRecord(GlobalRecord):
             s = ["{r.resource:data}"]
             if self.title:
                 s.append("Title '{r.title}'")
-            if len(self.icon_records) > 0:
+            if len(self._records('icon_records')) > 0:
                 icon_types = [r.type for r in self.icon_records]
                 s.append(" ".join(["Icon '{}'".format(t) for t in icon_types]))
             if self.action:
@@ -415,10 +431,23 @@ class SmartposterRecord(GlobalRecord):
 
         return super(SmartposterRecord, self).__format__(format_spec)
 
+    def _records(self, name):
+        # Return the list of sub-records for the attribute name, or
+        # an empty tuple if the list was not yet created.
+        return getattr(self, '_' + name, None) or ()
+
+    _encode_records = ('uri_records', 'title_records', 'action_records',
+                       'icon_records', 'size_records', 'type_records')
+
+    def _payload_key(self):
+        key = tuple([_records_key(self._records(name))
+                     for name in self._encode_records])
+        return None if None in key else key
+
     def _encode_payload(self):
-        records = (
-            self.uri_records + self.title_records + self.action_records +
-            self.icon_records + self.size_records + self.type_records)
+        records = []
+        for name in self._encode_records:
+            records.extend(self._records(name))
         return b''.join(list(message_encoder(records)))
 
     @classmethod
@@ -440,7 +469,7 @@ class SmartposterRecord(GlobalRecord):
             elif record.type == 'urn:nfc:wkt:t':
                 sp_record.type_records.append(record)
         if errors == 'strict':
-            uri_record_count = len(sp_record.uri_records)
+            uri_record_count = len(sp_record._records('uri_records'))
             if uri_record_count != 1:
                 errmsg = "payload must contain exactly one URI Record, got {}"
                 raise cls._decode_error(errmsg.format(uri_record_count))
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""Decoding and encoding of NDEF Messages in NFC Forum Tag memory images.
+
+The memory image of a Type 1 or Type 2 Tag holds the NDEF Message in
+the value of an NDEF Message TLV within the data area that follows the
+Capability Container. A Type 3 Tag image starts with the Attribute
+Information Block and a Type 4 Tag NDEF file with the 2 octet NLEN
+field, both followed directly by the message octets.
+
+"""
+from __future__ import absolute_import, division
+
+import struct
+from .record import Record, DecodeError
+from .record import _PY2, _octets_view
+from .message import message_decoder, _message_fields, _message_size
+
+
+def find_messages(memory, tag_type):
+    """The find_messages generator function locates the NDEF Messages in
+    the memory image of an NFC Forum Type 1, 2, 3 or 4 Tag and yields
+    the offset and a memoryview of each message. The memory argument
+    may be any object that supports the buffer protocol, the message
+    octets are not copied. For a Type 1 or 2 Tag the image starts with
+    the first memory block or page and every NDEF Message TLV before
+    the Terminator TLV is reported. For a Type 3 Tag the image starts
+    with the Attribute Information Block and for a Type 4 Tag it is
+    the NDEF file that starts with the NLEN field. On Python 2 the
+    message octets are yielded as a bytearray copy.
+
+    >>> import ndef
+    >>> memory = bytearray.fromhex('04010203 04050607 08090000 e1100600')
+    >>> memory += bytearray.fromhex('0103a00c34 0303d00000 fe000000')
+    >>> for offset, octets in ndef.tag.find_messages(memory, 2):
+    ...     print(offset, bytearray(octets).hex())
+    ...
+    23 d00000
+
+    """
+    if tag_type not in (1, 2, 3, 4):
+        errstr = "tag_type must be 1, 2, 3 or 4, not {!r}"
+        raise ValueError(errstr.format(tag_type))
+
+    # Python 2 memoryview items are strings and a memoryview does not
+    # convert to bytes, so the messages are slices of an octets copy.
+    view = _octets_view(memory)
+    octets = bytearray(view) if _PY2 else view
+    if _PY2:
+        view = octets
+
+    if tag_type == 1:
+        offset, end = _type_1_data_area(octets)
+    elif tag_type == 2:
+        offset, end = _type_2_data_area(octets)
+    elif tag_type == 3:
+        yield _type_3_message(view, octets)
+        return
+    else:
+        yield _type_4_message(view, octets)
+        return
+
+    for offset, length in _ndef_message_tlvs(octets, offset, end):
+        yield (offset, view[offset:offset+length])
+
+
+def messages_decoder(memory, tag_type, errors='strict',
+                     known_types=Record._known_types, lazy=False):
+    """The messages_decoder generator function decodes the NDEF Messages
+    found in the memory image of an NFC Forum Type 1, 2, 3 or 4 Tag and
+    yields the offset of each message in the image and the list of
+    decoded records. The messages are located with find_messages, the
+    errors, known_types and lazy arguments are interpreted as for
+    ndef.message_decoder. An empty NDEF Message TLV, as found on an
+    initialized tag, yields an empty record list.
+
+    >>> import ndef
+    >>> memory = bytearray.fromhex('0006 d10102550061')
+    >>> for offset, records in ndef.tag.messages_decoder(memory, 4):
+    ...     print(offset, records)
+    ...
+    2 [ndef.uri.UriRecord('a')]
+
+    """
+    for offset, octets in find_messages(memory, tag_type):
+        decoder = message_decoder(octets, errors, known_types, lazy)
+        yield (offset, list(decoder))
+
+
+def encode_memory(message, tag_type, memory_size=None, chunk_size=None):
+    """The encode_memory function returns a bytearray with the memory
+    image of an NFC Forum Type 2 or Type 4 Tag that holds the encoded
+    NDEF Message. The image has memory_size octets or, if memory_size
+    is None, the minimum size required for the message. The image is
+    produced with encode_memory_into, the octets before the Type 2 Tag
+    Capability Container and after the end of the data are zero.
+
+    >>> import ndef
+    >>> memory = ndef.tag.encode_memory([ndef.Record()], 2)
+    >>> len(memory), memory[12:].hex()
+    (24, 'e11001000303d00000fe0000')
+    >>> ndef.tag.encode_memory([ndef.Record()], 4).hex()
+    '0003d00000'
+
+    """
+    _check_encode_tag_type(tag_type)
+    encoded = _message_fields(message, chunk_size)
+    size = _message_size(encoded)
+    if memory_size is None:
+        if tag_type == 2:
+            tlv_size = (2 if size < 255 else 4) + size + 1
+            memory_size = 16 + (tlv_size + 7) // 8 * 8
+        else:
+            memory_size = 2 + size
+    memory = bytearray(memory_size)
+    _encode_memory(encoded, size, _octets_view(memory), tag_type)
+    return memory
+
+
+def encode_memory_into(message, buffer, tag_type, chunk_size=None):
+    """The encode_memory_into function encodes an NDEF Message into the
+    writable buffer that holds the memory image of an NFC Forum Type 2
+    or Type 4 Tag and returns the number of image octets written. The
+    size of the encoded message is determined before anything is
+    written, a ValueError is raised if it does not fit into the tag
+    memory. The chunk_size argument splits longer payloads into record
+    chunks as described for ndef.message_encoder.
+
+    For a Type 2 Tag, the buffer is the memory from the first page and
+    its size determines the data area. The Capability Container is
+    written to the fourth page, followed by the NDEF Message TLV with a
+    1 or 3 octet length field and the Terminator TLV, padded with zeros
+    to the page size. The first three pages, with the tag UID and lock
+    bytes, are not written. For a Type 4 Tag, the buffer is the NDEF
+    file that receives the NLEN field and the message.
+
+    >>> import ndef
+    >>> buffer = bytearray(64)
+    >>> ndef.tag.encode_memory_into([ndef.Record()], buffer, 2)
+    24
+    >>> buffer[12:24].hex()
+    'e11006000303d00000fe0000'
+
+    """
+    _check_encode_tag_type(tag_type)
+    encoded = _message_fields(message, chunk_size)
+    size = _message_size(encoded)
+    return _encode_memory(encoded, size, _octets_view(buffer, True), tag_type)
+
+
+def _check_encode_tag_type(tag_type):
+    if tag_type not in (2, 4):
+        errstr = "tag_type must be 2 or 4, not {!r}"
+        raise ValueError(errstr.format(tag_type))
+
+
+# Write the encoded message of size octets into the tag memory view
+# and return the number of image octets written. The 2 octet length
+# of the NDEF Message TLV and the NLEN field limit the message size to
+# 0xFFFE octets.
+def _encode_memory(encoded, size, view, tag_type):
+    if size > 0xFFFE:
+        errstr = "a message of {} octets can not be stored on a Type {} Tag"
+        raise ValueError(errstr.format(size, tag_type))
+
+    if tag_type == 2:
+        data_size = min(255, max(0, len(view) - 16) // 8) * 8
+        if size < 255:
+            header = struct.pack('>BB', 0x03, size)
+        else:
+            header = struct.pack('>BBH', 0x03, 0xFF, size)
+        if len(header) + size + 1 > data_size:
+            errstr = "Type 2 Tag data area of {} octets can not take " \
+                     "a message of {} octets"
+            raise ValueError(errstr.format(data_size, size))
+        view[12:16] = struct.pack('>BBBB', 0xE1, 0x10, data_size // 8, 0)
+        offset = 16
+    else:
+        header = struct.pack('>H', size)
+        if len(header) + size > len(view):
+            errstr = "Type 4 Tag NDEF file of {} octets can not take " \
+                     "a message of {} octets"
+            raise ValueError(errstr.format(len(view), size))
+        offset = 0
+
+    view[offset:offset+len(header)] = header
+    offset += len(header)
+    for fields in encoded:
+        offset = Record._encode_into(view, offset, *fields)
+
+    if tag_type == 2:
+        end = (offset + 4) // 4 * 4
+        view[offset:end] = b'\xfe' + (end - offset - 1) * b'\x00'
+        offset = end
+    return offset
+
+
+# Find the start and end offset of the TLV area in a Type 1 Tag memory
+# image. The Capability Container is the first 4 octets of the second
+# 8 octet block and the data area starts right after it at offset 12,
+# in the same block. The memory size is 8 octets times the TMS value
+# plus one, for the static memory layout with TMS 0x0E the last two
+# blocks are reserved.
+def _type_1_data_area(octets):
+    _check_capability_container(octets, 8, 1)
+    tms = octets[10]
+    end = 104 if tms == 0x0E else 8 * (tms + 1)
+    return (12, min(end, len(octets)))
+
+
+# Find the start and end offset of the TLV area in a Type 2 Tag memory
+# image. The Capability Container is the fourth 4 octet page and the
+# data area of 8 times the third CC octet starts with the fifth page.
+def _type_2_data_area(octets):
+    _check_capability_container(octets, 12, 2)
+    return (16, min(16 + 8 * octets[14], len(octets)))
+
+
+def _check_capability_container(octets, offset, tag_type):
+    if len(octets) < offset + 4:
+        errstr = "Type {} Tag memory of {} octets has no capability container"
+        raise DecodeError(errstr.format(tag_type, len(octets)))
+    if octets[offset] != 0xE1:
+        errstr = "Type {} Tag capability container has no NDEF magic number"
+        raise DecodeError(errstr.format(tag_type))
+
+
+# Return the offset and memoryview of the NDEF Message in a Type 3 Tag
+# memory image. The Attribute Information Block is the first 16 octet
+# block, the message length Ln is encoded in octets 11 to 13 and the
+# octets 14 and 15 are the sum of the octets 0 to 13.
+def _type_3_message(view, octets):
+    if len(octets) < 16:
+        errstr = "Type 3 Tag memory of {} octets has no attribute block"
+        raise DecodeError(errstr.format(len(octets)))
+    if sum(octets[0:14]) != octets[14] << 8 | octets[15]:
+        raise DecodeError("Type 3 Tag attribute block checksum error")
+    length = octets[11] << 16 | octets[12] << 8 | octets[13]
+    if 16 + length > len(octets):
+        errstr = "buffer underflow at reading Type 3 Tag data of {} octets"
+        raise DecodeError(errstr.format(length))
+    return (16, view[16:16+length])
+
+
+# Return the offset and memoryview of the NDEF Message in a Type 4 Tag
+# NDEF file, that is the 2 octet NLEN field followed by the message.
+def _type_4_message(view, octets):
+    if len(octets) < 2:
+        raise DecodeError("buffer underflow at reading Type 4 Tag NLEN field")
+    length = octets[0] << 8 | octets[1]
+    if 2 + length > len(octets):
+        errstr = "buffer underflow at reading Type 4 Tag file of {} octets"
+        raise DecodeError(errstr.format(length))
+    return (2, view[2:2+length])
+
+
+# Walk the TLV blocks between offset and end and yield the value
+# offset and length of each NDEF Message TLV. NULL TLVs have only the
+# T field, the L field is one octet or 0xFF and two more octets, the
+# walk ends with the Terminator TLV or at the end of the data area.
+# The value of a TLV is taken as contiguous, memory areas reserved by
+# Lock or Memory Control TLVs must not be within the NDEF Message.
+def _ndef_message_tlvs(octets, offset, end):
+    while offset < end:
+        tlv_type = octets[offset]
+        if tlv_type == 0x00:
+            offset += 1
+            continue
+        if tlv_type == 0xFE:
+            return
+        if offset + 2 > end:
+            raise DecodeError("buffer underflow at reading TLV length field")
+        length = octets[offset+1]
+        offset += 2
+        if length == 0xFF:
+            if offset + 2 > end:
+                errstr = "buffer underflow at reading TLV length field"
+                raise DecodeError(errstr)
+            length = octets[offset] << 8 | octets[offset+1]
+            offset += 2
+        if offset + length > end:
+            errstr = "buffer underflow at reading TLV value of {} octets"
+            raise DecodeError(errstr.format(length))
+        if tlv_type == 0x03:
+            yield (offset, length)
+        offset += length
@@ -27,6 +27,7 @@ class TextRecord(GlobalRecord):
     ndef.text.TextRecord('Hallo Welt', 'de', 'UTF-8')
 
     """
+    __slots__ = ('_text', '_lang', '_utfx')
     _type = 'urn:nfc:wkt:T'
 
     def __init__(self, text=None, language=None, encoding=None):
@@ -47,6 +48,7 @@ class TextRecord(GlobalRecord):
     @convert('value_to_unicode')
     def text(self, value):
         self._text = value
+        self._payload_cache = None
 
     @property
     def language(self):
@@ -60,6 +62,7 @@ class TextRecord(GlobalRecord):
             errstr = 'language must be 1..63 characters, got {}'
             raise self._value_error(errstr.format(len(value)))
         self._lang = value
+        self._payload_cache = None
 
     @property
     def encoding(self):
@@ -72,6 +75,7 @@ class TextRecord(GlobalRecord):
             errstr = "encoding may be 'UTF-8' or 'UTF-16', but not '{}'"
             raise self._value_error(errstr.format(value))
         self._utfx = value
+        self._payload_cache = None
 
     def __format__(self, format_spec):
         if format_spec == 'args':
@@ -84,6 +88,10 @@ class TextRecord(GlobalRecord):
 
         return super(TextRecord, self).__format__(format_spec)
 
+    def _payload_key(self):
+        # The cached PAYLOAD is cleared by the property setters.
+        return ()
+
     def _encode_payload(self):
         """Called from Record._encode for the byte representation of the NDEF
         Text Record PAYLOAD requested through the Record.data attribute.
@@ -43,6 +43,7 @@ class UriRecord(GlobalRecord):
     'http://www.xn--hy-viaa5g.com/%7Euser/'
 
     """
+    __slots__ = ('_iri',)
     _type = 'urn:nfc:wkt:U'
     _prefix_strings = (
         "", "http://www.", "https://www.", "http://", "https://", "tel:",
@@ -69,6 +70,7 @@ class UriRecord(GlobalRecord):
     @convert('value_to_unicode')
     def iri(self, value):
         self._iri = value
+        self._payload_cache = None
 
     @property
     def uri(self):
@@ -87,6 +89,7 @@ class UriRecord(GlobalRecord):
             netloc = netloc.encode().decode('idna')
             path, query, fragment = map(unquote, [path, query, fragment])
         self._iri = urlunsplit((scheme, netloc, path, query, fragment))
+        self._payload_cache = None
 
     def __format__(self, format_spec):
         if format_spec == 'args':
@@ -97,6 +100,10 @@ class UriRecord(GlobalRecord):
 
         return super(UriRecord, self).__format__(format_spec)
 
+    def _payload_key(self):
+        # The cached PAYLOAD is cleared by the property setters.
+        return ()
+
     def _encode_payload(self):
         # Called from Record._encode when the byte representation of
         # the NDEF URI Record PAYLOAD is required for Record.data.
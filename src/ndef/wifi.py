@@ -3,7 +3,8 @@
 # wif.py - parse or generate Wi-Fi Simple Configuration data
 #
 from __future__ import absolute_import, division
-from .record import Record, GlobalRecord, hexlify, _PY2
+from .record import Record, GlobalRecord, hexlify, _PY2, _values_key
+from .record import _instance_state, _restore_state
 from .record import DecodeError, EncodeError
 from collections import namedtuple
 from functools import reduce
@@ -14,6 +15,16 @@ VersionTuple = namedtuple('Version', 'major, minor')
 
 
 class AttributeBase(object):
+    __slots__ = ()
+
+    def __getstate__(self):
+        # Slotted objects need the state methods for pickle protocols
+        # 0 and 1 and for Python 2.
+        return _instance_state(self)
+
+    def __setstate__(self, state):
+        _restore_state(self, state)
+
     def __repr__(self):
         s = "{r.__class__.__module__}.{r.__class__.__name__}({r:args})"
         return s.format(r=self)
@@ -33,6 +44,7 @@ class AttributeBase(object):
 
 
 class AttributeContainer(AttributeBase):
+    __slots__ = ()
     _attribute_name_mapping = NotImplemented
 
     @property
@@ -111,6 +123,8 @@ class AttributeContainer(AttributeBase):
 
 
 class Attribute(AttributeBase):
+    __slots__ = ('_value',)
+
     def __init__(self, *args):
         if args and type(args[0]) == type(self):
             self._value = args[0]._value
@@ -165,6 +179,8 @@ class IntegerAttribute(Attribute):
     """Base class for Attributes that contain a single integer value.
 
     """
+    __slots__ = ()
+
     def init(self, value):
         self._value = (int(value),)
 
@@ -177,6 +193,8 @@ class BooleanAttribute(Attribute):
     """Base class for Attributes that contain a single boolean value.
 
     """
+    __slots__ = ()
+
     def init(self, value):
         self._value = (bool(value),)
 
@@ -189,6 +207,8 @@ class OctetsAttribute(Attribute):
     """Base class for Attributes that contain an octet string value.
 
     """
+    __slots__ = ()
+
     def init(self, value):
         self._value = (bytes(bytearray(value) if _PY2 else value),)
 
@@ -208,6 +228,8 @@ class AsciiAttribute(Attribute):
     """Base class for Attributes that contain an ascii string value.
 
     """
+    __slots__ = ()
+
     def init(self, *args):
         value = Record._value_to_ascii(args[0], 'value').encode('ascii')
         self._value = (value,)
@@ -231,6 +253,8 @@ class UnicodeAttribute(Attribute):
     """Base class for Attributes that contain a UTF-8 string value.
 
     """
+    __slots__ = ()
+
     def init(self, *args):
         value = Record._value_to_unicode(args[0], 'value').encode('utf-8')
         self._value = (value,)
@@ -254,6 +278,8 @@ class UUIDAttribute(Attribute):
     """Base class for Attributes that contain a UUID value.
 
     """
+    __slots__ = ()
+
     def init(self, *args):
         if isinstance(args[0], uuid.UUID):
             self._value = (args[0].bytes,)
@@ -279,6 +305,8 @@ class BitmapAttribute(Attribute):
     """Base class for Attributes that map bits to values.
 
     """
+    __slots__ = ()
+
     def init(self, *args):
         assert len(args) > 0, "at least one argument is required"
         if isinstance(args[0], int):
@@ -315,6 +343,7 @@ class DeviceTypeAttribute(Attribute):
     """Base class for Primary and Secondary Device Type.
 
     """
+    __slots__ = ()
     _mapping = (
         (0x0001000000000000, "Computer::"),
         (0x00010050F2040001, "Computer::PC"),
@@ -429,6 +458,8 @@ class VersionAttribute(Attribute):
     """Base class for Attributes that contain a version number.
 
     """
+    __slots__ = ()
+
     def init(self, *args):
         value = (args[0] << 4 | args[1] & 15) if len(args) == 2 else args[0]
         self._value = (value,)
@@ -451,12 +482,14 @@ class VersionAttribute(Attribute):
 
 
 class APChannel(IntegerAttribute):
+    __slots__ = ()
     _str = "AP Channel"
     _fmt = ('H', 2, 2)
     _key = 0x1001
 
 
 class AuthenticationType(BitmapAttribute):
+    __slots__ = ()
     _str = "Authentication Type"
     _fmt = ('H', 2, 2)
     _key = 0x1003
@@ -470,6 +503,7 @@ class AuthenticationType(BitmapAttribute):
 
 
 class ConfigMethods(BitmapAttribute):
+    __slots__ = ()
     _str = "Configuration Methods"
     _fmt = ('H', 2, 2)
     _key = 0x1008
@@ -490,12 +524,14 @@ class ConfigMethods(BitmapAttribute):
 
 
 class DeviceName(UnicodeAttribute):
+    __slots__ = ()
     _str = "Device Name"
     _fmt = ('*', 0, 64)
     _key = 0x1011
 
 
 class EncryptionType(BitmapAttribute):
+    __slots__ = ()
     _str = "Encryption Type"
     _fmt = ('H', 2, 2)
     _key = 0x100F
@@ -508,54 +544,63 @@ class EncryptionType(BitmapAttribute):
 
 
 class KeyProvidedAutomatically(BooleanAttribute):
+    __slots__ = ()
     _str = "Key Provided Automatically"
     _fmt = ('?', 1, 1)
     _key = 0x1061
 
 
 class MacAddress(OctetsAttribute):
+    __slots__ = ()
     _str = "MAC Address"
     _fmt = ('*', 6, 6)
     _key = 0x1020
 
 
 class Manufacturer(AsciiAttribute):
+    __slots__ = ()
     _str = "Manufacturer"
     _fmt = ('*', 0, 64)
     _key = 0x1021
 
 
 class ModelName(AsciiAttribute):
+    __slots__ = ()
     _str = "Model Name"
     _fmt = ('*', 0, 32)
     _key = 0x1023
 
 
 class ModelNumber(AsciiAttribute):
+    __slots__ = ()
     _str = "Model Number"
     _fmt = ('*', 0, 32)
     _key = 0x1024
 
 
 class NetworkIndex(IntegerAttribute):
+    __slots__ = ()
     _str = "Network Index"
     _fmt = ('B', 1, 1)
     _key = 0x1026
 
 
 class NetworkKey(OctetsAttribute):
+    __slots__ = ()
     _str = "Network Key"
     _fmt = ('*', 0, 64)
     _key = 0x1027
 
 
 class NetworkKeyShareable(BooleanAttribute):
+    __slots__ = ()
     _str = "Network Key Shareable"
     _fmt = ('?', 1, 1)
     _key = 0x02
 
 
 class OutOfBandPassword(Attribute):
+    __slots__ = ()
     _str = "Out Of Band Device Password"
     _fmt = ('>20sH*', 22, 58)
     _key = 0x102C
@@ -594,6 +639,7 @@ class OutOfBandPassword(Attribute):
 
 
 class PrimaryDeviceType(DeviceTypeAttribute):
+    __slots__ = ()
     _str = "Primary Device Type"
     _fmt = ("Q", 8, 8)
     _key = 0x1054
@@ -613,6 +659,7 @@ class PrimaryDeviceType(DeviceTypeAttribute):
 
 
 class RFBands(BitmapAttribute):
+    __slots__ = ()
     _str = "RF Bands"
     _fmt = ('B', 1, 1)
     _key = 0x103C
@@ -624,48 +671,56 @@ class RFBands(BitmapAttribute):
 
 
 class SecondaryDeviceTypeList(DeviceTypeAttribute):
+    __slots__ = ()
     _str = "Secondary Device Type List"
     _fmt = ("*Q", 8, 128)
     _key = 0x1055
 
 
 class SerialNumber(AsciiAttribute):
+    __slots__ = ()
     _str = "Serial Number"
     _fmt = ('*', 0, 32)
     _key = 0x1042
 
 
 class SSID(OctetsAttribute):
+    __slots__ = ()
     _str = "SSID"
     _fmt = ('*', 0, 32)
     _key = 0x1045
 
 
 class UUIDEnrollee(UUIDAttribute):
+    __slots__ = ()
     _str = "UUID-E"
     _fmt = ('16s', 16, 16)
     _key = 0x1047
 
 
 class UUIDRegistrar(UUIDAttribute):
+    __slots__ = ()
     _str = "UUID-R"
     _fmt = ('16s', 16, 16)
     _key = 0x1048
 
 
 class Version1(VersionAttribute):
+    __slots__ = ()
     _str = "Version1"
     _fmt = ('B', 1, 1)
     _key = 0x104A
 
 
 class Version2(VersionAttribute):
+    __slots__ = ()
     _str = "Version2"
     _fmt = ('B', 1, 1)
     _key = 0x00
 
 
 class VendorExtension(Attribute):
+    __slots__ = ()
     _str = "Vendor Extension"
     _fmt = ('3s*', 3, 1024)
     _key = 0x1049
@@ -684,6 +739,7 @@ class VendorExtension(Attribute):
 
 
 class WifiAllianceVendorExtension(AttributeContainer):
+    __slots__ = ('_attributes',)
     _str = "WFA Vendor Extension"
     _attribute_name_mapping = {
         'version-2': Version2,
@@ -710,6 +766,7 @@ class WifiAllianceVendorExtension(AttributeContainer):
 
 
 class Credential(AttributeContainer):
+    __slots__ = ('_attributes',)
     _str = "Credential"
     _key = 0x100E
     _attribute_name_mapping = {
@@ -746,6 +803,7 @@ class Credential(AttributeContainer):
 
 
 class PeerToPeerCapability(Attribute):
+    __slots__ = ()
     _str = "P2P Capability"
     _fmt = ('BB', 2, 2)
     _key = 2
@@ -821,6 +879,7 @@ class PeerToPeerCapability(Attribute):
 
 
 class ChannelList(Attribute):
+    __slots__ = ()
     _str = "Channel List"
     _fmt = ('', 3, 0xFFFF)
     _key = 11
@@ -884,6 +943,7 @@ class ChannelList(Attribute):
 
 
 class PeerToPeerDeviceInfo(Attribute):
+    __slots__ = ()
     _str = "P2P Device Info"
     _fmt = ('6sHQB+(Q)*', 21, 0xFFFF)
     _key = 13
@@ -940,6 +1000,7 @@ class PeerToPeerDeviceInfo(Attribute):
 
 
 class PeerToPeerGroupInfo(Attribute):
+    __slots__ = ()
     _str = "P2P Group Info"
     _fmt = ('6s6sBHQB+(Q)HH+', 0, 0xFFFF)
     _key = 14
@@ -1033,6 +1094,7 @@ class PeerToPeerGroupInfo(Attribute):
 
 
 class PeerToPeerGroupID(Attribute):
+    __slots__ = ()
     _str = "P2P Group ID"
     _fmt = ('6s*', 6, 38)
     _key = 15
@@ -1058,6 +1120,7 @@ class PeerToPeerGroupID(Attribute):
 
 
 class NegotiationChannel(Attribute):
+    __slots__ = ()
     _str = "Negotiation Channel"
     _fmt = ('3sBBB', 6, 6)
     _key = 19
@@ -1096,6 +1159,7 @@ class NegotiationChannel(Attribute):
 
 
 class WifiSimpleConfigRecord(AttributeContainer, GlobalRecord):
+    __slots__ = ('_attributes',)
     _type = 'application/vnd.wfa.wsc'
 
     _attribute_name_mapping = {
@@ -1156,6 +1220,16 @@ class WifiSimpleConfigRecord(AttributeContainer, GlobalRecord):
     def __str__(self):
         return GlobalRecord.__str__(self)
 
+    def _payload_key(self):
+        # The attribute values are lists that may be changed in place.
+        key = []
+        for _type, values in self._attributes.items():
+            values = _values_key(values)
+            if values is None:
+                return None
+            key.append((_type, values))
+        return tuple(key)
+
     def _encode_payload(self):
         # Both WSC and P2P attributes are in the same structure but
         # WSC keys are all >= 0x1000 while P2P keys are <= 0xFF. Here
@@ -1200,6 +1274,7 @@ class WifiSimpleConfigRecord(AttributeContainer, GlobalRecord):
 
 
 class WifiPeerToPeerRecord(WifiSimpleConfigRecord):
+    __slots__ = ()
     _type = 'application/vnd.wfa.p2p'
 
     _attribute_name_mapping = dict([
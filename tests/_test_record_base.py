@@ -5,6 +5,8 @@ import pytest
 
 import sys
 import re
+import copy
+import pickle
 
 
 def generate_tests(metafunc):
@@ -20,6 +22,9 @@ def generate_tests(metafunc):
             test_data = metafunc.cls.test_decode_valid_data
             test_data = [args for payload, args in test_data]
             test_data = zip(test_data, test_data[1:])
+        elif test_func == "test_copy_and_pickle":
+            test_data = metafunc.cls.test_decode_valid_data
+            test_data = [(args,) for payload, args in test_data]
         elif test_func == "test_repr_is_implemented":
             test_data = metafunc.cls.test_decode_valid_data
             test_data = [(test_data[0][1],)]
@@ -137,6 +142,18 @@ class _TestRecordBase:
         assert record_1 != record_2
         assert record_1.data != record_2.data
 
+    def test_copy_and_pickle(self, args):
+        RECORD = self.RECORD
+        CLNAME = RECORD.__module__ + '.' + RECORD.__name__
+        ASSERT = "assert copy.deepcopy({0}{1}) == {0}{1}"
+        print('\n' + ASSERT.format(CLNAME, args))
+        record = RECORD(*args)
+        assert copy.copy(record) == record
+        assert copy.deepcopy(record) == record
+        assert copy.deepcopy(record).data == record.data
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            assert pickle.loads(pickle.dumps(record, protocol)) == record
+
     def test_format_args(self, args, formatted):
         RECORD = self.RECORD
         CLNAME = RECORD.__module__ + '.' + RECORD.__name__
@@ -537,6 +537,21 @@ class TestBluetoothEasyPairingRecord:
         txt = "NDEF Bluetooth Easy Pairing Record ID '' Attributes 0x08 0x09"
         assert format(obj) == txt
 
+    def test_payload_cache(self):
+        obj = ndef.BluetoothEasyPairingRecord('01:02:03:04:05:06')
+        octets = obj.data
+        assert obj.data is octets
+        obj.device_name = 'Blue'
+        assert obj.data != octets
+        octets = obj.data
+        obj.device_address = '01:02:03:04:05:07'
+        assert obj.data != octets
+        if sys.version_info >= (3,):
+            octets = obj.data
+            obj[0x09] = bytearray(b'Blue')
+            obj[0x09].extend(b'!')
+            assert obj.data != octets and obj.data.endswith(b'Blue!')
+
 
 class TestBluetoothLowEnergyRecord:
     cls = "ndef.bluetooth.BluetoothLowEnergyRecord"
@@ -607,6 +607,33 @@ def test_handover_initiate_record_attributes():
     assert record.unknown_records[0].data == b'Hello'
 
 
+def test_handover_payload_cache_invalidation():
+    record = ndef.HandoverSelectRecord('1.3')
+    record.add_alternative_carrier('active', 'wifi')
+    octets = record.data
+    assert record.data is octets
+    record.alternative_carriers[0].set_carrier_power_state('inactive')
+    assert record.data != octets
+    octets = record.data
+    record.alternative_carriers[0].auxiliary_data_reference.append('aux')
+    assert record.data != octets
+    octets = record.data
+    record.alternative_carriers.append(record.alternative_carriers[0])
+    assert record.data != octets
+    record.alternative_carriers[0].carrier_data_reference = 'p2p'
+    assert record.data != octets
+    octets = record.data
+    record.unknown_records.append(Record('text/plain', 'txt', b'Hello'))
+    assert record.data != octets
+    octets = record.data
+    record.unknown_records[0].data.extend(b'!')
+    assert record.data != octets and record.data.endswith(b'Hello!')
+    record = ndef.HandoverCarrierRecord('a/b', b'\x01')
+    octets = record.data
+    record.carrier_data[0] = 2
+    assert record.data == octets[:-1] + b'\x02'
+
+
 handover_request_messages = [
     ('d102014872 11',
      [ndef.HandoverRequestRecord('1.1')]),
@@ -4,9 +4,11 @@ from __future__ import absolute_import, division
 
 import ndef
 import pytest
+import sys
 
 from ndef import Record
 from io import BytesIO
+import io
 
 
 test_message_set_1 = [
@@ -146,3 +148,1209 @@ def test_message_encoder_stop_iteration():
     encoder.send(None)
     with pytest.raises(StopIteration):
         encoder.send(None)
+
+
+@pytest.mark.parametrize("encoded, message", test_message_set_1)
+def test_message_decoder_with_buffer_input(encoded, message):
+    octets = bytearray.fromhex(encoded)
+    assert list(ndef.message_decoder(memoryview(octets))) == message
+    assert list(ndef.message_decoder(bytearray(octets))) == message
+
+
+requires_py3 = pytest.mark.skipif(sys.version_info < (3,),
+                                  reason="mmap buffers require Python 3")
+
+
+@requires_py3
+def test_message_decoder_with_mmap_input():
+    import mmap
+    octets = bytearray.fromhex('910301414243005903010158595a30ff')
+    buffer = mmap.mmap(-1, len(octets))
+    buffer.write(bytes(octets))
+    message = [Record('urn:nfc:wkt:ABC', None, b'\x00'),
+               Record('urn:nfc:wkt:XYZ', '0', b'\xff')]
+    assert list(ndef.message_decoder(buffer)) == message
+
+
+@requires_py3
+@pytest.mark.parametrize("reassemble", [False, True])
+def test_message_decoder_buffer_release(reassemble):
+    octets = bytearray.fromhex('910301414243005903010158595a30ff')
+    decoder = ndef.message_decoder(octets, reassemble=reassemble)
+    record = next(decoder)
+    with pytest.raises(BufferError):
+        octets.extend(b'\x00')
+    decoder.close()
+    assert record == Record('urn:nfc:wkt:ABC', None, b'\x00')
+    del octets[-8:]
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.message_decoder(octets, reassemble=reassemble))
+    octets.extend(b'\x00')
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.messages_decoder(octets, reassemble=reassemble))
+    octets.extend(b'\x00')
+    assert 'buffer underflow' in str(excinfo.value)
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_3)
+def test_fail_decode_invalid_buffer_relax(encoded, errmsg):
+    octets = bytearray.fromhex(encoded)
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.message_decoder(memoryview(octets), errors='relax'))
+    assert errmsg in str(excinfo.value)
+
+
+test_message_set_6 = [
+    'd1010e5402656e48656c6c6f20576f726c64',
+    'd9010e01547802656e48656c6c6f20576f726c64',
+    'd1021053709101045503612e625101045402656e74',
+    '91020a487313d102046163010130005a0d0201'
+    '6170706c69636174696f6e2f78306162',
+]
+
+
+def is_lazy(record):
+    try:
+        object.__getattribute__(record, '_lazy_payload')
+        return True
+    except AttributeError:
+        return False
+
+
+@pytest.mark.parametrize("encoded", test_message_set_6)
+def test_message_decoder_lazy(encoded):
+    octets = bytes(bytearray.fromhex(encoded))
+    eager = list(ndef.message_decoder(octets))
+    lazy = list(ndef.message_decoder(octets, lazy=True))
+    assert is_lazy(lazy[0])
+    assert [r.type for r in lazy] == [r.type for r in eager]
+    assert [r.name for r in lazy] == [r.name for r in eager]
+    assert lazy == eager
+    for record in lazy:
+        assert not is_lazy(record)
+    assert b''.join(ndef.message_encoder(lazy)) == octets
+
+
+def test_message_decoder_lazy_error():
+    octets = bytearray.fromhex('d101025400ff')
+    record = next(ndef.message_decoder(octets, lazy=True))
+    assert record.type == 'urn:nfc:wkt:T'
+    errstr = 'ndef.text.TextRecord language code length can not be zero'
+    for _ in range(2):
+        with pytest.raises(ndef.DecodeError) as excinfo:
+            record.text
+        assert str(excinfo.value) == errstr
+    with pytest.raises(AttributeError):
+        ndef.TextRecord().undefined_attribute
+
+
+def test_message_decoder_lazy_assignment():
+    octets = ndef.encode_message([ndef.TextRecord('Hello', 'en')])
+    record = next(ndef.message_decoder(octets, lazy=True))
+    record.language = 'de'
+    assert record.text == 'Hello'
+    assert record.language == 'de'
+    assert record == ndef.TextRecord('Hello', 'de')
+    record = next(ndef.message_decoder(octets, lazy=True))
+    record.text = 'Hallo'
+    assert record.language == 'en'
+    assert record.text == 'Hallo'
+    record = next(ndef.message_decoder(octets, lazy=True))
+    record.text = 'Hallo'
+    assert record.data == ndef.TextRecord('Hallo').data
+    octets = ndef.encode_message([ndef.SmartposterRecord('http://a')])
+    record = next(ndef.message_decoder(octets, lazy=True))
+    record.set_title('Title')
+    assert record == ndef.SmartposterRecord('http://a', 'Title')
+
+
+@pytest.mark.parametrize("encoded, message", test_message_set_1)
+def test_encode_message(encoded, message):
+    octets = bytes(bytearray.fromhex(encoded))
+    assert ndef.encode_message(message) == octets
+    assert ndef.encode_message(iter(message)) == octets
+
+
+@pytest.mark.parametrize("encoded", test_message_set_6)
+def test_encode_message_known_types(encoded):
+    octets = bytes(bytearray.fromhex(encoded))
+    message = list(ndef.message_decoder(octets))
+    assert ndef.encode_message(message) == octets
+
+
+def test_encode_message_long_record():
+    message = [Record('text/plain', 'id', 300 * b'x'), Record('unknown')]
+    octets = ndef.encode_message(message)
+    assert octets == b''.join(ndef.message_encoder(message))
+    assert octets[:19] == b'\x8a\x0a\x00\x00\x01\x2c\x02text/plainid'
+
+
+@pytest.mark.parametrize("argument, errmsg", test_message_set_5)
+def test_fail_encode_message_invalid_types(argument, errmsg):
+    with pytest.raises(TypeError) as excinfo:
+        ndef.encode_message([Record()] + argument)
+    assert errmsg == str(excinfo.value)
+
+
+@pytest.mark.parametrize("encoded, message", test_message_set_1)
+def test_encode_message_into(encoded, message):
+    octets = bytearray.fromhex(encoded)
+    buffer = bytearray(len(octets) + 2)
+    offset = ndef.encode_message_into(message, buffer, 1)
+    assert offset == len(octets) + 1
+    assert buffer == b'\0' + octets + b'\0'
+
+
+@requires_py3
+def test_encode_message_into_mmap():
+    import mmap
+    message = [Record('text/plain', 'id', 300 * b'x'), Record('unknown')]
+    octets = ndef.encode_message(message)
+    buffer = mmap.mmap(-1, len(octets) + 4)
+    try:
+        offset = ndef.encode_message_into(message, buffer, 4)
+        assert offset == len(buffer)
+        assert buffer[4:] == octets
+    finally:
+        buffer.close()
+
+
+def test_fail_encode_message_into_space():
+    buffer = bytearray(8)
+    errstr = "buffer of 8 octets can not take 9 octets at offset 0"
+    with pytest.raises(ValueError) as excinfo:
+        ndef.encode_message_into(3 * [Record()], buffer)
+    assert str(excinfo.value) == errstr
+    assert buffer == bytearray(8)
+
+
+@pytest.mark.parametrize("encoded, message", test_message_set_1)
+def test_encode_message_segments(encoded, message):
+    octets = bytes(bytearray.fromhex(encoded))
+    segments = ndef.encode_message_segments(message)
+    assert b''.join(segments) == octets
+    assert len(segments) == len(message)
+
+
+def test_encode_message_segments_payload_view():
+    record = Record('text/plain', 'id', 300 * b'x')
+    text = ndef.TextRecord('Hello')
+    segments = ndef.encode_message_segments([record, text])
+    assert len(segments) == 4
+    if sys.version_info >= (3,):
+        assert isinstance(segments[1], memoryview)
+        assert segments[1].obj is record.data
+        assert segments[3].obj is text.data
+    else:
+        assert segments[1] == record.data
+    stream = BytesIO()
+    stream.writelines(segments)
+    assert stream.getvalue() == ndef.encode_message([record, text])
+
+
+@pytest.mark.parametrize("argument, errmsg", test_message_set_5)
+def test_fail_encode_message_segments_invalid_types(argument, errmsg):
+    with pytest.raises(TypeError) as excinfo:
+        ndef.encode_message_segments([Record()] + argument)
+    assert errmsg == str(excinfo.value)
+
+
+test_message_set_7 = [
+    ('B20A05 746578742F706C61696E 4865206D6F'
+     '360005 7265207465 560002 7874',
+     [Record('text/plain', '', b'He more text')]),
+    ('BA0A0501 746578742F706C61696E 31 4865206D6F'
+     '160002 7265 550000',
+     [Record('text/plain', '1', b'He mo' b're'),
+      Record('unknown', '', b'')]),
+    ('B10105 54 02656E4865 560006 6C6C6F20596F',
+     [ndef.TextRecord('Hello Yo')]),
+]
+
+
+@pytest.mark.parametrize("encoded, message", test_message_set_7)
+def test_message_decoder_reassemble(encoded, message):
+    octets = bytes(bytearray.fromhex(encoded))
+    assert list(ndef.message_decoder(octets, reassemble=True)) == message
+    stream = BytesIO(octets)
+    assert list(ndef.message_decoder(stream, reassemble=True)) == message
+
+
+def test_message_decoder_reassemble_generic_data():
+    octets = bytearray.fromhex('B50003 616263 360002 6465 560001 66')
+    record = next(ndef.message_decoder(octets, reassemble=True))
+    assert isinstance(record.data, bytearray)
+    assert record.data == b'abcdef'
+
+
+def test_message_decoder_reassemble_lazy():
+    octets = bytearray.fromhex('B10105 54 02656E4865 560006 6C6C6F20596F')
+    record = next(ndef.message_decoder(octets, reassemble=True, lazy=True))
+    assert is_lazy(record)
+    assert record.text == 'Hello Yo'
+
+
+def test_message_decoder_reassemble_max_payload_size():
+    octets = bytearray.fromhex('B50003 616263 360002 6465 560001 66')
+    message = ndef.message_decoder(octets, reassemble=True,
+                                   max_payload_size=6)
+    assert list(message) == [Record('unknown', '', b'abcdef')]
+    for size in (2, 5):
+        message = ndef.message_decoder(octets, reassemble=True,
+                                       max_payload_size=size)
+        with pytest.raises(ndef.DecodeError) as excinfo:
+            list(message)
+        errmsg = 'chunked record payload exceeds {} octets'.format(size)
+        assert str(excinfo.value) == errmsg
+
+
+test_message_set_8 = [
+    ('B60000 560000', 'TNF value 6 in the first record chunk'),
+    ('B50000 150000 560000', 'record chunk must have TNF value 6, not 5'),
+    ('B50000 1E000001 31 560000', 'record chunk must not have an ID field'),
+    ('B50000 360000', 'missing the terminating record chunk'),
+    ('F50000', 'CF flag set in last record'),
+]
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_8)
+def test_fail_message_decoder_reassemble(encoded, errmsg):
+    octets = bytearray.fromhex(encoded)
+    for errors in ('strict', 'relax'):
+        message = ndef.message_decoder(octets, errors, reassemble=True)
+        with pytest.raises(ndef.DecodeError) as excinfo:
+            list(message)
+        assert str(excinfo.value) == errmsg
+    message = ndef.message_decoder(octets, 'ignore', reassemble=True)
+    assert list(message) == []
+
+
+test_message_set_9 = [
+    ('B50000 D60000', 'MB flag set in middle record',
+     [Record('unknown')]),
+    ('950000 560000', 'TNF value 6 in a record that is not a chunk',
+     [Record('unknown'), Record('unchanged')]),
+]
+
+
+@pytest.mark.parametrize("encoded, errmsg, message", test_message_set_9)
+def test_fail_message_decoder_reassemble_strict(encoded, errmsg, message):
+    octets = bytearray.fromhex(encoded)
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.message_decoder(octets, reassemble=True))
+    assert str(excinfo.value) == errmsg
+    assert list(ndef.message_decoder(octets, 'relax',
+                                     reassemble=True)) == message
+
+
+test_message_set_10 = [
+    (None, [Record('text/plain', '', b'He more text')],
+     'D20A0C 746578742F706C61696E 4865206D6F72652074657874'),
+    (5, [Record('text/plain', '', b'He more text')],
+     'B20A05 746578742F706C61696E 4865206D6F'
+     '360005 7265207465 560002 7874'),
+    (5, [Record('text/plain', '1', b'He more'), Record('unknown')],
+     'BA0A0501 746578742F706C61696E 31 4865206D6F'
+     '160002 7265 550000'),
+    (5, [Record('text/plain', '', b'He mo')],
+     'D20A05 746578742F706C61696E 4865206D6F'),
+    (2, [Record('unknown', '', b'abc'), Record('unchanged', '', b'def')],
+     'B50003 616263 560003 646566'),
+    (1, [Record()], 'D00000'),
+]
+
+
+@pytest.mark.parametrize("chunk_size, message, encoded", test_message_set_10)
+def test_encode_message_chunk_size(chunk_size, message, encoded):
+    octets = bytes(bytearray.fromhex(encoded))
+    assert ndef.encode_message(message, chunk_size) == octets
+    assert b''.join(ndef.message_encoder(message, None, chunk_size)) == octets
+    assert b''.join(ndef.encode_message_segments(message, chunk_size)) \
+        == octets
+    buffer = bytearray(len(octets))
+    assert ndef.encode_message_into(message, buffer, 0, chunk_size) \
+        == len(octets)
+    assert buffer == octets
+    stream = BytesIO()
+    assert sum(ndef.message_encoder(message, stream, chunk_size)) \
+        == len(octets)
+    assert stream.getvalue() == octets
+
+
+def test_encode_message_chunk_size_roundtrip():
+    message = [ndef.TextRecord(1000 * 'x'), Record('unknown', '', b'abc'),
+               ndef.UriRecord('http://nfcpy.org')]
+    octets = ndef.encode_message(message, chunk_size=100)
+    assert len(list(ndef.message_decoder(octets))) == 13
+    assert list(ndef.message_decoder(octets, reassemble=True)) == message
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1])
+def test_fail_encode_message_chunk_size(chunk_size):
+    errmsg = "chunk_size must be a positive integer, not {}"
+    with pytest.raises(ValueError) as excinfo:
+        ndef.encode_message([Record()], chunk_size)
+    assert str(excinfo.value) == errmsg.format(chunk_size)
+    with pytest.raises(ValueError) as excinfo:
+        list(ndef.message_encoder([Record()], chunk_size=chunk_size))
+    assert str(excinfo.value) == errmsg.format(chunk_size)
+
+
+def test_message_decoder_stream_payload_size():
+    message = [ndef.TextRecord(300 * 'x'), Record('unknown', '1', b'abc'),
+               Record('text/plain', '', 400 * b'y'),
+               Record('unknown', '', 301 * b'z')]
+    stream = BytesIO(ndef.encode_message(message))
+    decoder = ndef.message_decoder(stream, stream_payload_size=300)
+    record = next(decoder)
+    assert record == message[0]
+    assert type(record) is ndef.TextRecord
+    assert next(decoder) == message[1]
+    record = next(decoder)
+    assert type(record) is ndef.StreamRecord
+    assert record.type == 'text/plain'
+    assert record.length == 400
+    assert record.stream.read(10) == 10 * b'y'
+    record = next(decoder)
+    assert type(record) is ndef.StreamRecord
+    assert record.stream.read() == 301 * b'z'
+    assert list(decoder) == []
+
+
+def test_message_decoder_stream_payload_size_limit():
+    octets = b'\xc5\x00\x00\x20\x00\x01' + 0x200001 * b'x'
+    stream = BytesIO(octets)
+    record = next(ndef.message_decoder(stream, stream_payload_size=0))
+    assert record.stream.skip() == 0x200001
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.message_decoder(BytesIO(octets)))
+    assert "payload of more than 1048576 octets" in str(excinfo.value)
+
+
+def test_fail_message_decoder_stream_payload_underflow():
+    octets = bytearray.fromhex('950006 6162 560000')
+    decoder = ndef.message_decoder(BytesIO(octets), stream_payload_size=1)
+    assert next(decoder).length == 6
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        next(decoder)
+    assert "buffer underflow at reading PAYLOAD field" in str(excinfo.value)
+
+
+def test_message_encoder_max_payload_size():
+    message = [Record('unknown', '', b'abc'), Record('unknown', '', b'de')]
+    encoder = ndef.message_encoder(message, max_payload_size=2)
+    with pytest.raises(ndef.EncodeError) as excinfo:
+        list(encoder)
+    assert str(excinfo.value) == "ndef.record.Record " \
+        "payload of more than 2 octets can not be encoded"
+    octets = b''.join(ndef.message_encoder(message, max_payload_size=3))
+    assert octets == ndef.encode_message(message)
+
+
+def test_encode_message_max_payload_size():
+    message = [Record('unknown', '', b'abc'), Record('unknown', '', b'de')]
+    octets = ndef.encode_message(message)
+    errstr = "ndef.record.Record payload of more than 2 octets can not " \
+             "be encoded"
+    buffer = bytearray(len(octets))
+    for encode in (lambda size: ndef.encode_message(message, None, size),
+                   lambda size: ndef.encode_message_into(
+                       message, buffer, 0, None, size),
+                   lambda size: ndef.encode_message_segments(
+                       message, None, size)):
+        with pytest.raises(ndef.EncodeError) as excinfo:
+            encode(2)
+        assert str(excinfo.value) == errstr
+        encode(3)
+    assert buffer == octets
+    message = [Record('unknown', '', 0x100001 * b'x')]
+    with pytest.raises(ndef.EncodeError):
+        ndef.encode_message(message)
+    octets = ndef.encode_message(message, max_payload_size=0x100001)
+    assert len(octets) == 0x100001 + 6
+
+
+def test_message_encoder_stream_record_roundtrip():
+    source = BytesIO(0x180000 * b'x')
+    message = [ndef.TextRecord('large'),
+               ndef.StreamRecord('application/octet-stream', '', source)]
+    stream = BytesIO()
+    list(ndef.message_encoder(message, stream, max_payload_size=0x200000))
+    stream.seek(0)
+    decoder = ndef.message_decoder(stream, stream_payload_size=0x1000)
+    assert next(decoder) == message[0]
+    record = next(decoder)
+    assert record.length == 0x180000
+    assert record.stream.read() == 0x180000 * b'x'
+
+
+def feed_in_pieces(parser, octets, size):
+    records = []
+    for offset in range(0, len(octets), size):
+        records.extend(parser.feed(octets[offset:offset+size]))
+    return records
+
+
+@pytest.mark.parametrize("encoded, message", test_message_set_1)
+@pytest.mark.parametrize("size", [1, 2, 5, 100])
+def test_message_parser(encoded, message, size):
+    octets = bytes(bytearray.fromhex(encoded))
+    parser = ndef.MessageParser()
+    assert feed_in_pieces(parser, octets, size) == message
+    parser.close()
+
+
+@pytest.mark.parametrize("encoded", test_message_set_6)
+def test_message_parser_known_types(encoded):
+    octets = bytearray.fromhex(encoded)
+    parser = ndef.MessageParser()
+    records = feed_in_pieces(parser, octets, 3)
+    assert records == list(ndef.message_decoder(octets))
+    assert [type(r) for r in records] == \
+        [type(r) for r in ndef.message_decoder(octets)]
+    parser = ndef.MessageParser(lazy=True)
+    assert is_lazy(feed_in_pieces(parser, octets, 3)[0])
+
+
+def test_message_parser_large_payload():
+    octets = ndef.encode_message([Record('unknown', '', 100000 * b'x')])
+    parser = ndef.MessageParser()
+    assert parser.feed(octets[:6]) == []
+    for offset in range(6, len(octets) - 1, 1000):
+        assert parser.feed(octets[offset:min(offset+1000, len(octets)-1)]) \
+            == []
+    assert parser.feed(octets[-1:]) == [Record('unknown', '',
+                                               100000 * b'x')]
+
+
+def test_message_parser_messages():
+    octets = ndef.encode_message([Record('unknown', '', b'1')])
+    parser = ndef.MessageParser()
+    assert parser.feed(octets + octets[:2]) == [Record('unknown', '', b'1')]
+    assert parser.feed(octets[2:] + octets) == \
+        2 * [Record('unknown', '', b'1')]
+    parser.close()
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_2[:2] +
+                         test_message_set_2[3:])
+def test_fail_message_parser_strict(encoded, errmsg):
+    parser = ndef.MessageParser()
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        parser.feed(bytearray.fromhex(encoded))
+    assert errmsg == str(excinfo.value)
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        parser.feed(b'\xd0\x00\x00')
+    assert str(excinfo.value).startswith('data after a decoding error')
+    assert excinfo.value.records == []
+    parser.close()
+    assert parser.feed(b'\xd0\x00\x00') == [Record()]
+
+
+@pytest.mark.parametrize("errors", ['strict', 'relax'])
+def test_fail_message_parser_records(errors):
+    parser = ndef.MessageParser(errors)
+    parser.feed(b'\x95\x00\x00')
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        parser.feed(bytearray.fromhex('160000 160000 19000000'))
+    assert 'must be' in str(excinfo.value)
+    assert excinfo.value.records == 2 * [Record('unchanged')]
+    with pytest.raises(ndef.DecodeError):
+        parser.feed(b'\xd0\x00\x00')
+    parser.close()
+    assert parser.feed(b'\xd0\x00\x00') == [Record()]
+
+
+def test_pass_message_parser_ignore():
+    parser = ndef.MessageParser(errors='ignore')
+    parser.feed(b'\x95\x00\x00')
+    octets = bytearray.fromhex('160000 160000 19000000')
+    assert parser.feed(octets) == 2 * [Record('unchanged')]
+    assert parser.feed(b'\xd0\x00\x00') == []
+    parser.close()
+    assert parser.feed(b'\xd0\x00\x00') == [Record()]
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_2)
+def test_pass_message_parser_relax(encoded, errmsg):
+    parser = ndef.MessageParser(errors='relax')
+    message = [Record('unknown'), Record('unchanged'), Record('unchanged')]
+    assert parser.feed(bytearray.fromhex(encoded)) == message
+    parser.close()
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_3)
+def test_fail_message_parser_invalid(encoded, errmsg):
+    octets = bytearray.fromhex(encoded)
+    parser = ndef.MessageParser(errors='relax')
+    try:
+        assert parser.feed(octets) == []
+        parser.close()
+    except ndef.DecodeError as error:
+        assert errmsg in str(error)
+    else:
+        assert False, "DecodeError was not raised"
+    parser = ndef.MessageParser(errors='ignore')
+    assert parser.feed(octets) == []
+    parser.close()
+
+
+def test_fail_message_parser_close():
+    parser = ndef.MessageParser()
+    parser.feed(b'\x95\x00\x00\x15')
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        parser.close()
+    assert str(excinfo.value) == \
+        'buffer underflow with 1 octets of an incomplete record'
+    parser.feed(b'\x95\x00\x00')
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        parser.close()
+    assert str(excinfo.value) == 'ME flag not set in last record'
+    parser = ndef.MessageParser(errors='relax')
+    parser.feed(b'\x95\x00\x00')
+    parser.close()
+
+
+requires_aio = pytest.mark.skipif(sys.version_info < (3, 6),
+                                  reason="requires Python 3.6 or newer")
+
+
+def aio_decode(octets, size=1, *args, **kwargs):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    reader = asyncio.StreamReader(loop=loop)
+    for offset in range(0, len(octets), size):
+        reader.feed_data(octets[offset:offset+size])
+    reader.feed_eof()
+    decoder = ndef.aio.message_decoder(reader, *args, **kwargs)
+    records = []
+    try:
+        while True:
+            try:
+                records.append(loop.run_until_complete(decoder.__anext__()))
+            except StopAsyncIteration:
+                return records
+    finally:
+        loop.close()
+
+
+@requires_aio
+@pytest.mark.parametrize("encoded, message", test_message_set_1)
+def test_aio_message_decoder(encoded, message):
+    octets = bytes(bytearray.fromhex(encoded))
+    assert aio_decode(octets, 2) == message
+
+
+@requires_aio
+@pytest.mark.parametrize("encoded", test_message_set_6)
+def test_aio_message_decoder_known_types(encoded):
+    octets = bytes(bytearray.fromhex(encoded))
+    records = aio_decode(octets)
+    assert records == list(ndef.message_decoder(octets))
+    assert [type(r) for r in records] == \
+        [type(r) for r in ndef.message_decoder(octets)]
+    assert is_lazy(aio_decode(octets, 1, lazy=True)[0])
+
+
+@requires_aio
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_2)
+def test_aio_message_decoder_invalid_message(encoded, errmsg):
+    octets = bytes(bytearray.fromhex(encoded))
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        aio_decode(octets)
+    assert errmsg == str(excinfo.value)
+    message = [Record('unknown'), Record('unchanged'), Record('unchanged')]
+    assert aio_decode(octets, 1, 'relax') == message
+
+
+@requires_aio
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_3)
+def test_aio_message_decoder_invalid_record(encoded, errmsg):
+    octets = bytes(bytearray.fromhex(encoded))
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        aio_decode(octets, 1, 'relax')
+    assert errmsg in str(excinfo.value)
+    assert aio_decode(octets, 1, 'ignore') == []
+
+
+class AioWriter(object):
+    def __init__(self):
+        self.stream = BytesIO()
+        self.drained = []
+
+    def write(self, octets):
+        self.stream.write(octets)
+
+    def drain(self):
+        import asyncio
+        self.drained.append(self.stream.tell())
+        return asyncio.sleep(0)
+
+
+class AioMessage(object):
+    def __init__(self, records):
+        self.records = iter(records)
+
+    def __aiter__(self):
+        return self
+
+    def __anext__(self):
+        import asyncio
+        for record in self.records:
+            return asyncio.sleep(0, result=record)
+        raise StopAsyncIteration
+
+
+def aio_encode(message, writer, *args, **kwargs):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(
+            ndef.aio.message_encoder(message, writer, *args, **kwargs))
+    finally:
+        loop.close()
+
+
+@requires_aio
+@pytest.mark.parametrize("encoded, message", test_message_set_1)
+def test_aio_message_encoder(encoded, message):
+    octets = bytes(bytearray.fromhex(encoded))
+    for source in (message, iter(message), AioMessage(message)):
+        writer = AioWriter()
+        assert aio_encode(source, writer) == len(octets)
+        assert writer.stream.getvalue() == octets
+        assert writer.drained == ([len(octets)] if octets else [])
+
+
+@requires_aio
+def test_aio_message_encoder_drain_size():
+    message = [Record('unknown', '', 100 * b'x') for _ in range(10)]
+    writer = AioWriter()
+    assert aio_encode(message, writer, drain_size=250) == 1030
+    assert writer.drained == [309, 618, 927, 1030]
+    assert writer.stream.getvalue() == ndef.encode_message(message)
+    writer = AioWriter()
+    assert aio_encode(message, writer, drain_size=0) == 1030
+    assert writer.drained == [103 * n for n in range(1, 11)]
+
+
+@requires_aio
+def test_aio_message_encoder_stream_record():
+    source = BytesIO(0x30000 * b'x')
+    message = [ndef.StreamRecord('unknown', '', source), ndef.TextRecord('a')]
+    writer = AioWriter()
+    aio_encode(message, writer, drain_size=0x8000)
+    assert writer.drained == [65542, 131078, 196614, 196622]
+    octets = writer.stream.getvalue()
+    assert list(ndef.message_decoder(BytesIO(octets))) == \
+        [Record('unknown', '', 0x30000 * b'x'), ndef.TextRecord('a')]
+
+
+@requires_aio
+def test_aio_message_encoder_chunk_size():
+    message = [Record('text/plain', '', b'He more text')]
+    writer = AioWriter()
+    aio_encode(AioMessage(message), writer, chunk_size=5)
+    assert writer.stream.getvalue() == ndef.encode_message(message, 5)
+
+
+@requires_aio
+@pytest.mark.parametrize("argument, errmsg", test_message_set_5)
+def test_fail_aio_message_encoder_invalid_types(argument, errmsg):
+    with pytest.raises(TypeError) as excinfo:
+        aio_encode([Record()] + argument, AioWriter())
+    assert errmsg == str(excinfo.value)
+
+
+class RawStream(io.RawIOBase):
+    def __init__(self, octets, size=None):
+        self.stream = BytesIO(octets)
+        self.size = size
+        self.reads = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        self.reads += 1
+        size = len(b) if self.size is None else min(len(b), self.size)
+        octets = self.stream.read(size)
+        b[0:len(octets)] = octets
+        return len(octets)
+
+
+@pytest.mark.parametrize("encoded, message", test_message_set_1)
+@pytest.mark.parametrize("size", [None, 1, 2])
+def test_message_decoder_with_raw_stream(encoded, message, size):
+    octets = bytes(bytearray.fromhex(encoded))
+    trailer = b'\x01\x02' if message else b''
+    stream = RawStream(octets + trailer, size)
+    assert list(ndef.message_decoder(stream)) == message
+    assert stream.stream.read() == trailer
+
+
+@pytest.mark.parametrize("encoded", test_message_set_6)
+def test_message_decoder_with_raw_stream_known_types(encoded):
+    octets = bytes(bytearray.fromhex(encoded))
+    stream = RawStream(octets)
+    assert list(ndef.message_decoder(stream)) == \
+        list(ndef.message_decoder(octets))
+
+
+def test_message_decoder_with_raw_stream_reads():
+    message = [Record('unknown', '', 10 * b'x') for _ in range(10)]
+    message.append(Record('unknown', '', 300 * b'x'))
+    message.append(Record('unknown', 'id', 300 * b'x'))
+    stream = RawStream(ndef.encode_message(message) + b'next')
+    assert list(ndef.message_decoder(stream)) == message
+    assert stream.reads == 1 + 10 + 2 + 2
+    assert stream.stream.read() == b'next'
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_2)
+def test_fail_decode_raw_stream_strict(encoded, errmsg):
+    stream = RawStream(bytes(bytearray.fromhex(encoded)))
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.message_decoder(stream, errors='strict'))
+    assert errmsg == str(excinfo.value)
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_3)
+def test_fail_decode_raw_stream_relax(encoded, errmsg):
+    stream = RawStream(bytes(bytearray.fromhex(encoded)))
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.message_decoder(stream, errors='relax'))
+    assert errmsg in str(excinfo.value)
+
+
+def test_message_decoder_raw_stream_reassemble():
+    octets = bytearray.fromhex('B50003 616263 360002 6465 560001 66')
+    stream = RawStream(bytes(octets))
+    assert list(ndef.message_decoder(stream, reassemble=True)) == \
+        [Record('unknown', '', b'abcdef')]
+
+
+def concatenated_messages():
+    messages = [
+        [Record('unknown', '', b'1')],
+        [Record('unknown', '', b'2'), Record('unknown', 'id', 300 * b'x')],
+        [Record()],
+    ]
+    octets = [ndef.encode_message(message) for message in messages]
+    offsets = [0, len(octets[0]), len(octets[0]) + len(octets[1])]
+    return b''.join(octets), list(zip(offsets, messages))
+
+
+@pytest.mark.parametrize("source", [
+    lambda octets: octets,
+    lambda octets: bytearray(octets),
+    lambda octets: BytesIO(octets),
+    lambda octets: RawStream(octets, 2),
+    lambda octets: io.BufferedReader(RawStream(octets)),
+])
+def test_messages_decoder(source):
+    octets, expected = concatenated_messages()
+    assert list(ndef.messages_decoder(source(octets))) == expected
+
+
+def test_messages_decoder_empty():
+    assert list(ndef.messages_decoder(b'')) == []
+    assert list(ndef.messages_decoder(RawStream(b''))) == []
+
+
+def test_messages_decoder_reassemble():
+    octets = bytes(bytearray.fromhex('d00000 b50003616263 3600026465'
+                                     ' 56000166 d00000'))
+    expected = [(0, [Record()]), (3, [Record('unknown', '', b'abcdef')]),
+                (18, [Record()])]
+    assert list(ndef.messages_decoder(octets, reassemble=True)) == expected
+    stream = RawStream(octets)
+    assert list(ndef.messages_decoder(stream, reassemble=True)) == expected
+
+
+def test_messages_decoder_errors():
+    octets = bytes(bytearray.fromhex('d00000 900000 d00000'))
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.messages_decoder(octets))
+    assert str(excinfo.value) == 'MB flag set in middle record'
+    decoder = ndef.messages_decoder(octets, errors='relax')
+    assert list(decoder) == [(0, [Record()]), (3, [Record(), Record()])]
+    octets = bytes(bytearray.fromhex('d00000 d00001'))
+    decoder = ndef.messages_decoder(octets, errors='ignore')
+    assert list(decoder) == [(0, [Record()])]
+    with pytest.raises(ndef.DecodeError):
+        list(ndef.messages_decoder(BytesIO(octets), errors='relax'))
+
+
+def test_decode_file(tmpdir):
+    octets, expected = concatenated_messages()
+    path = tmpdir.join('capture')
+    path.write_binary(octets)
+    assert list(ndef.decode_file(str(path))) == expected
+    decoder = ndef.decode_file(str(path), known_types={})
+    assert [records[0].type for offset, records in decoder] == \
+        ['unknown', 'unknown', '']
+
+
+def test_decode_file_lazy_and_reassemble(tmpdir):
+    path = tmpdir.join('capture')
+    path.write_binary(bytes(bytearray.fromhex(
+        'd1010e5402656e48656c6c6f20576f726c64 b50003616263 3600026465'
+        ' 56000166')))
+    decoder = ndef.decode_file(str(path), lazy=True, reassemble=True)
+    assert list(decoder) == [
+        (0, [ndef.TextRecord('Hello World')]),
+        (18, [Record('unknown', '', b'abcdef')])]
+
+
+def test_decode_file_empty(tmpdir):
+    path = tmpdir.join('capture')
+    path.write_binary(b'')
+    assert list(ndef.decode_file(str(path))) == []
+
+
+@requires_py3
+def test_decode_file_closes_mapping(tmpdir):
+    path = tmpdir.join('capture')
+    path.write_binary(bytes(bytearray.fromhex('d00000 d00000')))
+    decoder = ndef.decode_file(str(path))
+    assert next(decoder) == (0, [Record()])
+    mapping = decoder.gi_frame.f_locals['mapping']
+    decoder.close()
+    assert mapping.closed is True
+
+
+@pytest.mark.parametrize("errors", ['strict', 'relax'])
+def test_fail_decode_file(tmpdir, errors):
+    path = tmpdir.join('capture')
+    path.write_binary(bytes(bytearray.fromhex('d00000 d1010055')))
+    decoder = ndef.decode_file(str(path), errors)
+    assert next(decoder) == (0, [Record()])
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        next(decoder)
+    assert str(excinfo.value) == \
+        "ndef.uri.UriRecord payload length can not be less than 1"
+    decoder = ndef.decode_file(str(path), errors='ignore')
+    assert list(decoder) == [(0, [Record()])]
+
+
+def handover_message():
+    carriers = []
+    for index in range(5):
+        record = ndef.BluetoothEasyPairingRecord('01:02:03:04:05:0{}'
+                                                 .format(index))
+        record.name = str(index)
+        carriers.append(record)
+    return [Record('urn:nfc:wkt:Hs', '', b'\x12')] + carriers
+
+
+@pytest.mark.parametrize("encoded, message", test_message_set_1)
+def test_message_view(encoded, message):
+    view = ndef.MessageView(bytearray.fromhex(encoded))
+    assert len(view) == len(message)
+    assert list(view) == message
+    assert view[:] == message
+    assert view[::-1] == message[::-1]
+
+
+def test_message_view_random_access():
+    message = handover_message()
+    octets = ndef.encode_message(message)
+    view = ndef.MessageView(octets)
+    assert view.offsets == tuple(
+        [0] + [len(ndef.encode_message(message[:i])) for i in range(1, 6)])
+    assert view[3] == message[3]
+    assert view[-1] == message[-1]
+    assert view[1:3] == message[1:3]
+    assert view[3] is view[3]
+    assert [record is None for record in view._records] == \
+        [True, False, False, False, True, False]
+    with pytest.raises(IndexError):
+        view[6]
+    with pytest.raises(IndexError):
+        view[-7]
+
+
+def test_message_view_find():
+    message = handover_message()
+    view = ndef.MessageView(ndef.encode_message(message))
+    assert view.find(name='2') == [message[3]]
+    assert view.find(name='9') == []
+    assert view.find(name=b'2') == [message[3]]
+    assert view.find(name=bytearray(b'2')) == [message[3]]
+    with pytest.raises(TypeError) as excinfo:
+        view.find(name=2)
+    assert str(excinfo.value) == "name may be str, bytes or None, but not int"
+    assert view.find(type='application/vnd.bluetooth.ep.oob') == message[1:]
+    assert view.find('application/vnd.bluetooth.ep.oob', '4') == [message[5]]
+    assert view.find() == message
+    assert view._records[0] is not None
+    view = ndef.MessageView(ndef.encode_message(message))
+    view.find(name='3')
+    assert [record is None for record in view._records] == \
+        [True, True, True, True, False, True]
+
+
+def test_message_view_handover_carrier():
+    message = [ndef.HandoverRequestRecord('1.2', 0x1234, (1, '1')),
+               ndef.HandoverCarrierRecord('a/b', None, '1')]
+    octets = ndef.encode_message(message)
+    view = ndef.MessageView(octets)
+    assert isinstance(view[1], ndef.HandoverCarrierRecord)
+    assert view._records[0] is None
+    view = ndef.MessageView(octets)
+    assert view.find(name='1') == [message[1]]
+    assert isinstance(view.find(name='1')[0], ndef.HandoverCarrierRecord)
+    assert list(view) == message
+    view = ndef.MessageView(octets, known_types=Record._known_types.copy())
+    assert type(view[1]) is Record
+
+
+def test_message_view_options():
+    octets = bytearray.fromhex('d1010e5402656e48656c6c6f20576f726c64 d00000')
+    view = ndef.MessageView(memoryview(octets), known_types={})
+    assert len(view) == 1
+    assert view[0] == Record('urn:nfc:wkt:T', '', octets[4:18])
+    view = ndef.MessageView(octets, lazy=True)
+    assert view[0] == ndef.TextRecord('Hello World')
+    assert repr(view) == "ndef.message.MessageView(<1 records>)"
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_2)
+def test_fail_message_view_strict(encoded, errmsg):
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        ndef.MessageView(bytearray.fromhex(encoded))
+    assert str(excinfo.value) == errmsg
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_2)
+def test_pass_message_view_relax(encoded, errmsg):
+    view = ndef.MessageView(bytearray.fromhex(encoded), errors='relax')
+    assert len(view) == 3
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_3)
+def test_fail_message_view_invalid(encoded, errmsg):
+    octets = bytearray.fromhex(encoded)
+    try:
+        list(ndef.MessageView(octets, errors='relax'))
+    except ndef.DecodeError as error:
+        assert errmsg in str(error)
+    else:
+        assert False, "DecodeError was not raised"
+    view = ndef.MessageView(octets, errors='ignore')
+    assert list(view) == list(ndef.message_decoder(octets, errors='ignore'))
+
+
+def test_message_view_ignore_payload_error():
+    octets = bytearray.fromhex('99010201553100 61 59010001553200')
+    record = ndef.UriRecord('a')
+    record.name = '1'
+    view = ndef.MessageView(octets, errors='ignore')
+    assert len(view) == 2
+    assert view[1:] == []
+    assert len(view) == 1
+    view = ndef.MessageView(octets, errors='ignore')
+    assert list(view) == [record]
+    view = ndef.MessageView(octets, errors='ignore')
+    with pytest.raises(IndexError):
+        view[1]
+    assert view[0] == record
+    view = ndef.MessageView(octets, errors='ignore')
+    assert view.find(name='2') == []
+    assert len(view) == 1
+    with pytest.raises(ndef.DecodeError):
+        ndef.MessageView(octets, errors='relax')[1]
+
+
+def test_scan_records():
+    octets = bytearray.fromhex('d00000 b50003616263 3600026465 56000166'
+                               ' 99010201553100 61 19010101553262')
+    headers = list(ndef.scan_records(octets))
+    assert [tuple(header) for header in headers] == [
+        (0, True, True, False, True, False, 0, b'', b'', 3, 0),
+        (3, True, False, True, True, False, 5, b'', b'', 6, 3),
+        (9, False, False, True, True, False, 6, b'', b'', 12, 2),
+        (14, False, True, False, True, False, 6, b'', b'', 17, 1),
+        (18, True, False, False, True, True, 1, b'U', b'1', 24, 2),
+        (26, False, False, False, True, True, 1, b'U', b'2', 32, 1),
+    ]
+    assert headers[4].payload_offset == 24
+    assert [header.offset for header in ndef.scan_records(octets, 18)] == \
+        [18, 26]
+
+
+def test_scan_records_long_record():
+    message = [Record('unknown', '', 256 * b'x'), Record('text/plain')]
+    octets = ndef.encode_message(message)
+    headers = list(ndef.scan_records(memoryview(octets)))
+    assert [(header.sr, header.payload_offset, header.payload_length)
+            for header in headers] == [(False, 6, 256), (True, 275, 0)]
+    assert headers[1].type == b'text/plain'
+
+
+@pytest.mark.parametrize("encoded, message", test_message_set_1)
+def test_scan_records_framing(encoded, message):
+    octets = bytearray.fromhex(encoded)
+    headers = list(ndef.scan_records(octets))
+    assert len(headers) == len(message)
+    assert [header.offset for header in headers] == \
+        list(ndef.MessageView(octets).offsets)
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_3)
+def test_fail_scan_records(encoded, errmsg):
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.scan_records(bytearray.fromhex(encoded)))
+    assert errmsg in str(excinfo.value)
+
+
+class UnseekableStream(io.RawIOBase):
+    def __init__(self, octets):
+        self.stream = BytesIO(octets)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        octets = self.stream.read(len(b))
+        b[0:len(octets)] = octets
+        return len(octets)
+
+
+def select_message():
+    uri = ndef.UriRecord('b')
+    uri.name = 'u'
+    return [ndef.TextRecord('a'), uri, Record('unknown', '', 300 * b'x'),
+            ndef.SmartposterRecord('http://c')]
+
+
+@pytest.mark.parametrize("source", [
+    lambda octets: octets,
+    lambda octets: BytesIO(octets),
+    lambda octets: RawStream(octets),
+    lambda octets: io.BufferedReader(UnseekableStream(octets)),
+])
+@pytest.mark.parametrize("select, indices", [
+    (['urn:nfc:wkt:U'], [1]),
+    (('urn:nfc:wkt:U', 'urn:nfc:wkt:Sp'), [1, 3]),
+    (set(), []),
+    (['unknown'], [2]),
+    (lambda tnf, type, id: id == b'u', [1]),
+    (lambda tnf, type, id: tnf == 1 and type != b'T', [1, 3]),
+])
+def test_message_decoder_select(source, select, indices):
+    message = select_message()
+    octets = ndef.encode_message(message)
+    decoder = ndef.message_decoder(source(octets), select=select)
+    assert list(decoder) == [message[index] for index in indices]
+
+
+def test_message_decoder_select_fields():
+    octets = ndef.encode_message(select_message())
+    fields = []
+    decoder = ndef.message_decoder(
+        octets, select=lambda *args: fields.append(args))
+    assert list(decoder) == []
+    assert fields == [(1, b'T', b''), (1, b'U', b'u'), (5, b'', b''),
+                      (1, b'Sp', b'')]
+
+
+def test_message_decoder_select_skips_payload():
+    octets = bytearray.fromhex('91010055 510102550062')
+    with pytest.raises(ndef.DecodeError):
+        list(ndef.message_decoder(octets))
+    for source in (octets, BytesIO(octets)):
+        assert list(ndef.message_decoder(source, select=['text/plain'])) == []
+    stream = BytesIO(ndef.encode_message(select_message()) + b'next')
+    assert list(ndef.message_decoder(stream, select=[])) == []
+    assert stream.read() == b'next'
+
+
+def test_message_decoder_select_reassemble():
+    octets = bytearray.fromhex('9101025500 61 350003616263 360002 6465'
+                               ' 56000166')
+    for source in (octets, RawStream(bytes(octets))):
+        decoder = ndef.message_decoder(source, reassemble=True,
+                                       select=['unknown'])
+        assert list(decoder) == [Record('unknown', '', b'abcdef')]
+    decoder = ndef.message_decoder(octets, reassemble=True,
+                                   select=['urn:nfc:wkt:U'])
+    assert list(decoder) == [ndef.UriRecord('a')]
+
+
+@pytest.mark.parametrize("encoded, errmsg", test_message_set_2)
+def test_fail_message_decoder_select_strict(encoded, errmsg):
+    octets = bytearray.fromhex(encoded)
+    for source in (octets, BytesIO(octets)):
+        with pytest.raises(ndef.DecodeError) as excinfo:
+            list(ndef.message_decoder(source, select=[]))
+        assert errmsg == str(excinfo.value)
+
+
+def test_fail_message_decoder_select_underflow():
+    octets = ndef.encode_message([Record('unknown', '', b'abc')])[:-1]
+    for source in (octets, BytesIO(octets), RawStream(octets),
+                   io.BufferedReader(UnseekableStream(octets))):
+        with pytest.raises(ndef.DecodeError) as excinfo:
+            list(ndef.message_decoder(source, select=[]))
+        assert str(excinfo.value) == \
+            "ndef.record.Record buffer underflow at reading PAYLOAD field"
+
+
+@pytest.mark.parametrize("encoded, errmsg", [
+    ('11', "buffer underflow at reading length fields"),
+    ('1901', "buffer underflow at reading length fields"),
+    ('11020155', "buffer underflow at reading TYPE field"),
+    ('19010101 55', "buffer underflow at reading ID field"),
+    ('19010101 5531', "buffer underflow at reading PAYLOAD field"),
+])
+def test_fail_message_decoder_select_raw_stream(encoded, errmsg):
+    octets = bytes(bytearray.fromhex(encoded))
+    for select in ([], ['urn:nfc:wkt:U']):
+        for source in (octets, RawStream(octets, 1)):
+            with pytest.raises(ndef.DecodeError) as excinfo:
+                list(ndef.message_decoder(source, errors='relax',
+                                          select=select))
+            assert str(excinfo.value) == "ndef.record.Record " + errmsg
+
+
+def test_message_decoder_select_first_record_types():
+    message = [ndef.HandoverRequestRecord('1.2', 0x1234, (1, '1')),
+               ndef.HandoverCarrierRecord('a/b', None, '1')]
+    octets = ndef.encode_message(message)
+    for source in (octets, BytesIO(octets), RawStream(octets)):
+        decoder = ndef.message_decoder(source, select=['urn:nfc:wkt:Hc'])
+        records = list(decoder)
+        assert records == message[1:]
+        assert isinstance(records[0], ndef.HandoverCarrierRecord)
+    decoder = ndef.message_decoder(octets, reassemble=True,
+                                   select=['urn:nfc:wkt:Hc'])
+    assert isinstance(list(decoder)[0], ndef.HandoverCarrierRecord)
+
+
+class CountingFileIO(io.FileIO):
+    def __init__(self, *args):
+        super(CountingFileIO, self).__init__(*args)
+        self.count = 0
+
+    def readinto(self, b):
+        count = super(CountingFileIO, self).readinto(b)
+        self.count += count
+        return count
+
+
+def test_message_decoder_select_seeks_raw_stream(tmpdir):
+    message = [Record('unknown', '', 200000 * b'x'), ndef.UriRecord('a')]
+    path = tmpdir.join('capture')
+    path.write_binary(ndef.encode_message(message) + b'next')
+    with CountingFileIO(str(path)) as stream:
+        decoder = ndef.message_decoder(stream, select=['urn:nfc:wkt:U'])
+        assert list(decoder) == message[1:]
+        assert stream.count < 20
+        assert stream.read() == b'next'
+
+
+def test_fail_message_decoder_select_type():
+    with pytest.raises(ValueError):
+        list(ndef.message_decoder(b'', select=['no type']))
@@ -4,6 +4,9 @@ from __future__ import absolute_import, division
 
 import ndef
 import pytest
+import sys
+import copy
+import pickle
 
 from ndef.record import Record
 from io import BytesIO
@@ -45,6 +48,59 @@ class TestDecodeType:
             Record._decode_type(7, b'')
         assert str(excinfo.value) == errstr
 
+    @pytest.mark.parametrize("record_type, TNF, TYPE", valid_record_types)
+    def test_memo(self, record_type, TNF, TYPE):
+        result = Record._decode_type(TNF, TYPE)
+        assert ndef.record._record_type_strings[(TNF, TYPE)] is result
+        assert Record._decode_type(TNF, TYPE) is result
+
+    def test_memo_limit(self):
+        for index in range(2 * ndef.record._RECORD_TYPES_CACHE_SIZE):
+            TYPE = 'nfcpy.org:{}'.format(index).encode('ascii')
+            Record._decode_type(4, TYPE)
+        cache_size = len(ndef.record._record_type_strings)
+        assert cache_size <= ndef.record._RECORD_TYPES_CACHE_SIZE
+
+
+class TestDecodeDispatch:
+    def test_registered(self):
+        known_types, table = ndef.record._dispatch_tables[
+            id(Record._known_types)]
+        assert known_types is Record._known_types
+        entry = table[(1, b'T')]
+        assert entry[:2] == ('urn:nfc:wkt:T', ndef.TextRecord)
+
+    def test_shadowed(self):
+        known_types = ndef.SmartposterRecord._known_types
+        assert known_types is not Record._known_types
+        table = ndef.record._dispatch_tables[id(known_types)][1]
+        assert table[(1, b'T')][1] is ndef.TextRecord
+        assert (1, b'Sp') not in table
+
+    def test_changed_mapping(self):
+        class MyRecord(Record):
+            _type = 'urn:nfc:wkt:T'
+
+            @classmethod
+            def _decode_payload(cls, octets, errors):
+                return cls()
+
+        octets = b'\x11\x01\x03T\x02en'
+        known_types = dict()
+
+        class MyRegistry(Record):
+            _known_types = known_types
+
+        MyRegistry.register_type(ndef.TextRecord)
+        record = Record._decode(BytesIO(octets), 'strict', known_types)[0]
+        assert type(record) is ndef.TextRecord
+        known_types['urn:nfc:wkt:T'] = MyRecord
+        record = Record._decode(BytesIO(octets), 'strict', known_types)[0]
+        assert type(record) is MyRecord
+        del known_types['urn:nfc:wkt:T']
+        record = Record._decode(BytesIO(octets), 'strict', known_types)[0]
+        assert type(record) is Record
+
 
 class TestEncodeType:
     @pytest.mark.parametrize("record_type, TNF, TYPE", valid_record_types)
@@ -58,6 +114,19 @@ class TestEncodeType:
             Record._encode_type(record_type)
         assert str(excinfo.value) == "ndef.record.Record " + errstr
 
+    @pytest.mark.parametrize("record_type, TNF, TYPE", valid_record_types)
+    def test_memo(self, record_type, TNF, TYPE):
+        result = Record._encode_type(record_type)
+        assert ndef.record._record_types[record_type] is result
+        assert Record._encode_type(record_type) is result
+        assert Record._encode_type(bytearray(record_type, 'ascii')) == result
+
+    def test_memo_limit(self):
+        for index in range(2 * ndef.record._RECORD_TYPES_CACHE_SIZE):
+            Record._encode_type('urn:nfc:ext:nfcpy.org:{}'.format(index))
+        cache_size = len(ndef.record._record_types)
+        assert cache_size <= ndef.record._RECORD_TYPES_CACHE_SIZE
+
 
 valid_init_args = [
     ((),                           '', '', b''),
@@ -121,6 +190,64 @@ class TestInitKeywords:
             Record(undefined_keyword='abc')
 
 
+class TestSlots:
+    @pytest.mark.parametrize("record", [
+        Record('text/plain', 'name', b'hello'),
+        ndef.TextRecord('hello'),
+        ndef.UriRecord('http://nfcpy.org'),
+        ndef.SmartposterRecord('http://nfcpy.org'),
+        ndef.HandoverSelectRecord('1.3', None, ('active', 'c')),
+        ndef.WifiSimpleConfigRecord(),
+    ])
+    def test_no_dict(self, record):
+        assert not hasattr(record, '__dict__')
+
+    @pytest.mark.parametrize("record", [
+        Record('text/plain', 'name', b'hello'),
+        ndef.BluetoothEasyPairingRecord('01:02:03:04:05:06', (0x09, b'B')),
+        ndef.BluetoothLowEnergyRecord((0x09, b'Blue')),
+        ndef.WifiSimpleConfigRecord((0x1045, b'ssid')),
+    ])
+    def test_copy_and_pickle(self, record):
+        assert copy.copy(record) == record
+        assert copy.deepcopy(record) == record
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            assert pickle.loads(pickle.dumps(record, protocol)) == record
+
+    def test_copy_lazy(self):
+        octets = bytearray.fromhex('d1010e5402656e48656c6c6f20576f726c64')
+        record = next(ndef.message_decoder(octets, lazy=True))
+        for duplicate in (copy.copy(record), copy.deepcopy(record),
+                          pickle.loads(pickle.dumps(record))):
+            assert duplicate._lazy_payload == record._lazy_payload
+            assert duplicate.text == 'Hello World'
+        record.text = 'Hello'
+        assert copy.deepcopy(record).text == 'Hello'
+
+    def test_copy_payload_cache(self):
+        record = ndef.TextRecord('hello')
+        octets = record.data
+        duplicate = copy.deepcopy(record)
+        duplicate.text = 'world'
+        assert record.data is octets
+        assert duplicate.data == b'\x02enworld'
+
+    def test_derived_with_dict(self):
+        class MyRecord(ndef.TextRecord):
+            pass
+
+        record = MyRecord('hello')
+        record.extra = 'attribute'
+        record.name = 'name'
+        items = dict(ndef.record._instance_items(record))
+        assert items['_text'] == 'hello'
+        assert items['_name'] == 'name'
+        assert items['extra'] == 'attribute'
+        assert record.data == b'\x02enhello'
+        duplicate = copy.deepcopy(record)
+        assert duplicate == record and duplicate.extra == 'attribute'
+
+
 class TestTypeAttribute:
     def test_instance(self):
         assert isinstance(Record().type, str)
@@ -158,6 +285,77 @@ class TestDataAttribute:
             Record().data = bytearray(b'')
 
 
+class TestPayloadCache:
+    class MyRecord(Record):
+        _type = 'urn:nfc:wkt:x'
+
+        def __init__(self, value):
+            self.value = value
+            self.encode_count = 0
+
+        @property
+        def value(self):
+            return self._value
+
+        @value.setter
+        def value(self, value):
+            self._value = value
+            self._payload_cache = None
+
+        def _payload_key(self):
+            return ()
+
+        def _encode_payload(self):
+            self.encode_count += 1
+            return bytes(bytearray([self.value]))
+
+    def test_cached(self):
+        record = self.MyRecord(1)
+        assert record.data == b'\x01'
+        assert record.data is record.data
+        assert record == self.MyRecord(1)
+        assert "{:data}".format(record) == "PAYLOAD 1 byte '01'"
+        assert record._encode() == b'\x11\x01\x01x\x01'
+        assert record.encode_count == 1
+
+    def test_invalidate(self):
+        record = self.MyRecord(1)
+        assert record.data == b'\x01'
+        record.value = 2
+        assert record.data == b'\x02'
+        record.name = 'id'
+        assert record.data == b'\x02'
+
+    def test_not_cached(self):
+        class MyRecord(self.MyRecord):
+            def _payload_key(self):
+                return None
+        record = MyRecord(1)
+        assert record.data == b'\x01'
+        assert record.data == b'\x01'
+        assert record.encode_count == 2
+        record = ndef.handover.AlternativeCarrierRecord('active', 'wifi')
+        assert record.data is not record.data
+
+    def test_bytearray_not_cached(self):
+        record = ndef.SmartposterRecord('http://nfcpy.org')
+        record.add_icon('image/png', b'\x89PNG')
+        other = ndef.SmartposterRecord('http://nfcpy.org')
+        other.add_icon('image/png', b'\x89PNG')
+        assert record == other
+        record.icon_records[0].data.extend(b'X')
+        assert record.data.endswith(b'PNGX')
+        assert record != other
+
+    @pytest.mark.skipif(sys.version_info < (3,),
+                        reason="bytearray signature requires Python 3")
+    def test_bytearray_signature_not_cached(self):
+        record = ndef.SignatureRecord(None, 'SHA-256', bytearray(b'1'))
+        octets = record.data
+        record.signature.extend(b'2')
+        assert record.data != octets
+
+
 class TestStringFormat:
     format_args_data = [
         (('', '', ''), "'', '', bytearray(b'')"),
@@ -234,6 +432,38 @@ class TestEncode:
         assert record._encode(stream=stream) == len(octets)
         assert stream.getvalue() == octets
 
+    @pytest.mark.parametrize("args, encoded", valid_encode_data)
+    def test_encode_into(self, args, encoded):
+        record = Record(*args)
+        octets = bytearray.fromhex(encoded)
+        buffer = bytearray(len(octets) + 2)
+        assert record.encode_into(buffer, 1) == len(octets) + 1
+        assert buffer == b'\0' + octets + b'\0'
+        buffer = bytearray(len(octets))
+        assert record.encode_into(memoryview(buffer)) == len(octets)
+        assert buffer == octets
+
+    def test_encode_into_flags(self):
+        buffer = bytearray(3)
+        assert Record().encode_into(buffer, 0, True, True, True) == 3
+        assert buffer == bytearray.fromhex('f00000')
+
+    @pytest.mark.parametrize("size, offset", [(2, 0), (3, 1), (3, -1)])
+    def test_encode_into_space(self, size, offset):
+        buffer = bytearray(size)
+        errstr = ("ndef.record.Record buffer of {} octets can not take 3 "
+                  "octets at offset {}").format(size, offset)
+        with pytest.raises(ValueError) as excinfo:
+            Record().encode_into(buffer, offset)
+        assert str(excinfo.value) == errstr
+        assert buffer == bytearray(size)
+
+    def test_encode_into_readonly(self):
+        errstr = "a writable buffer is required, not " + bytes.__name__
+        with pytest.raises(TypeError) as excinfo:
+            Record().encode_into(b'\0\0\0')
+        assert str(excinfo.value) == errstr
+
     def test_limit(self):
         stream = BytesIO()
         record = Record('unknown', '', 0x100000 * b'\0')
@@ -265,6 +495,13 @@ class TestEncode:
     def test_struct(self, fmt, values, octets):
         octets = bytearray.fromhex(octets)
         assert Record._encode_struct(fmt, *values) == octets
+        assert fmt in ndef.record._struct_encoders
+        assert Record._encode_struct(fmt, *values) == octets
+
+    def test_struct_error(self):
+        with pytest.raises(ndef.EncodeError) as excinfo:
+            Record._encode_struct("BB+", 1, u'123')
+        assert "argument for 's' must be a " in str(excinfo.value)
 
     def test_derived_record(self):
         class MyRecord(Record):
@@ -331,6 +568,21 @@ class TestDecode:
             Record._decode(stream, 'strict', {})
         assert errstr in str(excinfo.value)
 
+    @pytest.mark.parametrize("args, encoded", TestEncode.valid_encode_data)
+    def test_pass_buffer(self, args, encoded):
+        octets = memoryview(bytearray.fromhex(encoded))
+        result = Record._decode_buffer(octets, 0, 'strict', {})
+        record, offset = result[0], result[4]
+        assert record == Record(*args)
+        assert offset == len(octets)
+
+    @pytest.mark.parametrize("encoded, errstr", wrong_decode_data)
+    def test_fail_buffer(self, encoded, errstr):
+        octets = memoryview(bytearray.fromhex(encoded))
+        with pytest.raises(ndef.DecodeError) as excinfo:
+            Record._decode_buffer(octets, 0, 'strict', {})
+        assert errstr in str(excinfo.value)
+
     @pytest.mark.parametrize("encoded, _mb, _me, _cf", valid_flag_data)
     def test_flags(self, encoded, _mb, _me, _cf):
         stream = BytesIO(bytearray.fromhex(encoded))
@@ -339,6 +591,18 @@ class TestDecode:
         assert me == _me
         assert cf == _cf
 
+    def test_header_table(self):
+        for octet0 in range(256):
+            header = ndef.record._header_table[octet0]
+            if octet0 & 7 == 7:
+                assert header is None
+                continue
+            mb, me, cf, il, tnf, struct = header
+            assert (mb, me, cf) == tuple(bool(octet0 & m) for m in (
+                0x80, 0x40, 0x20))
+            assert il == bool(octet0 & 0x08) and tnf == octet0 & 7
+            assert struct.size == (2 if octet0 & 0x10 else 5) + il
+
     def test_limit(self):
         octets = bytearray.fromhex('')
         record = Record._decode(BytesIO(octets), 'strict', {})[0]
@@ -399,12 +663,30 @@ class TestDecode:
         (">HH+", "00010002313233", 0, (1, b'12')),
         (">HH+(H)", "0001000200010002", 0, (1, (1, 2))),
         ("BB+BB+", "010231320203313233", 0, (1, b'12', 2, b'123')),
+        ("B+(H)", "0200010002", 0, (1, 2)),
+        ("H*", "000A313233", 0, (10, b'123')),
+        ("*H", "0001000231", 0, (1, 2, b'1')),
     ]
 
     @pytest.mark.parametrize("fmt, octets, offset, values", valid_struct_data)
     def test_struct(self, fmt, octets, offset, values):
         octets = bytearray.fromhex(octets)
         assert Record._decode_struct(fmt, octets, offset) == values
+        assert fmt in ndef.record._struct_decoders
+        assert Record._decode_struct(fmt, octets, offset) == values
+
+    def test_struct_cache_limit(self):
+        for length in range(2 * ndef.record._STRUCT_CACHE_SIZE):
+            fmt = '{}s'.format(length)
+            assert Record._decode_struct(fmt, length * b'a') == length * b'a'
+        cache_size = len(ndef.record._struct_decoders)
+        assert cache_size <= ndef.record._STRUCT_CACHE_SIZE
+
+    def test_struct_error(self):
+        with pytest.raises(ndef.DecodeError) as excinfo:
+            Record._decode_struct("BB+", b'\x01\x02\x31')
+        errstr = "unpack_from requires a buffer of at least"
+        assert errstr in str(excinfo.value)
 
 
 class TestValueToAscii:
@@ -467,3 +749,184 @@ class TestValueToUnicode:
         with pytest.raises((TypeError, ValueError)) as excinfo:
             Record._value_to_unicode(value, 'value')
         assert str(excinfo.value) == "ndef.record.Record value " + errstr
+
+
+class TestStreamRecord:
+    def test_init(self):
+        stream = BytesIO(b'abc')
+        record = ndef.StreamRecord('text/plain', 'id', stream, 3)
+        assert record.type == 'text/plain'
+        assert record.name == 'id'
+        assert record.stream is stream
+        assert record.length == 3
+        assert not hasattr(record, '__dict__')
+
+    def test_data(self):
+        record = ndef.StreamRecord('text/plain', '', BytesIO(b'abcd'), 3)
+        assert record.data == bytearray(b'abc')
+        assert record.data is record.data
+        assert record.stream.read() == b'd'
+        assert record == Record('text/plain', '', b'abc')
+
+    def test_copy_and_pickle(self):
+        record = ndef.StreamRecord('text/plain', 'id', BytesIO(b'abc'), 3)
+        duplicate = copy.deepcopy(record)
+        assert duplicate.stream is not record.stream
+        assert duplicate == record
+        if sys.version_info >= (3,):  # a Python 2 BytesIO can't pickle
+            duplicate = pickle.loads(pickle.dumps(record))
+            assert duplicate.length == 3 and duplicate == record
+
+    def test_data_underflow(self):
+        record = ndef.StreamRecord('text/plain', '', BytesIO(b'ab'), 3)
+        with pytest.raises(ndef.DecodeError) as excinfo:
+            record.data
+        assert str(excinfo.value) == "ndef.record.StreamRecord " \
+            "buffer underflow at reading PAYLOAD field"
+
+    def test_format(self):
+        record = ndef.StreamRecord('unknown', 'id', None, 300)
+        assert repr(record) == \
+            "ndef.record.StreamRecord('unknown', 'id', None, 300)"
+        assert str(record) == \
+            "NDEF Stream Record TYPE 'unknown' ID 'id' PAYLOAD 300 byte"
+
+    def test_length_from_source(self, tmpdir):
+        stream = BytesIO(b'abcdef')
+        stream.seek(2)
+        assert ndef.StreamRecord('unknown', '', stream).length == 4
+        assert stream.tell() == 2
+        path = tmpdir.join('payload')
+        path.write_binary(b'abc')
+        assert ndef.StreamRecord('unknown', '', str(path)).length == 3
+        assert ndef.StreamRecord('unknown').length == 0
+
+    def test_length_not_seekable(self):
+        class Unseekable(object):
+            def read(self, size=-1):
+                return b''
+        with pytest.raises(ValueError) as excinfo:
+            ndef.StreamRecord('unknown', '', Unseekable())
+        assert str(excinfo.value) == "ndef.record.StreamRecord.length " \
+            "is required for a stream that is not seekable"
+
+    @pytest.mark.parametrize("chunk_size", [None, 100, 200, 256, 300])
+    def test_encode_from_stream(self, chunk_size):
+        octets = Record('text/plain', 'id', 256 * b'x')._encode(
+            True, True, False, chunk_size=chunk_size)
+        source = BytesIO(256 * b'x' + b'rest')
+        record = ndef.StreamRecord('text/plain', 'id', source, 256)
+        stream = BytesIO()
+        assert record._encode(True, True, False, stream, chunk_size) \
+            == len(octets)
+        assert stream.getvalue() == octets
+        assert source.read() == b'rest'
+        long_record = chunk_size is None or chunk_size >= 256
+        assert bool(bytearray(octets)[0] & 0x10) is not long_record
+
+    def test_encode_from_path_and_mmap(self, tmpdir):
+        import mmap
+        path = tmpdir.join('payload')
+        path.write_binary(300 * b'x')
+        octets = Record('unknown', '', 300 * b'x')._encode(True, True)
+        stream = BytesIO()
+        record = ndef.StreamRecord('unknown', '', str(path))
+        assert record._encode(True, True, stream=stream) == len(octets)
+        assert stream.getvalue() == octets
+        with path.open('rb') as f:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stream = BytesIO()
+            record = ndef.StreamRecord('unknown', '', source)
+            assert record._encode(True, True, stream=stream) == len(octets)
+            assert stream.getvalue() == octets
+            source.close()
+
+    def test_encode_seekable_source_again(self):
+        source = BytesIO(b'xabc')
+        source.seek(1)
+        record = ndef.StreamRecord('unknown', '1', source)
+        for _ in range(2):
+            stream = BytesIO()
+            assert record._encode(True, True, stream=stream) == 8
+            assert stream.getvalue() == b'\xdd\x00\x03\x011abc'
+        assert record == Record('unknown', '1', b'abc')
+
+    def test_encode_unseekable_source_once(self):
+        class Unseekable(object):
+            def __init__(self, octets):
+                self.read = BytesIO(octets).read
+        record = ndef.StreamRecord('unknown', '', Unseekable(b'abcabc'), 3)
+        stream = BytesIO()
+        assert record._encode(True, True, stream=stream) == 6
+        errstr = "ndef.record.StreamRecord payload stream is not " \
+                 "seekable and was already read"
+        with pytest.raises(ndef.EncodeError) as excinfo:
+            record._encode(True, True, stream=stream)
+        assert str(excinfo.value) == errstr
+        with pytest.raises(ndef.DecodeError) as excinfo:
+            record == Record('unknown', '', b'abc')
+        assert str(excinfo.value) == errstr
+
+    def test_encode_without_stream(self):
+        record = ndef.StreamRecord('unknown', '1', BytesIO(b'abc'))
+        assert record._encode(True, True) == b'\xdd\x00\x03\x011abc'
+        stream = BytesIO()
+        assert record._encode(True, True, stream=stream) == 8
+        assert stream.getvalue() == b'\xdd\x00\x03\x011abc'
+
+    def test_encode_limit(self):
+        source = BytesIO(0x100001 * b'x')
+        record = ndef.StreamRecord('unknown', '', source, 0x100001)
+        assert record._encode(stream=BytesIO()) == 0x100001 + 6
+        record = ndef.StreamRecord('unknown', '', BytesIO(), 0x100000000)
+        for max_payload_size in (None, 0x200000000):
+            with pytest.raises(ndef.EncodeError) as excinfo:
+                record._encode(stream=BytesIO(),
+                               max_payload_size=max_payload_size)
+            assert str(excinfo.value) == "ndef.record.StreamRecord " \
+                "payload of more than 4294967295 octets can not be encoded"
+        record = ndef.StreamRecord('unknown', '', BytesIO(), 0x100001)
+        with pytest.raises(ndef.EncodeError) as excinfo:
+            record._encode(stream=BytesIO(), max_payload_size=0x100000)
+        assert str(excinfo.value) == "ndef.record.StreamRecord " \
+            "payload of more than 1048576 octets can not be encoded"
+        record = ndef.StreamRecord('unknown', '', BytesIO(b'abc'), 3)
+        with pytest.raises(ndef.EncodeError):
+            record._encode(stream=BytesIO(), max_payload_size=2)
+        assert record._encode(stream=BytesIO(), max_payload_size=3) == 6
+
+    def test_encode_underflow(self):
+        record = ndef.StreamRecord('unknown', '', BytesIO(b'ab'), 3)
+        with pytest.raises(ndef.EncodeError) as excinfo:
+            record._encode(stream=BytesIO())
+        assert str(excinfo.value) == "ndef.record.StreamRecord " \
+            "stream ended before 3 PAYLOAD octets were read"
+
+
+class TestPayloadReader:
+    def test_read(self):
+        stream = BytesIO(b'abcdef')
+        reader = ndef.record.PayloadReader(stream, 4)
+        assert reader.readable() is True
+        assert reader.length == 4
+        assert reader.read(1) == b'a'
+        assert reader.remaining == 3
+        assert reader.read() == b'bcd'
+        assert reader.read() == b''
+        assert reader.remaining == 0
+        assert stream.read() == b'ef'
+
+    def test_skip(self):
+        stream = BytesIO(b'abcdef')
+        reader = ndef.record.PayloadReader(stream, 4)
+        assert reader.read(1) == b'a'
+        assert reader.skip() == 3
+        assert reader.skip() == 0
+        assert stream.read() == b'ef'
+
+    def test_underflow(self):
+        reader = ndef.record.PayloadReader(BytesIO(b'ab'), 4)
+        with pytest.raises(ndef.DecodeError) as excinfo:
+            reader.skip()
+        assert str(excinfo.value) == \
+            "ndef.record.Record buffer underflow at reading PAYLOAD field"
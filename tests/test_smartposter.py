@@ -277,3 +277,52 @@ def test_message_decode_fail(encoded, errstr):
     with pytest.raises(ndef.DecodeError) as excinfo:
         print(list(ndef.message_decoder(octets)))
     assert str(excinfo.value) == "ndef.smartposter." + errstr
+
+
+def test_payload_cache_invalidation():
+    record = ndef.SmartposterRecord('http://nfcpy.org', 'Title')
+    octets = record.data
+    assert record.data is octets
+    record.title_records[0].text = 'Other'
+    assert record.data != octets
+    octets = record.data
+    record.add_icon('image/png', b'\x89PNG')
+    assert record.data != octets
+    octets = record.data
+    record.resource.iri = 'http://ndeflib.org'
+    assert record.data != octets
+    octets = record.data
+    record.icon_records[0] = ndef.Record('image/png', '', b'\x89GIF')
+    assert record.data == octets.replace(b'PNG', b'GIF')
+    octets = record.data
+    record.title_records.append(ndef.TextRecord('Titel', 'de'))
+    assert record.data != octets
+    octets = record.data
+    record.action = 'save'
+    assert record.data != octets
+    octets = record.data
+    record.icon_records[0].data.extend(b'X')
+    assert record.data != octets and record.data.endswith(b'GIFX')
+
+
+def test_record_lists_created_on_use():
+    record = ndef.SmartposterRecord('http://nfcpy.org')
+    assert record.title is None and record.action is None
+    assert record.icons == {} and record.resource_size is None
+    assert record.data == b'\xd1\x01\x0aU\x03nfcpy.org'
+    slots = ['_title_records', '_action_records', '_icon_records',
+             '_size_records', '_type_records']
+    assert [getattr(record, name) for name in slots] == 5 * [None]
+    assert record.title_records == []
+    assert record._title_records == []
+    record.title_records = [ndef.TextRecord('Title')]
+    assert record.title == 'Title'
+
+
+def test_record_lists_of_lazy_record():
+    octets = ndef.encode_message([ndef.SmartposterRecord('http://nfcpy.org',
+                                                         'Title')])
+    record = next(ndef.message_decoder(octets, lazy=True))
+    assert record.title == 'Title'
+    assert record.action is None
+    assert record._action_records is None
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import, division
+
+import sys
+import ndef
+import pytest
+
+from ndef import Record, UriRecord
+
+
+def octets(hexstr):
+    return bytearray.fromhex(hexstr)
+
+
+TYPE_1_HEADER = '11480102 03040506 e1100e00'
+TYPE_2_HEADER = '04010203 04050607 08090000 e1100600'
+
+test_tag_set_1 = [
+    (1, TYPE_1_HEADER + '0303d00000 fe', [(14, 'd00000')]),
+    (1, TYPE_1_HEADER + '0300 fe', [(14, '')]),
+    (1, TYPE_1_HEADER + '0303d00000', [(14, 'd00000')]),
+    (2, TYPE_2_HEADER + '0303d00000 fe000000', [(18, 'd00000')]),
+    (2, TYPE_2_HEADER + '00000303d00000 fe00', [(20, 'd00000')]),
+    (2, TYPE_2_HEADER + '0103a00c34 0303d00000 fe000000', [(23, 'd00000')]),
+    (2, TYPE_2_HEADER + 'fd0161 0303d00000 fe00', [(21, 'd00000')]),
+    (2, TYPE_2_HEADER + '0303d00000 0303d00000',
+     [(18, 'd00000'), (23, 'd00000')]),
+    (2, TYPE_2_HEADER + '03ff0003d00000 fe', [(20, 'd00000')]),
+    (2, TYPE_2_HEADER + 'fe 0303d00000', []),
+    (2, TYPE_2_HEADER + '0000 0000', []),
+    (3, '10040100 0d000000 00000100 00030026 d00000', [(16, 'd00000')]),
+    (3, '10040100 0d000000 00000100 00000023', [(16, '')]),
+    (4, '0003 d00000 0000', [(2, 'd00000')]),
+    (4, '0000', [(2, '')]),
+]
+
+
+@pytest.mark.parametrize("tag_type, memory, messages", test_tag_set_1)
+def test_find_messages(tag_type, memory, messages):
+    memory = octets(memory)
+    found = list(ndef.tag.find_messages(memory, tag_type))
+    assert [(offset, bytes(view)) for offset, view in found] == \
+        [(offset, bytes(octets(hexstr))) for offset, hexstr in messages]
+    for offset, view in found:
+        if sys.version_info >= (3,):
+            assert isinstance(view, memoryview)
+        else:
+            assert isinstance(view, bytearray)
+
+
+@pytest.mark.parametrize("tag_type, memory, messages", test_tag_set_1[:3])
+def test_find_messages_in_bytes(tag_type, memory, messages):
+    memory = bytes(octets(memory))
+    found = list(ndef.tag.find_messages(memory, tag_type))
+    assert [offset for offset, view in found] == \
+        [offset for offset, hexstr in messages]
+
+
+def test_find_messages_type_1_static_memory():
+    memory = octets(TYPE_1_HEADER) + bytearray(108)
+    memory[100:102] = b'\x03\x03'
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.tag.find_messages(memory, 1))
+    assert str(excinfo.value) == \
+        "buffer underflow at reading TLV value of 3 octets"
+
+
+def test_find_messages_type_2_data_area():
+    memory = octets(TYPE_2_HEADER) + bytearray(64)
+    memory[14] = 1
+    memory[24:29] = b'\x03\x03\xd0\x00\x00'
+    assert list(ndef.tag.find_messages(memory, 2)) == []
+    memory[14] = 2
+    assert len(list(ndef.tag.find_messages(memory, 2))) == 1
+
+
+test_tag_set_2 = [
+    (1, '11480102 030405', "Type 1 Tag memory of 7 octets "
+     "has no capability container"),
+    (1, '11480102 03040506 00100e00', "Type 1 Tag capability "
+     "container has no NDEF magic number"),
+    (2, '04010203 04050607 08090000 e110', "Type 2 Tag memory of 14 "
+     "octets has no capability container"),
+    (2, '04010203 04050607 08090000 e2100600', "Type 2 Tag capability "
+     "container has no NDEF magic number"),
+    (2, TYPE_2_HEADER + '03', "buffer underflow at reading TLV length field"),
+    (2, TYPE_2_HEADER + '03ff00', "buffer underflow at reading TLV length "
+     "field"),
+    (2, TYPE_2_HEADER + '0304d00000', "buffer underflow at reading TLV "
+     "value of 4 octets"),
+    (3, '10040100 0d000000 00000100 000300', "Type 3 Tag memory of 15 "
+     "octets has no attribute block"),
+    (3, '10040100 0d000000 00000100 00030027 d00000', "Type 3 Tag attribute "
+     "block checksum error"),
+    (3, '10040100 0d000000 00000100 00040027 d00000', "buffer underflow at "
+     "reading Type 3 Tag data of 4 octets"),
+    (4, '00', "buffer underflow at reading Type 4 Tag NLEN field"),
+    (4, '0004 d00000', "buffer underflow at reading Type 4 Tag file of 4 "
+     "octets"),
+]
+
+
+@pytest.mark.parametrize("tag_type, memory, errmsg", test_tag_set_2)
+def test_fail_find_messages(tag_type, memory, errmsg):
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.tag.find_messages(octets(memory), tag_type))
+    assert str(excinfo.value) == errmsg
+
+
+@pytest.mark.parametrize("tag_type", [0, 5, '2', None])
+def test_fail_find_messages_tag_type(tag_type):
+    with pytest.raises(ValueError) as excinfo:
+        list(ndef.tag.find_messages(b'', tag_type))
+    assert str(excinfo.value) == \
+        "tag_type must be 1, 2, 3 or 4, not {!r}".format(tag_type)
+
+
+def test_messages_decoder():
+    memory = octets(TYPE_2_HEADER + '0300 0306d10102550061 fe00')
+    assert list(ndef.tag.messages_decoder(memory, 2)) == \
+        [(18, []), (20, [UriRecord('a')])]
+    decoder = ndef.tag.messages_decoder(memory, 2, known_types={})
+    assert list(decoder) == \
+        [(18, []), (20, [Record('urn:nfc:wkt:U', '', b'\x00a')])]
+
+
+def test_messages_decoder_errors():
+    memory = octets('0006 510102550061')
+    with pytest.raises(ndef.DecodeError) as excinfo:
+        list(ndef.tag.messages_decoder(memory, 4))
+    assert str(excinfo.value) == "MB flag not set in first record"
+    decoder = ndef.tag.messages_decoder(memory, 4, errors='relax')
+    assert list(decoder) == [(2, [UriRecord('a')])]
+
+
+test_tag_set_3 = [
+    (2, [], None, '00000000 00000000 00000000 e1100100 0300fe00 00000000'),
+    (2, [Record()], None, 12 * '00' + 'e1100100 0303d000 00fe0000'),
+    (2, [Record()], 40, 12 * '00' + 'e1100300 0303d000 00fe0000'
+     + 16 * '00'),
+    (2, [Record()], 31, 12 * '00' + 'e1100100 0303d000 00fe0000'
+     + 7 * '00'),
+    (2, [Record('unknown', '', 251 * b'x')], None, 12 * '00'
+     + 'e1102100 03fe' + 'd500fb' + 251 * '78' + 'fe000000 00000000'),
+    (2, [Record('unknown', '', 252 * b'x')], None, 12 * '00'
+     + 'e1102100 03ff00ff' + 'd500fc' + 252 * '78' + 'fe 00000000'),
+    (4, [], None, '0000'),
+    (4, [Record()], None, '0003d00000'),
+    (4, [Record()], 8, '0003d00000000000'),
+]
+
+
+@pytest.mark.parametrize("tag_type, message, size, memory", test_tag_set_3)
+def test_encode_memory(tag_type, message, size, memory):
+    assert ndef.tag.encode_memory(message, tag_type, size) == octets(memory)
+
+
+@pytest.mark.parametrize("tag_type, message, size, memory", test_tag_set_3)
+def test_encode_memory_roundtrip(tag_type, message, size, memory):
+    memory = ndef.tag.encode_memory(message, tag_type, size)
+    size = len(ndef.encode_message(message))
+    offset = 2 if tag_type == 4 else 18 if size < 255 else 20
+    assert list(ndef.tag.messages_decoder(memory, tag_type)) == \
+        [(offset, message)]
+
+
+def test_encode_memory_into():
+    buffer = bytearray(b'\xff') * 48
+    assert ndef.tag.encode_memory_into([Record()], buffer, 2) == 24
+    assert buffer == octets(12 * 'ff' + 'e1100400 0303d000 00fe0000'
+                            + 24 * 'ff')
+    view = memoryview(bytearray(b'\xff') * 8)
+    assert ndef.tag.encode_memory_into([Record()], view[1:], 4) == 5
+    assert view.tobytes() == bytes(octets('ff0003d00000ffff'))
+
+
+def test_encode_memory_chunk_size():
+    message = [Record('text/plain', '', b'abcdef')]
+    memory = ndef.tag.encode_memory(message, 4, chunk_size=4)
+    assert memory == octets('0016 b20a04746578742f706c61696e61626364'
+                            ' 5600026566')
+
+
+test_tag_set_4 = [
+    (2, [Record()], 23, "Type 2 Tag data area of 0 octets can not take "
+     "a message of 3 octets"),
+    (2, [Record('unknown', '', 3 * b'x')], 24, "Type 2 Tag data area of 8 "
+     "octets can not take a message of 6 octets"),
+    (2, [Record('unknown', '', 0x10000 * b'x')], 0x20000, "a message of "
+     "65542 octets can not be stored on a Type 2 Tag"),
+    (4, [Record()], 4, "Type 4 Tag NDEF file of 4 octets can not take "
+     "a message of 3 octets"),
+    (4, [Record('unknown', '', 0xFFF9 * b'x')], 0x10004, "a message of "
+     "65535 octets can not be stored on a Type 4 Tag"),
+]
+
+
+@pytest.mark.parametrize("tag_type, message, size, errmsg", test_tag_set_4)
+def test_fail_encode_memory(tag_type, message, size, errmsg):
+    buffer = bytearray(size)
+    with pytest.raises(ValueError) as excinfo:
+        ndef.tag.encode_memory_into(message, buffer, tag_type)
+    assert str(excinfo.value) == errmsg
+    assert buffer == bytearray(size)
+    with pytest.raises(ValueError) as excinfo:
+        ndef.tag.encode_memory(message, tag_type, size)
+    assert str(excinfo.value) == errmsg
+
+
+@pytest.mark.parametrize("tag_type", [1, 3, 5, None])
+def test_fail_encode_memory_tag_type(tag_type):
+    with pytest.raises(ValueError) as excinfo:
+        ndef.tag.encode_memory([Record()], tag_type)
+    assert str(excinfo.value) == \
+        "tag_type must be 2 or 4, not {!r}".format(tag_type)
+
+
+def test_fail_encode_memory_read_only():
+    with pytest.raises(TypeError) as excinfo:
+        ndef.tag.encode_memory_into([Record()], bytes(bytearray(24)), 2)
+    assert str(excinfo.value) == \
+        "a writable buffer is required, not " + bytes.__name__
@@ -5,6 +5,8 @@ from __future__ import absolute_import, division
 import uuid
 import ndef
 import pytest
+import copy
+import pickle
 
 
 def B(s):
@@ -42,6 +44,27 @@ class TestAttribute:
             cls(*values).encode()
         assert str(excinfo.value) == errstr
 
+    @pytest.mark.parametrize("attribute", [
+        ndef.wifi.APChannel(1),
+        ndef.wifi.SSID(b'ssid'),
+        ndef.wifi.Credential(),
+    ])
+    def test_no_dict(self, attribute):
+        assert not hasattr(attribute, '__dict__')
+
+    @pytest.mark.parametrize("attribute", [
+        ndef.wifi.APChannel(1),
+        ndef.wifi.SSID(b'ssid'),
+        ndef.wifi.Credential((0x1045, b'ssid'), (0x1027, b'pwd')),
+        ndef.wifi.WifiAllianceVendorExtension((0x00, b'\x20')),
+    ])
+    def test_copy_and_pickle(self, attribute):
+        for duplicate in [copy.copy(attribute), copy.deepcopy(attribute)] + [
+                pickle.loads(pickle.dumps(attribute, protocol))
+                for protocol in range(pickle.HIGHEST_PROTOCOL + 1)]:
+            assert type(duplicate) is type(attribute)
+            assert duplicate.encode() == attribute.encode()
+
 
 class TestAttribute_APChannel:
     @pytest.mark.parametrize("args, value", [
@@ -1624,6 +1647,15 @@ class TestWifiPeerToPeerRecord:
         '13 0006 4b5204510602'                         # 213: Negotiation Chan
     )                                                  # 222: end
 
+    def test_copy_and_pickle(self):
+        RECORD = ndef.wifi.WifiPeerToPeerRecord
+        octets = bytes(bytearray.fromhex(self.hp_printer_payload))
+        record = RECORD._decode_payload(octets, 'strict')
+        assert copy.copy(record) == record
+        assert copy.deepcopy(record) == record
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            assert pickle.loads(pickle.dumps(record, protocol)) == record
+
     def test_hp_printer_payload(self):
         RECORD = ndef.wifi.WifiPeerToPeerRecord
         octets = bytes(bytearray.fromhex(self.hp_printer_payload))